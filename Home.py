@@ -5,12 +5,21 @@ Sistema de análisis y estrategia para @miguemontes1
 
 import streamlit as st
 
+from analitica.sesiones import telemetria
+from analitica.perfilado import perfilador, seccion
+from analitica.artefactos import cache_disco
+from analitica.compartido import MODO_COMPARTIDO
+from analitica.seguidores import resumen_seguidores
+from comun import cargar_seguidores, iniciar_sesion, finalizar_sesion
+
 st.set_page_config(
     page_title="📊 Social Media Analytics",
     page_icon="📊",
     layout="wide"
 )
 
+iniciar_sesion('Inicio')
+
 st.markdown("""
 <style>
     .main-title {
@@ -61,107 +70,145 @@ st.markdown('<h1 class="main-title">📊 Social Media Analytics</h1>', unsafe_al
 st.markdown('<p class="subtitle">Sistema de análisis y estrategia para redes sociales</p>', unsafe_allow_html=True)
 
 # Información del perfil
-col1, col2, col3 = st.columns([1, 2, 1])
-
-with col2:
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                padding: 2rem; border-radius: 1rem; color: white; text-align: center;">
-        <h2>@miguemontes1</h2>
-        <p>Miguel A. Montes Curi</p>
-        <p>📊 57 Videos Analizados | 👥 5,244 Seguidores</p>
-        <p>📅 Agosto 2025 - Enero 2026</p>
-    </div>
-    """, unsafe_allow_html=True)
+with seccion('Perfil'):
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    perfil_seguidores = resumen_seguidores(cargar_seguidores())
+    seguidores = f"{perfil_seguidores['seguidores']:,}" if perfil_seguidores else "—"
+
+    with col2:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                    padding: 2rem; border-radius: 1rem; color: white; text-align: center;">
+            <h2>@miguemontes1</h2>
+            <p>Miguel A. Montes Curi</p>
+            <p>📊 57 Videos Analizados | 👥 {seguidores} Seguidores</p>
+            <p>📅 Agosto 2025 - Enero 2026</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
 # Cards de navegación
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("""
-    <div class="card">
-        <div class="card-icon">📊</div>
-        <div class="card-title">Dashboard de Análisis</div>
-        <div class="card-desc">
-            Métricas históricas, correlaciones, semáforos de rendimiento, 
-            análisis de sentimiento y tendencias temporales.
+with seccion('Navegación'):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("""
+        <div class="card">
+            <div class="card-icon">📊</div>
+            <div class="card-title">Dashboard de Análisis</div>
+            <div class="card-desc">
+                Métricas históricas, correlaciones, semáforos de rendimiento, 
+                análisis de sentimiento y tendencias temporales.
+            </div>
         </div>
-    </div>
-    """, unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
     
-    if st.button("🔍 Ir al Análisis", use_container_width=True, type="primary"):
-        st.switch_page("pages/01_Dashboard_Analisis.py")
-
-with col2:
-    st.markdown("""
-    <div class="card">
-        <div class="card-icon">🎯</div>
-        <div class="card-title">Dashboard de Estrategia</div>
-        <div class="card-desc">
-            Selector de contenido para TikTok/FB/Instagram, 
-            recomendación de pauta y calendario de publicación.
+        if st.button("🔍 Ir al Análisis", use_container_width=True, type="primary"):
+            st.switch_page("pages/01_Dashboard_Analisis.py")
+
+    with col2:
+        st.markdown("""
+        <div class="card">
+            <div class="card-icon">🎯</div>
+            <div class="card-title">Dashboard de Estrategia</div>
+            <div class="card-desc">
+                Selector de contenido para TikTok/FB/Instagram, 
+                recomendación de pauta y calendario de publicación.
+            </div>
         </div>
-    </div>
-    """, unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
     
-    if st.button("🚀 Ir a Estrategia", use_container_width=True, type="primary"):
-        st.switch_page("pages/02_Dashboard_Estrategia.py")
+        if st.button("🚀 Ir a Estrategia", use_container_width=True, type="primary"):
+            st.switch_page("pages/02_Dashboard_Estrategia.py")
 
-st.divider()
+    st.divider()
 
 # Resumen rápido
-st.markdown("## 📈 Resumen Rápido")
+with seccion('KPIs'):
+    st.markdown("## 📈 Resumen Rápido")
 
-col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    st.metric("👁️ Total Vistas", "1,106,629", "19,415/video")
+    with col1:
+        st.metric("👁️ Total Vistas", "1,106,629", "19,415/video")
 
-with col2:
-    st.metric("❤️ Total Likes", "21,552", "378/video")
+    with col2:
+        st.metric("❤️ Total Likes", "21,552", "378/video")
 
-with col3:
-    st.metric("🔄 Sends/Reach", "0.44%", "🟢 Alto")
+    with col3:
+        st.metric("🔄 Sends/Reach", "0.44%", "🟢 Alto")
 
-with col4:
-    st.metric("⭐ Quality Score", "4.5/10", "🟡 Promedio")
+    with col4:
+        st.metric("⭐ Quality Score", "4.5/10", "🟡 Promedio")
 
-st.divider()
+    st.divider()
 
 # Metodología
-st.markdown("## 📚 Metodología")
+with seccion('Metodología'):
+    st.markdown("## 📚 Metodología")
 
-col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-with col1:
-    st.markdown("""
-    ### 🔬 Basado en Algoritmo Instagram 2025
+    with col1:
+        st.markdown("""
+        ### 🔬 Basado en Algoritmo Instagram 2025
     
-    Según **Adam Mosseri** (CEO Instagram, Enero 2025):
+        Según **Adam Mosseri** (CEO Instagram, Enero 2025):
     
-    1. **Watch Time** - Retención de audiencia (no medible externamente)
-    2. **Sends per Reach** - Compartidos / Vistas (medible ✅)
-    3. **Likes per Reach** - Likes / Vistas (medible ✅)
+        1. **Watch Time** - Retención de audiencia (no medible externamente)
+        2. **Sends per Reach** - Compartidos / Vistas (medible ✅)
+        3. **Likes per Reach** - Likes / Vistas (medible ✅)
     
-    > *"Para descubrimiento viral, los shares importan más que los likes"*
-    """)
+        > *"Para descubrimiento viral, los shares importan más que los likes"*
+        """)
 
-with col2:
-    st.markdown("""
-    ### 🎯 Estrategia de Funnel
+    with col2:
+        st.markdown("""
+        ### 🎯 Estrategia de Funnel
     
-    ```
-    TikTok/FB (5-10 clips/día)
-           ↓
-    Instagram (2 mejores)
-           ↓
-    Pauta (1 video/semana)
-    ```
+        ```
+        TikTok/FB (5-10 clips/día)
+               ↓
+        Instagram (2 mejores)
+               ↓
+        Pauta (1 video/semana)
+        ```
     
-    **Objetivo:** Maximizar alcance con inversión optimizada.
-    """)
+        **Objetivo:** Maximizar alcance con inversión optimizada.
+        """)
+
+# Estado del servidor (sesiones y memoria del proceso)
+with st.expander("🖥️ Estado del servidor"), seccion('Estado del servidor'):
+    estado = telemetria()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Sesiones activas", estado['sesiones_activas'], f"Pico: {estado['pico_sesiones']}")
+    memoria = f"{estado['memoria_mb']:,.0f} MB" if estado['memoria_mb'] is not None else "N/D"
+    presupuesto = f"Presupuesto: {estado['presupuesto_mb']:,.0f} MB" if estado['presupuesto_mb'] else "Sin presupuesto"
+    col2.metric("Memoria del proceso", memoria, presupuesto, delta_color="off")
+    col3.metric("Liberaciones de caché", estado['liberaciones'])
+    st.caption("🔗 Modo multi-worker: dataset adjunto en memoria compartida" if MODO_COMPARTIDO
+               else "Modo de un proceso: dataset cargado en este worker")
+
+# Rendimiento: tiempos por sección y aciertos de caché de este proceso
+with st.expander("⏱️ Rendimiento por sección"), seccion('Rendimiento'):
+    st.caption("Tiempos acumulados desde que arrancó el servidor. "
+               "Agrega `?perfilar=1` a la URL de una página para capturar esa ejecución con cProfile.")
+    st.markdown("#### Secciones")
+    st.dataframe(perfilador.tabla_secciones(), use_container_width=True, hide_index=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.1f")
+                                for c in ['Promedio (ms)', 'Máximo (ms)', 'Última (ms)', 'Total (s)']})
+    st.markdown("#### Cachés")
+    st.caption(f"Artefactos en disco: {cache_disco.tamano() / 2**20:,.1f} MB de "
+               f"{cache_disco.limite_bytes / 2**20:,.0f} MB · {cache_disco.aciertos} aciertos, "
+               f"{cache_disco.fallos} fallos en este proceso")
+    st.dataframe(perfilador.tabla_caches(), use_container_width=True, hide_index=True,
+                 column_config={'Tasa de acierto': st.column_config.ProgressColumn(min_value=0, max_value=1, format="percent")})
+    metricas = perfilador.texto_prometheus(estado)
+    st.download_button("⬇️ Métricas (Prometheus)", metricas, file_name="metrics.prom", mime="text/plain")
+    with st.popover("Ver texto"):
+        st.code(metricas, language=None)
 
 # Footer
 st.markdown("""
@@ -170,3 +217,5 @@ st.markdown("""
     <p>Desarrollado con Streamlit + Plotly | Enero 2026</p>
 </div>
 """, unsafe_allow_html=True)
+
+finalizar_sesion()
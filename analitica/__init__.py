@@ -0,0 +1,4 @@
+"""
+📦 ANALÍTICA - MOTOR DE MÉTRICAS
+Lógica compartida por las páginas del dashboard (sin dependencias de Streamlit)
+"""
@@ -0,0 +1,193 @@
+"""
+🚨 ANOMALÍAS - PICOS VIRALES Y BAJO RENDIMIENTO
+Estadísticos robustos en streaming (mediana/MAD + EWMA) por perfil y
+métrica. Cada publicación nueva se evalúa contra el estado acumulado y
+luego se incorpora en tiempo constante, sin recalcular el histórico.
+"""
+
+import threading
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+VIRAL = '🚀 Pico viral'
+BAJO = '🔻 Bajo rendimiento'
+NORMAL = ''
+
+# Constante para que el MAD estime la desviación estándar en datos normales
+ESCALA_MAD = 1.4826
+
+# Observaciones con mediana/MAD exactas antes de pasar a la estimación incremental
+ARRANQUE = 5
+
+
+@dataclass
+class EstadoSerie:
+    """
+    Estado de una métrica de un perfil; cada actualización es O(1).
+    Mediana y MAD se siguen por aproximación estocástica (un paso con el
+    signo del desvío, escalado por la desviación EWMA), con una memoria
+    efectiva de unas `ventana` publicaciones.
+    """
+    ventana: int = 30
+    alpha: float = 0.2
+    arranque: list = field(default_factory=list)
+    mediana: float = np.nan
+    mad: float = np.nan
+    ewma: float = np.nan
+    ewvar: float = 0.0
+    n: int = 0
+
+    def copia(self):
+        return replace(self, arranque=list(self.arranque))
+
+    @property
+    def tasa(self):
+        return 2.0 / (self.ventana + 1)
+
+    def puntuar(self, x):
+        """z robusto (mediana/MAD) y z EWMA de x frente al estado actual"""
+        mad = self.mad * ESCALA_MAD
+        z_robusto = (x - self.mediana) / mad if mad > 0 else 0.0
+        sd = np.sqrt(self.ewvar)
+        z_ewma = (x - self.ewma) / sd if sd > 0 else 0.0
+        return z_robusto, z_ewma
+
+    def incorporar(self, x):
+        if self.n == 0:
+            self.ewma = x
+        else:
+            diferencia = x - self.ewma
+            self.ewma += self.alpha * diferencia
+            self.ewvar = (1 - self.alpha) * (self.ewvar + self.alpha * diferencia ** 2)
+        self.n += 1
+
+        if self.n <= ARRANQUE:
+            self.arranque.append(x)
+            self.mediana = float(np.median(self.arranque))
+            self.mad = float(np.median(np.abs(np.asarray(self.arranque) - self.mediana)))
+            if self.n == ARRANQUE:
+                self.arranque.clear()
+            return
+
+        # El signo acota la influencia de un viral igual que la mediana de una ventana
+        paso = self.tasa * np.sqrt(self.ewvar)
+        self.mediana += paso * np.sign(x - self.mediana)
+        self.mad = max(self.mad + paso * np.sign(abs(x - self.mediana) - self.mad), 0.0)
+
+
+class DetectorAnomalias:
+    """
+    Detector por perfil. Las métricas de conteo se evalúan en escala log
+    para que un solo viral no domine la escala. Una publicación se marca
+    solo si el z robusto y el z EWMA coinciden: el primero la compara con
+    el nivel típico del perfil y el segundo descarta los desvíos que solo
+    reflejan la tendencia reciente.
+    """
+
+    def __init__(self, ventana=30, alpha=0.2, umbral_viral=3.0, umbral_bajo=2.5, min_obs=5,
+                 metricas=('Reproducciones', 'Likes', 'Sends_per_Reach')):
+        self.ventana = ventana
+        self.alpha = alpha
+        self.umbral_viral = umbral_viral
+        self.umbral_bajo = umbral_bajo
+        self.min_obs = min_obs
+        self.metricas = list(metricas)
+        self._estados = {}
+        self._resultados = {}
+        # Por perfil y en orden de proceso: claves (fecha, #), métricas usadas y estados previos a cada fila
+        self._historia = {}
+        self._versiones = {}
+        self._lock = threading.Lock()
+
+    def _estado(self, perfil, metrica):
+        clave = (perfil, metrica)
+        if clave not in self._estados:
+            self._estados[clave] = EstadoSerie(ventana=self.ventana, alpha=self.alpha)
+        return self._estados[clave]
+
+    def actualizar(self, perfil, publicacion):
+        """Evalúa una publicación nueva (dict métrica → valor) y la incorpora al estado"""
+        fila = {}
+        etiquetas = []
+        for metrica in self.metricas:
+            valor = publicacion.get(metrica)
+            if valor is None or pd.isna(valor):
+                continue
+            x = float(np.log1p(max(valor, 0)))
+            estado = self._estado(perfil, metrica)
+            if estado.n >= self.min_obs:
+                z_robusto, z_ewma = estado.puntuar(x)
+                fila[f'z_{metrica}'] = z_robusto
+                fila[f'z_ewma_{metrica}'] = z_ewma
+                if z_robusto > self.umbral_viral and z_ewma > self.umbral_viral:
+                    etiquetas.append((VIRAL, metrica))
+                elif z_robusto < -self.umbral_bajo and z_ewma < -self.umbral_bajo:
+                    etiquetas.append((BAJO, metrica))
+            estado.incorporar(x)
+
+        tipos = {tipo for tipo, _ in etiquetas}
+        fila['Anomalía'] = VIRAL if VIRAL in tipos else BAJO if BAJO in tipos else NORMAL
+        fila['Métricas'] = ', '.join(m for _, m in etiquetas)
+        return fila
+
+    def _instantanea(self, perfil):
+        return {m: self._estados[(perfil, m)].copia() for m in self.metricas if (perfil, m) in self._estados}
+
+    def _restaurar(self, perfil, instantanea):
+        for metrica in self.metricas:
+            self._estados.pop((perfil, metrica), None)
+            if metrica in instantanea:
+                self._estados[(perfil, metrica)] = instantanea[metrica].copia()
+
+    @staticmethod
+    def _primer_cambio(historia, claves, valores):
+        """Posición de la primera fila ya procesada que cambió, se borró o se movió (o el largo si ninguna)"""
+        n = min(len(historia['claves']), len(claves))
+        iguales = np.ones(n, dtype=bool)
+        if n:
+            viejos = np.vstack(historia['valores'][:n])
+            iguales = ((viejos == valores[:n]) | (np.isnan(viejos) & np.isnan(valores[:n]))).all(axis=1)
+            iguales &= np.fromiter((a == b for a, b in zip(historia['claves'], claves)), dtype=bool, count=n)
+        return int(np.argmin(iguales)) if not iguales.all() else n
+
+    def procesar(self, perfil, df, columna_fecha='Fecha', columna_id='#', version=None):
+        """
+        Procesa en orden cronológico las publicaciones nuevas del perfil y
+        devuelve las anotaciones de todas. Si una versión nueva cambia las
+        métricas de una fila ya procesada (o la borra o renumera), el estado
+        vuelve al de antes de esa fila y se reprocesa desde ahí.
+        """
+        with self._lock:
+            if version is not None and self._versiones.get(perfil, (None,))[0] == version:
+                return self._versiones[perfil][1].copy()
+
+        fechas = pd.to_datetime(df[columna_fecha])
+        validas = fechas.notna()
+        ordenado = df.loc[validas, [columna_id] + self.metricas].assign(**{columna_fecha: fechas[validas]})
+        ordenado = ordenado.sort_values([columna_fecha, columna_id])
+        claves = list(zip(ordenado[columna_fecha], ordenado[columna_id]))
+        valores = ordenado[self.metricas].to_numpy(dtype='float64')
+
+        with self._lock:
+            resultados = self._resultados.setdefault(perfil, {})
+            historia = self._historia.setdefault(perfil, {'claves': [], 'valores': [], 'estados': []})
+            desde = self._primer_cambio(historia, claves, valores)
+            if desde < len(historia['claves']):
+                self._restaurar(perfil, historia['estados'][desde])
+                for _, numero in historia['claves'][desde:]:
+                    resultados.pop(numero, None)
+                for lista in historia.values():
+                    del lista[desde:]
+            for clave, fila in zip(claves[desde:], valores[desde:]):
+                historia['claves'].append(clave)
+                historia['valores'].append(fila)
+                historia['estados'].append(self._instantanea(perfil))
+                resultados[clave[1]] = self.actualizar(perfil, dict(zip(self.metricas, fila)))
+            anotaciones = pd.DataFrame.from_dict(resultados, orient='index')
+            anotaciones.index.name = columna_id
+            anotaciones = anotaciones.reindex(df[columna_id].to_numpy())
+            if version is not None:
+                self._versiones[perfil] = (version, anotaciones)
+        return anotaciones.copy()
@@ -0,0 +1,293 @@
+"""
+🌐 API - MÉTRICAS Y RECOMENDACIONES EN HTTP/JSON
+Servicio asíncrono (Starlette + uvicorn) sobre el mismo motor de métricas que
+las páginas. Las respuestas se cachean por versión del dataset y se validan
+con ETag (304 sin recalcular); los cálculos corren en un pool acotado de hilos.
+
+Uso:
+    python -m analitica.api --perfiles perfiles/ --port 8600 --workers 4
+
+Rutas:
+    GET /salud
+    GET /perfiles
+    GET /perfiles/{perfil}/metricas
+    GET /perfiles/{perfil}/recomendaciones?clips_tiktok_fb=7
+    GET /perfiles/{perfil}/calendario?fecha_inicio=AAAA-MM-DD&clips_tiktok_fb=7&clips_instagram=2
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from analitica.datos import ARCHIVO_IMPORTADO, RUTA_DATOS, cargar_instagram, nombre_perfil, version_dataset
+from analitica.formatos import recomendar_formato, rendimiento_por_grupo
+from analitica.planes import inicio_semana
+from analitica.recomendaciones import calendario_semanal, mejor_pauta, seleccion_instagram, seleccion_tiktok
+from analitica.semaforos import semaforo_likes, semaforo_qs, semaforo_sends
+
+COLUMNAS_VIDEO = ['#', 'Reproducciones', 'Likes', 'Sends_per_Reach', 'Likes_per_Reach', 'Quality_Score']
+
+
+def _convertir(valor):
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return None if np.isnan(valor) else float(valor)
+    if isinstance(valor, (pd.Timestamp, date)):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor)}")
+
+
+def a_json(datos):
+    return json.dumps(datos, ensure_ascii=False, default=_convertir).encode('utf-8')
+
+
+def video_json(video):
+    return {col: video[col] for col in COLUMNAS_VIDEO}
+
+
+# ============================================
+# DATASETS Y CACHÉ DE RESPUESTAS
+# ============================================
+class AlmacenPerfiles:
+    """Libros por perfil; cada DataFrame se carga una vez por versión"""
+
+    def __init__(self, rutas):
+        self.rutas = rutas
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde(cls, origen):
+        if os.path.isdir(origen):
+            # Libros .xlsx y perfiles importados (<perfil>/tabla.arrow)
+            rutas = {os.path.splitext(n)[0]: os.path.join(origen, n)
+                     for n in sorted(os.listdir(origen)) if n.endswith('.xlsx') and not n.startswith('~$')}
+            rutas.update({nombre_perfil(r): r for r in sorted(glob.glob(os.path.join(origen, '*', ARCHIVO_IMPORTADO)))})
+        else:
+            rutas = {nombre_perfil(origen): origen}
+        return cls(rutas)
+
+    def version(self, perfil):
+        return version_dataset(self.rutas[perfil])
+
+    def datos(self, perfil, version):
+        with self._lock:
+            guardado = self._datos.get(perfil)
+        if guardado and guardado[0] == version:
+            return guardado[1]
+        df = cargar_instagram(self.rutas[perfil])
+        with self._lock:
+            self._datos[perfil] = (version, df)
+        return df
+
+
+class CacheRespuestas:
+    """LRU de respuestas ya serializadas, indexada por ruta + parámetros + versión"""
+
+    def __init__(self, maximo=1024):
+        self.maximo = maximo
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            cuerpo = self._entradas.get(clave)
+            if cuerpo is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return cuerpo
+
+    def guardar(self, clave, cuerpo):
+        with self._lock:
+            self._entradas[clave] = cuerpo
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+
+
+# ============================================
+# PARÁMETROS
+# ============================================
+def _entero_positivo(valor):
+    numero = int(valor)
+    if numero <= 0:
+        raise ValueError(f"debe ser mayor que 0, no {valor}")
+    return numero
+
+
+def _lunes(valor):
+    """Como la página: el calendario empieza el lunes de la semana de la fecha pedida"""
+    return inicio_semana(date.fromisoformat(valor))
+
+
+# Recurso → parámetro → (conversión, valor por defecto; si es función se evalúa en cada consulta)
+PARAMETROS = {
+    'metricas': {},
+    'recomendaciones': {'clips_tiktok_fb': (_entero_positivo, 7)},
+    'calendario': {
+        'fecha_inicio': (_lunes, lambda: inicio_semana(date.today())),
+        'clips_tiktok_fb': (_entero_positivo, 7),
+        'clips_instagram': (_entero_positivo, 2),
+    },
+}
+
+
+def resolver_parametros(nombre, consulta):
+    """Parámetros del recurso convertidos y con los valores por defecto resueltos; ValueError si alguno no es válido"""
+    resueltos = {}
+    for parametro, (convertir, defecto) in PARAMETROS[nombre].items():
+        if parametro not in consulta:
+            resueltos[parametro] = defecto() if callable(defecto) else defecto
+            continue
+        try:
+            resueltos[parametro] = convertir(consulta[parametro])
+        except ValueError as e:
+            raise ValueError(f"{parametro}: {e}") from None
+    return resueltos
+
+
+def clave_respuesta(perfil, nombre, params, version):
+    """Clave de caché y del ETag: con los parámetros ya resueltos (p. ej. la fecha de hoy si no se dio)"""
+    consulta = '&'.join(f'{k}={v}' for k, v in sorted(params.items()))
+    return f'{perfil}/{nombre}?{consulta}@{version}'
+
+
+# ============================================
+# CÁLCULOS (corren en el pool de hilos)
+# ============================================
+def _metricas(df, params):
+    sends_avg = df['Sends_per_Reach'].mean()
+    likes_avg = df['Likes_per_Reach'].mean()
+    qs_avg = df['Quality_Score'].mean()
+    return {
+        'videos': len(df),
+        'total_vistas': df['Reproducciones'].sum(),
+        'total_likes': df['Likes'].sum(),
+        'total_comentarios': df['Conteo Comentarios'].sum(),
+        'total_compartidos': df['Compartidos'].sum(),
+        'sends_per_reach': {'valor': sends_avg, 'semaforo': semaforo_sends(sends_avg)},
+        'likes_per_reach': {'valor': likes_avg, 'semaforo': semaforo_likes(likes_avg)},
+        'quality_score': {'valor': qs_avg, 'semaforo': semaforo_qs(qs_avg)},
+    }
+
+
+def _recomendaciones(df, params):
+    clips = params['clips_tiktok_fb']
+    video1, video2 = seleccion_instagram(df)
+    formato = recomendar_formato(rendimiento_por_grupo(df))
+    return {
+        'tiktok_fb': [video_json(v) for _, v in seleccion_tiktok(df, clips).iterrows()],
+        'instagram': {'video1': video_json(video1), 'video2': video_json(video2)},
+        'mejor_pauta': video_json(mejor_pauta(df)),
+        'formato': {k: formato[k] for k in ('tipo', 'duracion', 'basado_en_datos')},
+    }
+
+
+def _calendario(df, params):
+    calendario = calendario_semanal(df, params['fecha_inicio'], params['clips_tiktok_fb'], params['clips_instagram'])
+    return {'fecha_inicio': params['fecha_inicio'], 'dias': calendario.to_dict('records')}
+
+
+CALCULOS = {
+    'metricas': _metricas,
+    'recomendaciones': _recomendaciones,
+    'calendario': _calendario,
+}
+
+
+# ============================================
+# APLICACIÓN
+# ============================================
+def crear_app(origen=RUTA_DATOS, workers=4, max_cache=1024):
+    almacen = AlmacenPerfiles.desde(origen)
+    cache = CacheRespuestas(max_cache)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+    limite = asyncio.Semaphore(workers)
+
+    async def salud(request):
+        return JSONResponse({'estado': 'ok', 'perfiles': len(almacen.rutas),
+                             'cache': {'aciertos': cache.aciertos, 'fallos': cache.fallos}})
+
+    async def perfiles(request):
+        loop = asyncio.get_running_loop()
+        versiones = {p: await loop.run_in_executor(pool, almacen.version, p) for p in almacen.rutas}
+        return JSONResponse([{'perfil': p, 'version': v} for p, v in versiones.items()])
+
+    async def recurso(request):
+        perfil = request.path_params['perfil']
+        nombre = request.path_params['recurso']
+        if perfil not in almacen.rutas or nombre not in CALCULOS:
+            return JSONResponse({'error': 'No encontrado'}, status_code=404)
+
+        try:
+            params = resolver_parametros(nombre, request.query_params)
+        except ValueError as e:
+            return JSONResponse({'error': f'Parámetros inválidos: {e}'}, status_code=400)
+
+        loop = asyncio.get_running_loop()
+        version = await loop.run_in_executor(pool, almacen.version, perfil)
+        clave = clave_respuesta(perfil, nombre, params, version)
+        etag = '"' + hashlib.sha1(clave.encode('utf-8')).hexdigest() + '"'
+        cabeceras = {'ETag': etag, 'X-Dataset-Version': version, 'Cache-Control': 'no-cache'}
+
+        # El ETag depende solo de la versión y los parámetros resueltos: 304 sin tocar los datos
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=cabeceras)
+
+        cuerpo = cache.obtener(clave)
+        if cuerpo is None:
+            async with limite:
+                cuerpo = await loop.run_in_executor(
+                    pool, lambda: a_json(CALCULOS[nombre](almacen.datos(perfil, version), params)))
+            cache.guardar(clave, cuerpo)
+        return Response(cuerpo, media_type='application/json', headers=cabeceras)
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app):
+        yield
+        pool.shutdown(wait=False)
+
+    app = Starlette(routes=[
+        Route('/salud', salud),
+        Route('/perfiles', perfiles),
+        Route('/perfiles/{perfil}/{recurso}', recurso),
+    ], lifespan=ciclo_de_vida)
+    app.state.almacen = almacen
+    app.state.cache = cache
+    return app
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API de métricas y recomendaciones")
+    parser.add_argument('--perfiles', default=RUTA_DATOS, help="Libro .xlsx o directorio de libros y perfiles importados")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=4, help="Cálculos concurrentes como máximo")
+    args = parser.parse_args(argv)
+
+    uvicorn.run(crear_app(args.perfiles, args.workers), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+💾 ARTEFACTOS - CACHÉ EN DISCO DE RESULTADOS DERIVADOS
+Métricas, correlaciones, semáforos, rendimiento por grupo... se guardan en
+disco con clave = contenido del libro + versión del código + parámetros, así
+un reinicio o un worker nuevo arranca en caliente sin volver a leer el Excel.
+
+La escritura es atómica (archivo temporal + os.replace), de modo que varios
+procesos pueden leer y escribir a la vez; el tamaño total está acotado y se
+desalojan primero los artefactos usados hace más tiempo.
+"""
+
+import functools
+import glob
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sys
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+from analitica.datos import DIRECTORIO_CACHE
+
+log = logging.getLogger(__name__)
+
+LIMITE_ARTEFACTOS_MB = float(os.environ.get('DASHBOARD_CACHE_DISCO_MB', 512))
+
+
+@lru_cache(maxsize=1)
+def version_codigo():
+    """Hash del código de `analitica` y de las versiones de Python/pandas (formato del pickle)"""
+    h = hashlib.sha256(f'{sys.version_info[:2]}|{pd.__version__}'.encode())
+    for ruta in sorted(glob.glob(os.path.join(os.path.dirname(__file__), '*.py'))):
+        with open(ruta, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _hash_fuente(func):
+    try:
+        fuente = inspect.getsource(func)
+    except (OSError, TypeError):
+        fuente = func.__qualname__
+    return hashlib.sha256(fuente.encode('utf-8')).hexdigest()[:16]
+
+
+class CacheDisco:
+    """Artefactos serializados en `<directorio>/<nombre>-<clave>.pkl`, con límite de tamaño"""
+
+    def __init__(self, directorio=os.path.join(DIRECTORIO_CACHE, 'artefactos'), limite_mb=LIMITE_ARTEFACTOS_MB):
+        self.directorio = directorio
+        self.limite_bytes = limite_mb * 2**20
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def clave(self, *partes):
+        return hashlib.sha256(repr((version_codigo(),) + partes).encode('utf-8')).hexdigest()[:24]
+
+    def ruta(self, nombre, clave):
+        return os.path.join(self.directorio, f'{nombre}-{clave}.pkl')
+
+    def leer(self, ruta):
+        try:
+            with open(ruta, 'rb') as f:
+                valor = pickle.load(f)
+        except FileNotFoundError:
+            return None, False
+        except Exception as e:
+            # Archivo truncado o de otra versión de pandas: se recalcula
+            log.warning("Artefacto ilegible %s: %s", ruta, e)
+            return None, False
+        try:
+            os.utime(ruta)  # el mtime marca el último uso (orden de desalojo)
+        except OSError:
+            pass
+        return valor, True
+
+    def escribir(self, ruta, valor):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temporal, 'wb') as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, ruta)
+        except Exception as e:  # disco lleno o valor que no se puede serializar: queda solo en memoria
+            log.warning("No se pudo guardar el artefacto %s: %s", ruta, e)
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            return
+        self.desalojar()
+
+    def obtener(self, nombre, calcular, *partes):
+        """Valor de `nombre` para la clave `partes`: de disco si existe, si no `calcular()`"""
+        ruta = self.ruta(nombre, self.clave(nombre, *partes))
+        valor, encontrado = self.leer(ruta)
+        with self._lock:
+            if encontrado:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+        if encontrado:
+            return valor
+        valor = calcular()
+        self.escribir(ruta, valor)
+        return valor
+
+    def tamano(self):
+        return sum(os.path.getsize(r) for r in self._archivos())
+
+    def _archivos(self):
+        return glob.glob(os.path.join(self.directorio, '*.pkl'))
+
+    def desalojar(self):
+        """Borra los artefactos menos usados hasta quedar bajo el límite"""
+        archivos = []
+        for ruta in self._archivos():
+            try:
+                st_ = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            archivos.append((st_.st_mtime, st_.st_size, ruta))
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                # Ya borrado por otro proceso (o abierto en Windows)
+                pass
+            total -= tamano
+
+    def limpiar(self):
+        for ruta in self._archivos():
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+cache_disco = CacheDisco()
+
+
+def en_disco(nombre=None, cache=None):
+    """
+    Decorador para funciones `(version, ...)`: el resultado se guarda en disco
+    por versión del dataset, fuente de la función y parámetros. Como en
+    Streamlit, los parámetros que empiezan con `_` no forman parte de la clave.
+    """
+    def decorar(func):
+        etiqueta = nombre or func.__name__
+        firma = inspect.signature(func)
+        fuente = _hash_fuente(func)
+
+        @functools.wraps(func)
+        def envoltorio(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            partes = tuple((k, v) for k, v in argumentos.arguments.items() if not k.startswith('_'))
+            destino = cache or cache_disco
+            return destino.obtener(etiqueta, lambda: func(*args, **kwargs), fuente, partes)
+        return envoltorio
+    return decorar
@@ -0,0 +1,188 @@
+"""
+📐 BOSQUEJOS - CUANTILES FUSIONABLES PARA BENCHMARKS ENTRE PERFILES
+Cada perfil resume la distribución de sus métricas por video en un bosquejo
+de cuantiles con error relativo acotado (estilo DDSketch): cubetas
+logarítmicas fijas de ancho `ALFA`, así un cuantil estimado queda a ~1% del
+valor real. Todas las cubetas comparten la misma grilla, de modo que
+fusionar perfiles es sumar conteos (exacto, asociativo) y restar uno
+(comparar contra los demás) también. Los benchmarks del portafolio o de una
+categoría salen de fusionar bosquejos, sin juntar los datos crudos.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Error relativo de los cuantiles y rango representable (lo menor a MINIMO cuenta como cero)
+ALFA = 0.01
+MINIMO = 1e-6
+MAXIMO = 1e12
+
+GAMMA = (1 + ALFA) / (1 - ALFA)
+_LOG_GAMMA = np.log(GAMMA)
+_DESPLAZAMIENTO = int(np.floor(np.log(MINIMO) / _LOG_GAMMA))
+CUBETAS = int(np.ceil(np.log(MAXIMO) / _LOG_GAMMA)) - _DESPLAZAMIENTO + 1
+
+# Métricas por video con bosquejo en cada perfil
+METRICAS_BOSQUEJO = ['Sends_per_Reach', 'Likes_per_Reach', 'Reproducciones']
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Bosquejos por perfil que escribe `python -m analitica.puntuar`
+DIRECTORIO_BOSQUEJOS = os.environ.get('DASHBOARD_BOSQUEJOS', os.path.join('puntajes', 'bosquejos'))
+SIN_CATEGORIA = 'Sin categoría'
+
+
+def _cubeta(valores):
+    return np.clip(np.ceil(np.log(valores) / _LOG_GAMMA).astype(np.int64) - _DESPLAZAMIENTO, 0, CUBETAS - 1)
+
+
+# Valor representativo de cada cubeta (a ±ALFA relativo de cualquier valor que caiga en ella)
+_VALORES = 2 * GAMMA ** (np.arange(CUBETAS) + _DESPLAZAMIENTO) / (GAMMA + 1)
+
+
+class BosquejoCuantiles:
+    """Conteos por cubeta logarítmica (más los ceros); se fusiona sumando"""
+
+    def __init__(self, conteos=None, ceros=0):
+        self.conteos = np.zeros(CUBETAS, dtype=np.int64) if conteos is None else conteos
+        self.ceros = int(ceros)
+
+    @classmethod
+    def de_valores(cls, valores):
+        x = np.asarray(valores, dtype='float64')
+        x = x[np.isfinite(x) & (x >= 0)]
+        positivos = x[x >= MINIMO]
+        conteos = np.bincount(_cubeta(positivos), minlength=CUBETAS).astype(np.int64)
+        return cls(conteos, len(x) - len(positivos))
+
+    @classmethod
+    def fusion(cls, bosquejos):
+        """Un solo bosquejo con la distribución de todos (una suma vectorizada)"""
+        bosquejos = list(bosquejos)
+        if not bosquejos:
+            return cls()
+        return cls(np.sum([b.conteos for b in bosquejos], axis=0), sum(b.ceros for b in bosquejos))
+
+    def __add__(self, otro):
+        return BosquejoCuantiles(self.conteos + otro.conteos, self.ceros + otro.ceros)
+
+    def __sub__(self, otro):
+        """Quita un bosquejo ya fusionado (p. ej. un perfil de su propio benchmark)"""
+        return BosquejoCuantiles(np.maximum(self.conteos - otro.conteos, 0), max(self.ceros - otro.ceros, 0))
+
+    @property
+    def total(self):
+        return int(self.conteos.sum()) + self.ceros
+
+    def cuantiles(self, qs):
+        """Valores en los cuantiles `qs` (0-1); NaN si el bosquejo está vacío"""
+        qs = np.atleast_1d(np.asarray(qs, dtype='float64'))
+        if self.total == 0:
+            return np.full(len(qs), np.nan)
+        acumulado = self.ceros + np.cumsum(self.conteos)
+        rangos = qs * (self.total - 1)
+        posiciones = np.searchsorted(acumulado, rangos, side='right')
+        return np.where(rangos < self.ceros, 0.0, _VALORES[np.minimum(posiciones, CUBETAS - 1)])
+
+    def percentil_de(self, valores):
+        """Fracción (0-1) de valores del bosquejo por debajo de cada uno de `valores`"""
+        x = np.atleast_1d(np.asarray(valores, dtype='float64'))
+        if self.total == 0:
+            return np.full(len(x), np.nan)
+        acumulado = np.concatenate([[self.ceros], self.ceros + np.cumsum(self.conteos)])
+        cubetas = _cubeta(np.maximum(x, MINIMO))
+        # Debajo: ceros + cubetas menores; la cubeta propia cuenta a medias
+        debajo = np.where(x < MINIMO, 0, acumulado[cubetas] + self.conteos[cubetas] / 2)
+        return debajo / self.total
+
+    def a_dict(self):
+        """Forma compacta (solo el tramo de cubetas con datos) para guardar en JSON"""
+        ocupadas = np.flatnonzero(self.conteos)
+        inicio = int(ocupadas[0]) if len(ocupadas) else 0
+        fin = int(ocupadas[-1]) + 1 if len(ocupadas) else 0
+        return {'alfa': ALFA, 'ceros': self.ceros, 'inicio': inicio, 'conteos': self.conteos[inicio:fin].tolist()}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        if datos['alfa'] != ALFA:
+            raise ValueError(f"Bosquejo con alfa={datos['alfa']}, se esperaba {ALFA}")
+        conteos = np.zeros(CUBETAS, dtype=np.int64)
+        conteos[datos['inicio']:datos['inicio'] + len(datos['conteos'])] = datos['conteos']
+        return cls(conteos, datos['ceros'])
+
+
+# ============================================
+# BOSQUEJOS POR PERFIL
+# ============================================
+def bosquejos_perfil(df):
+    """Métrica → bosquejo de sus valores por video"""
+    return {metrica: BosquejoCuantiles.de_valores(df[metrica].to_numpy()) for metrica in METRICAS_BOSQUEJO}
+
+
+def guardar_bosquejos(df, perfil, categoria, directorio):
+    """Escribe `<directorio>/<perfil>.json` con los bosquejos del perfil y su categoría"""
+    os.makedirs(directorio, exist_ok=True)
+    datos = {'perfil': perfil, 'categoria': categoria, 'videos': len(df),
+             'bosquejos': {m: b.a_dict() for m, b in bosquejos_perfil(df).items()}}
+    destino = os.path.join(directorio, f'{perfil}.json')
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(temporal, destino)
+
+
+def huella_bosquejos(directorio=DIRECTORIO_BOSQUEJOS):
+    """Cambia al reescribirse algún bosquejo (solo `stat`)"""
+    rutas = glob.glob(os.path.join(directorio, '*.json'))
+    return f"{len(rutas)}|{max((os.stat(r).st_mtime_ns for r in rutas), default=0)}"
+
+
+def leer_bosquejos(directorio=DIRECTORIO_BOSQUEJOS):
+    """DataFrame con una fila por perfil: `perfil`, `categoria`, `videos` y un bosquejo por métrica"""
+    filas = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, '*.json'))):
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        filas.append({'perfil': datos['perfil'], 'categoria': datos['categoria'] or SIN_CATEGORIA,
+                      'videos': datos['videos'],
+                      **{m: BosquejoCuantiles.desde_dict(b) for m, b in datos['bosquejos'].items()}})
+    return pd.DataFrame(filas, columns=['perfil', 'categoria', 'videos', *METRICAS_BOSQUEJO])
+
+
+def benchmarks(bosquejos, por='categoria'):
+    """
+    Percentiles (PERCENTILES) de cada métrica por grupo (`por`) y para todo
+    el portafolio, fusionando los bosquejos de sus perfiles.
+    """
+    grupos = [('Portafolio', bosquejos)]
+    if por and not bosquejos.empty:
+        grupos += list(bosquejos.groupby(por))
+    filas = []
+    for grupo, perfiles in grupos:
+        for metrica in METRICAS_BOSQUEJO:
+            fusionado = BosquejoCuantiles.fusion(perfiles[metrica])
+            filas.append({'Grupo': grupo, 'Métrica': metrica, 'Perfiles': len(perfiles), 'Videos': fusionado.total,
+                          **{f'P{p}': v for p, v in zip(PERCENTILES, fusionado.cuantiles(np.array(PERCENTILES) / 100))}})
+    return pd.DataFrame(filas)
+
+
+def posicion_entre_pares(df, bosquejos, perfil, categoria=None):
+    """
+    Percentil (0-100) de la mediana por video del perfil frente a los videos
+    de sus pares (misma categoría si se da y hay otros perfiles en ella; si
+    no, todo el portafolio), sin contar al propio perfil. Métrica → percentil
+    y número de perfiles pares; percentil NaN si no hay pares.
+    """
+    otros = bosquejos[bosquejos['perfil'] != perfil]
+    if categoria is not None and (otros['categoria'] == categoria).any():
+        otros = otros[otros['categoria'] == categoria]
+    posicion = {}
+    for metrica in METRICAS_BOSQUEJO:
+        pares = BosquejoCuantiles.fusion(otros[metrica])
+        mediana = float(np.nanmedian(df[metrica].to_numpy(dtype='float64')))
+        posicion[metrica] = (float(pares.percentil_de(mediana)[0] * 100), len(otros))
+    return posicion
@@ -0,0 +1,366 @@
+"""
+🔎 BÚSQUEDA - ÍNDICE INVERTIDO SOBRE CAPTIONS Y COMENTARIOS
+Índice de texto completo construido al ingerir el libro: tokens en minúsculas
+y sin tildes (`Ralito` = `ralito`, `crítica` = `critica`), sin palabras vacías
+ni las líneas de metadatos que trae el scraping de comentarios. Se guarda en
+segmentos inmutables (vocabulario ordenado + postings en .npy, leídos con
+memory-map); cada video se identifica por el hash de sus textos, así una
+versión nueva del libro solo tokeniza los videos nuevos o con comentarios
+nuevos y escribe un segmento más. Los segmentos se fusionan cuando se
+acumulan. Una consulta es una búsqueda binaria por término y segmento.
+
+Sintaxis: palabras separadas por espacios (deben aparecer todas), `*` al
+final de una palabra para buscar por prefijo (`critic*`).
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from analitica.datos import DIRECTORIO_CACHE
+
+# Nombre corto del campo → columna del libro
+CAMPOS = {
+    'caption': 'Descripción/Caption',
+    'comentarios': 'Raw Data: Comentarios',
+}
+
+MAX_SEGMENTOS = 8
+VERSIONES_RETENIDAS = 3
+# Postings pendientes antes de escribir un segmento (acota la memoria al indexar)
+LIMITE_POSTINGS = 2_000_000
+
+STOPWORDS = frozenset("""
+a al algo ante asi como con contra cual cuando de del desde donde e el ella ellas ellos en entre era es esa
+ese eso esta este esto estos fue ha hay la las le les lo los mas me mi mis muy ni no nos o os para pero
+por que quien se sea si sin sobre su sus te ti tu tus un una uno unos y ya yo
+""".split())
+
+TOKEN = re.compile(r'[a-z0-9]+')
+# Líneas que agrega el scraping de Instagram debajo de cada comentario ("2 sem1 Me gustaResponder")
+LINEA_META = re.compile(r'^\s*(\d+\s*(sem|d|h|min|s)\s*)?(\d+\s*Me gusta)?\s*Responder\s*$')
+
+
+def directorio_busqueda(directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, 'busqueda')
+
+
+# ============================================
+# TEXTO → TOKENS
+# ============================================
+def normalizar(texto):
+    """Minúsculas, sin tildes ni emojis ('Pacto de Ralito 🔥' → 'pacto de ralito ')"""
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def tokens(texto):
+    return [t for t in TOKEN.findall(normalizar(texto)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def comentarios(texto):
+    """Comentarios individuales del texto crudo (sin las líneas de metadatos)"""
+    if not texto:
+        return []
+    return [linea for linea in texto.split('\n') if linea.strip() and not LINEA_META.match(linea)]
+
+
+def tokens_documento(texto, campo):
+    if not texto:
+        return []
+    if campo == 'comentarios':
+        texto = '\n'.join(comentarios(texto))
+    return tokens(texto)
+
+
+def clave_documento(textos):
+    """Hash estable de los textos de un video: cambia si cambia el caption o llegan comentarios"""
+    h = hashlib.blake2b(digest_size=8)
+    for texto in textos:
+        h.update((texto or '').encode('utf-8'))
+        h.update(b'\x1f')
+    return int.from_bytes(h.digest(), 'little')
+
+
+def terminos_consulta(consulta):
+    """[(término, es_prefijo)] de una consulta"""
+    terminos = []
+    for parte in consulta.split():
+        partes = tokens(parte.rstrip('*'))
+        terminos.extend((t, False) for t in partes[:-1])
+        if partes:
+            terminos.append((partes[-1], parte.endswith('*')))
+    return terminos
+
+
+# ============================================
+# SEGMENTOS
+# ============================================
+def _escribir_segmento(carpeta, claves, postings):
+    """Escribe un segmento: `postings[campo]` = (términos, docs, frecuencias) en listas paralelas"""
+    os.makedirs(carpeta, exist_ok=True)
+    temporal = os.path.join(carpeta, f'.{uuid.uuid4().hex}.tmp')
+    os.makedirs(temporal)
+    np.save(os.path.join(temporal, 'claves.npy'), np.asarray(claves, dtype=np.uint64))
+    for campo, (terminos, docs, frecuencias) in postings.items():
+        terminos = np.asarray(terminos, dtype=str)
+        vocabulario, ids = np.unique(terminos, return_inverse=True)
+        docs = np.asarray(docs, dtype=np.int32)
+        orden = np.lexsort((docs, ids))
+        conteos = np.bincount(ids, minlength=len(vocabulario))
+        inicios = np.concatenate([[0], np.cumsum(conteos)]).astype(np.int64)
+        np.save(os.path.join(temporal, f'{campo}.terminos.npy'), vocabulario)
+        np.save(os.path.join(temporal, f'{campo}.inicios.npy'), inicios)
+        np.save(os.path.join(temporal, f'{campo}.docs.npy'), docs[orden])
+        np.save(os.path.join(temporal, f'{campo}.frec.npy'), np.asarray(frecuencias, dtype=np.int32)[orden])
+    destino = os.path.join(carpeta, uuid.uuid4().hex)
+    os.replace(temporal, destino)
+    return destino
+
+
+class Segmento:
+    """Segmento en disco (memory-map)"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.claves = np.load(os.path.join(ruta, 'claves.npy'), mmap_mode='r')
+        self._campos = {}
+        for campo in CAMPOS:
+            if os.path.isfile(os.path.join(ruta, f'{campo}.terminos.npy')):
+                self._campos[campo] = tuple(
+                    np.load(os.path.join(ruta, f'{campo}.{parte}.npy'), mmap_mode='r')
+                    for parte in ('terminos', 'inicios', 'docs', 'frec')
+                )
+
+    def postings(self, campo, termino, prefijo=False):
+        """(claves, frecuencias) de los documentos con `termino` en `campo`"""
+        if campo not in self._campos:
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int32)
+        vocabulario, inicios, docs, frec = self._campos[campo]
+        desde = np.searchsorted(vocabulario, termino, side='left')
+        # El vocabulario es ASCII: '\x7f' ordena después de cualquier continuación del prefijo
+        hasta = np.searchsorted(vocabulario, termino + '\x7f' if prefijo else termino, side='right')
+        if desde >= hasta:
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int32)
+        inicio, fin = inicios[desde], inicios[hasta]
+        return self.claves[docs[inicio:fin]], frec[inicio:fin]
+
+    def expandir(self, campo):
+        """(términos, docs, frecuencias) de un campo, para fusionar segmentos"""
+        vocabulario, inicios, docs, frec = self._campos[campo]
+        return np.repeat(vocabulario, np.diff(inicios)), np.asarray(docs), np.asarray(frec)
+
+
+def segmentos(directorio=DIRECTORIO_CACHE):
+    carpeta = os.path.join(directorio_busqueda(directorio), 'segmentos')
+    if not os.path.isdir(carpeta):
+        return []
+    return [Segmento(os.path.join(carpeta, n)) for n in sorted(os.listdir(carpeta)) if not n.startswith('.')]
+
+
+def _ruta_version(version, directorio):
+    return os.path.join(directorio_busqueda(directorio), 'versiones', version)
+
+
+def indexado(version, directorio=DIRECTORIO_CACHE):
+    return os.path.isfile(os.path.join(_ruta_version(version, directorio), 'claves.npy'))
+
+
+# ============================================
+# INDEXACIÓN INCREMENTAL
+# ============================================
+class IndexadorBusqueda:
+    """
+    Indexa una versión del libro bloque a bloque (mismos bloques que el almacén
+    de textos); los videos cuyos textos ya están en algún segmento no se
+    vuelven a tokenizar.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, version, directorio=DIRECTORIO_CACHE):
+        self.version = version
+        self.directorio = directorio
+        self._carpeta = os.path.join(directorio_busqueda(directorio), 'segmentos')
+        conocidas = [s.claves for s in segmentos(directorio)]
+        self._conocidas = set(np.concatenate(conocidas).tolist()) if conocidas else set()
+        self._etiquetas, self._claves = [], []
+        self._pendientes_claves = []
+        self._postings = {campo: ([], [], []) for campo in CAMPOS}
+        self.nuevos = 0
+
+    def agregar(self, df):
+        textos = [df[col].tolist() if col in df.columns else [None] * len(df) for col in CAMPOS.values()]
+        for etiqueta, *valores in zip(df.index, *textos):
+            valores = [v if isinstance(v, str) else None for v in valores]
+            clave = clave_documento(valores)
+            self._etiquetas.append(etiqueta)
+            self._claves.append(clave)
+            if clave in self._conocidas:
+                continue
+            self._conocidas.add(clave)
+            doc = len(self._pendientes_claves)
+            self._pendientes_claves.append(clave)
+            for campo, texto in zip(CAMPOS, valores):
+                terminos, docs, frec = self._postings[campo]
+                for termino, veces in Counter(tokens_documento(texto, campo)).items():
+                    terminos.append(termino)
+                    docs.append(doc)
+                    frec.append(veces)
+        if sum(len(p[0]) for p in self._postings.values()) >= LIMITE_POSTINGS:
+            self._vaciar()
+
+    def _vaciar(self):
+        if not self._pendientes_claves:
+            return
+        _escribir_segmento(self._carpeta, self._pendientes_claves, self._postings)
+        self.nuevos += len(self._pendientes_claves)
+        self._pendientes_claves = []
+        self._postings = {campo: ([], [], []) for campo in CAMPOS}
+
+    def cerrar(self):
+        self._vaciar()
+        destino = _ruta_version(self.version, self.directorio)
+        temporal = f'{destino}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(temporal)
+        np.save(os.path.join(temporal, 'etiquetas.npy'), np.asarray(self._etiquetas))
+        np.save(os.path.join(temporal, 'claves.npy'), np.asarray(self._claves, dtype=np.uint64))
+        try:
+            os.replace(temporal, destino)
+        except OSError:
+            # Otro proceso indexó la misma versión primero
+            shutil.rmtree(temporal, ignore_errors=True)
+        with self._lock:
+            _podar_versiones(self.version, self.directorio)
+            if len(segmentos(self.directorio)) > MAX_SEGMENTOS:
+                fusionar_segmentos(self.directorio)
+
+
+def _podar_versiones(actual, directorio):
+    """Conserva la versión actual y las VERSIONES_RETENIDAS - 1 más recientes"""
+    carpeta = os.path.dirname(_ruta_version(actual, directorio))
+    actual = os.path.join(carpeta, actual)
+    versiones = sorted((os.path.join(carpeta, n) for n in os.listdir(carpeta) if not n.endswith('.tmp')),
+                       key=os.path.getmtime, reverse=True)
+    retenidas = {actual, *[v for v in versiones if v != actual][:VERSIONES_RETENIDAS - 1]}
+    for ruta in versiones:
+        if ruta not in retenidas:
+            shutil.rmtree(ruta, ignore_errors=True)
+
+
+def fusionar_segmentos(directorio=DIRECTORIO_CACHE):
+    """Une todos los segmentos en uno, descartando videos que ninguna versión retenida usa"""
+    actuales = segmentos(directorio)
+    carpeta_versiones = os.path.dirname(_ruta_version('x', directorio))
+    vivas = np.unique(np.concatenate([
+        np.load(os.path.join(carpeta_versiones, n, 'claves.npy'))
+        for n in os.listdir(carpeta_versiones) if not n.endswith('.tmp')
+    ] or [np.empty(0, dtype=np.uint64)]))
+
+    claves, postings, base = [], {campo: ([], [], []) for campo in CAMPOS}, 0
+    vistas = set()
+    for segmento in actuales:
+        claves_seg = np.asarray(segmento.claves)
+        # Un mismo video puede estar en dos segmentos si dos procesos indexaron a la vez
+        conservar = np.isin(claves_seg, vivas) & ~np.isin(claves_seg, list(vistas))
+        nuevos_ids = np.full(len(claves_seg), -1, dtype=np.int64)
+        nuevos_ids[conservar] = base + np.arange(conservar.sum())
+        claves.append(claves_seg[conservar])
+        vistas.update(claves_seg[conservar].tolist())
+        base += int(conservar.sum())
+        for campo in CAMPOS:
+            if campo not in segmento._campos:
+                continue
+            terminos, docs, frec = segmento.expandir(campo)
+            ids = nuevos_ids[docs]
+            validos = ids >= 0
+            postings[campo][0].append(terminos[validos])
+            postings[campo][1].append(ids[validos])
+            postings[campo][2].append(frec[validos])
+
+    unidos = {campo: tuple(np.concatenate(p) if p else np.empty(0) for p in partes)
+              for campo, partes in postings.items()}
+    _escribir_segmento(os.path.join(directorio_busqueda(directorio), 'segmentos'),
+                       np.concatenate(claves) if claves else [], unidos)
+    for segmento in actuales:
+        shutil.rmtree(segmento.ruta, ignore_errors=True)
+
+
+def indexar(textos, version, directorio=DIRECTORIO_CACHE, filas_por_bloque=5000):
+    """Indexa una versión desde su almacén de textos (cuando el libro no pasó por la ingesta)"""
+    indexador = IndexadorBusqueda(version, directorio)
+    indice = textos.indice
+    for inicio in range(0, len(indice), filas_por_bloque):
+        etiquetas = indice[inicio:inicio + filas_por_bloque]
+        indexador.agregar(pd.DataFrame({col: textos.serie(col, etiquetas) for col in CAMPOS.values()}))
+    indexador.cerrar()
+
+
+# ============================================
+# CONSULTAS
+# ============================================
+class IndiceBusqueda:
+    """Búsqueda sobre una versión indexada del libro"""
+
+    def __init__(self, version, directorio=DIRECTORIO_CACHE):
+        ruta = _ruta_version(version, directorio)
+        self.etiquetas = np.load(os.path.join(ruta, 'etiquetas.npy'), allow_pickle=True)
+        self.claves = np.load(os.path.join(ruta, 'claves.npy'))
+        self.segmentos = segmentos(directorio)
+
+    def _frecuencias(self, termino, prefijo, campos):
+        """Frecuencia del término por clave de documento (sumada entre campos)"""
+        partes = []
+        for campo in campos:
+            claves, frec = [], []
+            for segmento in self.segmentos:
+                c, f = segmento.postings(campo, termino, prefijo)
+                claves.append(c)
+                frec.append(f)
+            serie = pd.Series(np.concatenate(frec), index=np.concatenate(claves), dtype='float64')
+            # Con prefijo, un documento puede aparecer una vez por término que coincide
+            partes.append(serie.groupby(level=0).sum())
+        return pd.concat(partes).groupby(level=0).sum() if partes else pd.Series(dtype='float64')
+
+    def buscar(self, consulta, campos=tuple(CAMPOS)):
+        """
+        Videos (etiquetas del libro) que contienen todos los términos, con su
+        puntaje TF-IDF, de mayor a menor.
+        """
+        terminos = terminos_consulta(consulta)
+        if not terminos:
+            return pd.Series(dtype='float64', name='Puntaje')
+        total = len(self.claves)
+        puntaje = None
+        for termino, prefijo in terminos:
+            frec = self._frecuencias(termino, prefijo, campos)
+            # Solo documentos de esta versión (los segmentos también guardan videos de versiones anteriores)
+            frec = frec[frec.index.isin(self.claves)]
+            idf = np.log(1 + total / max(len(frec), 1))
+            parcial = idf * frec / (frec + 1.2)
+            puntaje = parcial if puntaje is None else (puntaje + parcial).dropna()
+            if puntaje.empty:
+                return pd.Series(dtype='float64', name='Puntaje')
+
+        en_version = np.isin(self.claves, puntaje.index.to_numpy(dtype=np.uint64))
+        resultado = pd.Series(puntaje.reindex(self.claves[en_version]).to_numpy(),
+                              index=pd.Index(self.etiquetas[en_version]), name='Puntaje')
+        return resultado.sort_values(ascending=False, kind='stable')
+
+
+def comentarios_que_mencionan(texto, consulta):
+    """Comentarios de un video que contienen todos los términos de la consulta"""
+    terminos = terminos_consulta(consulta)
+    coinciden = []
+    for comentario in comentarios(texto):
+        presentes = set(tokens(comentario))
+        if all(t in presentes if not p else any(x.startswith(t) for x in presentes) for t, p in terminos):
+            coinciden.append(comentario)
+    return coinciden
@@ -0,0 +1,313 @@
+"""
+📣 CAMPAÑAS - RESULTADOS REALES DE PAUTA (META ADS) Y ROI OBTENIDO
+Importa las exportaciones de resultados de Meta Ads (CSV/JSON en disco) a
+una tabla columnar con gasto, impresiones y engagement por anuncio, y liga
+cada anuncio al video pautado: por `#` en una columna o en el nombre del
+anuncio ("Pauta #14") o, en último caso, por el video de pauta del plan
+guardado para esa semana. El libro no guarda el enlace de cada publicación,
+así que el enlace del anuncio se conserva pero no sirve para ligarlo. Con eso calcula, en
+forma vectorizada, el CPM y el costo por like obtenidos, el error de la
+proyección de la página de estrategia y los priores corregidos (CPM y
+retención del engagement) que la alimentan. La actualización es
+incremental como la serie de seguidores.
+
+Uso:
+    python -m analitica.campanas campanas/
+
+Entrada (una carpeta por perfil):
+    campanas/<perfil>/*.csv|*.json|*.jsonl     exportaciones del Administrador de anuncios
+
+Salida:
+    campanas/resultados.arrow     una fila por anuncio y período
+    campanas/estado.json          tamaño y fecha de cada archivo ya leído
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from analitica.importar import leer_estado, leer_registros, _fecha, _numero
+from analitica.seguidores import archivos_por_perfil, firma_archivo
+
+log = logging.getLogger(__name__)
+
+DIRECTORIO_CAMPANAS = os.environ.get('DASHBOARD_CAMPANAS', 'campanas')
+ARCHIVO_RESULTADOS = 'resultados.arrow'
+
+# COP por USD para convertir gasto y CPM (la página de estrategia proyecta con CPM en USD)
+TASA_COP_USD = float(os.environ.get('DASHBOARD_TASA_COP_USD', 4500))
+
+# Priores de la proyección cuando aún no hay campañas: CPM en USD y fracción del engagement
+# orgánico (likes por vista) que conserva la audiencia pagada
+CPM_PRIOR_USD = 5.0
+RETENCION_PRIOR = 0.7
+# Campañas "equivalentes" que pesa el prior al combinarlo con lo observado
+PESO_PRIOR = 3
+
+# Un anuncio se liga al video de pauta del plan si empezó a lo sumo estos días después del día planeado
+VENTANA_PLAN_DIAS = 7
+
+# Campo → nombres con que aparece en las exportaciones (en minúsculas, sin la moneda entre paréntesis)
+ALIAS_CAMPANAS = {
+    'campana': ['campaign name', 'nombre de la campaña', 'campaña'],
+    'anuncio': ['ad name', 'nombre del anuncio', 'anuncio'],
+    'inicio': ['reporting starts', 'inicio del informe', 'day', 'día', 'date', 'fecha', 'starts', 'inicio'],
+    'fin': ['reporting ends', 'fin del informe', 'ends', 'fin'],
+    'enlace': ['permalink', 'instagram permalink url', 'post link', 'enlace de la publicación', 'link', 'url'],
+    'video': ['#', 'video', 'video #', 'número de video'],
+    'gasto': ['amount spent', 'importe gastado', 'spend', 'gasto'],
+    'moneda': ['currency', 'divisa', 'moneda'],
+    'impresiones': ['impressions', 'impresiones'],
+    'alcance': ['reach', 'alcance'],
+    'reproducciones': ['thruplays', 'video plays', '3-second video plays', 'reproducciones de video',
+                       'reproducciones de video de 3 segundos', 'reproducciones'],
+    'likes': ['post reactions', 'reacciones a la publicación', 'likes', 'me gusta'],
+    'interacciones': ['post engagement', 'interacciones con la publicación', 'engagement'],
+}
+
+ESQUEMA_RESULTADOS = pa.schema([
+    ('perfil', pa.string()),
+    ('archivo', pa.string()),
+    ('campana', pa.string()),
+    ('anuncio', pa.string()),
+    ('inicio', pa.timestamp('us')),
+    ('fin', pa.timestamp('us')),
+    ('enlace', pa.string()),
+    ('video', pa.float64()),
+    ('moneda', pa.string()),
+    ('gasto', pa.float64()),
+    ('impresiones', pa.float64()),
+    ('alcance', pa.float64()),
+    ('reproducciones', pa.float64()),
+    ('likes', pa.float64()),
+    ('interacciones', pa.float64()),
+])
+
+NUMERICOS = ['video', 'gasto', 'impresiones', 'alcance', 'reproducciones', 'likes', 'interacciones']
+
+
+# ============================================
+# ARCHIVOS → RESULTADOS
+# ============================================
+def _campos(registro):
+    """Campo → valor según ALIAS_CAMPANAS; la moneda también sale del encabezado ('Importe gastado (COP)')"""
+    normalizado = {}
+    moneda = None
+    for clave, valor in registro.items():
+        nombre = str(clave).strip().lower()
+        entre_parentesis = re.search(r'\(([a-z]{3})\)$', nombre)
+        if entre_parentesis:
+            moneda = moneda or entre_parentesis.group(1).upper()
+            nombre = nombre[:entre_parentesis.start()].strip()
+        normalizado.setdefault(nombre, valor)
+    campos = {}
+    for campo, alias in ALIAS_CAMPANAS.items():
+        valor = next((normalizado[a] for a in alias if normalizado.get(a) not in (None, '')), None)
+        if valor is not None:
+            campos[campo] = valor
+    campos.setdefault('moneda', moneda or 'COP')
+    return campos
+
+
+def leer_resultados(ruta, perfil, archivo=None):
+    """Filas de resultados de un archivo (una por anuncio y período reportado)"""
+    filas = []
+    for registro in leer_registros(ruta):
+        campos = _campos(registro)
+        if 'gasto' not in campos or 'inicio' not in campos:
+            continue
+        fila = {'perfil': perfil, 'archivo': archivo or os.path.basename(ruta)}
+        for campo in ('campana', 'anuncio', 'enlace'):
+            fila[campo] = str(campos[campo]).strip() if campo in campos else None
+        fila['moneda'] = str(campos['moneda']).strip().upper()
+        fila['inicio'] = _fecha(campos['inicio'])
+        fila['fin'] = _fecha(campos['fin']) if 'fin' in campos else fila['inicio']
+        for campo in NUMERICOS:
+            fila[campo] = _numero(campos[campo]) if campo in campos else np.nan
+        filas.append(fila)
+    resultados = pd.DataFrame(filas, columns=ESQUEMA_RESULTADOS.names)
+    for campo in ('inicio', 'fin'):
+        resultados[campo] = pd.to_datetime(resultados[campo])
+    return resultados.dropna(subset=['inicio', 'gasto'])
+
+
+def leer_campanas(directorio=DIRECTORIO_CAMPANAS):
+    """Resultados importados (memory-map)"""
+    ruta = os.path.join(directorio, ARCHIVO_RESULTADOS)
+    if not os.path.isfile(ruta):
+        return ESQUEMA_RESULTADOS.empty_table().to_pandas()
+    return feather.read_table(ruta, memory_map=True).to_pandas()
+
+
+def huella_campanas(origen=DIRECTORIO_CAMPANAS):
+    """Cambia si se agrega o modifica alguna exportación (solo `stat`)"""
+    return '|'.join(f'{r}:{firma_archivo(ruta)}' for r, (ruta, _) in sorted(archivos_por_perfil(origen).items()))
+
+
+def actualizar_campanas(origen=DIRECTORIO_CAMPANAS, directorio=None):
+    """
+    Suma los archivos nuevos o modificados; devuelve cuántos leyó. Un
+    archivo modificado reemplaza sus filas anteriores (no se duplican).
+    """
+    directorio = directorio or origen
+    estado = leer_estado(directorio)
+    archivos = archivos_por_perfil(origen)
+    pendientes = {r: a for r, a in archivos.items() if estado.get(r) != firma_archivo(a[0])}
+    if not pendientes:
+        return 0
+
+    anteriores = leer_campanas(directorio)
+    releidos = pd.MultiIndex.from_tuples([(perfil, r) for r, (_, perfil) in pendientes.items()])
+    anteriores = anteriores[~pd.MultiIndex.from_frame(anteriores[['perfil', 'archivo']]).isin(releidos)]
+    nuevos = [leer_resultados(ruta, perfil, r) for r, (ruta, perfil) in pendientes.items()]
+    resultados = pd.concat([anteriores, *nuevos], ignore_index=True).sort_values(['perfil', 'inicio'], kind='stable')
+
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, ARCHIVO_RESULTADOS)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    tabla = pa.Table.from_pandas(resultados, schema=ESQUEMA_RESULTADOS, preserve_index=False)
+    feather.write_feather(tabla, temporal, compression='uncompressed')
+    os.replace(temporal, destino)
+
+    # El estado va después de la tabla: si se corta antes, los archivos se vuelven a leer
+    estado.update({r: firma_archivo(ruta) for r, (ruta, _) in pendientes.items()})
+    temporal = os.path.join(directorio, f'.estado.{os.getpid()}.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, indent=0)
+    os.replace(temporal, os.path.join(directorio, 'estado.json'))
+    return len(pendientes)
+
+
+# ============================================
+# ANUNCIO ↔ VIDEO PAUTADO
+# ============================================
+def vincular_campanas(resultados, df, pautas_planeadas=None):
+    """
+    Agrega a cada anuncio el `#` del video pautado y cómo se ligó
+    (`Vínculo`): `#` explícito, `#` en el nombre o plan de la semana.
+    `pautas_planeadas` tiene `fecha` y `video` (los días de pauta de los planes guardados).
+    """
+    resultados = resultados.copy()
+    video = resultados['video'].astype('float64')
+    vinculo = pd.Series(np.where(video.notna(), 'Columna #', None), index=resultados.index, dtype=object)
+
+    nombres = resultados['anuncio'].fillna('') + ' ' + resultados['campana'].fillna('')
+    por_nombre = pd.to_numeric(nombres.str.extract(r'#\s*(\d+)', expand=False), errors='coerce')
+    usar = video.isna() & por_nombre.notna()
+    video, vinculo = video.mask(usar, por_nombre), vinculo.mask(usar, 'Nombre')
+
+    if pautas_planeadas is not None and not pautas_planeadas.empty and video.isna().any():
+        planeadas = (pautas_planeadas.assign(fecha=pd.to_datetime(pautas_planeadas['fecha']).astype('datetime64[us]'))
+                     .sort_values('fecha')[['fecha', 'video']])
+        sueltos = resultados.loc[video.isna(), ['inicio']].astype('datetime64[us]').reset_index()
+        del_plan = pd.merge_asof(sueltos.sort_values('inicio'), planeadas, left_on='inicio', right_on='fecha',
+                                 direction='backward', tolerance=pd.Timedelta(days=VENTANA_PLAN_DIAS))
+        del_plan = del_plan.set_index('index')['video'].reindex(resultados.index)
+        usar = video.isna() & del_plan.notna()
+        video, vinculo = video.mask(usar, del_plan), vinculo.mask(usar, 'Plan semanal')
+
+    # Solo cuentan los `#` que existen en el dataset del perfil
+    valido = video.isin(df['#'].to_numpy(dtype='float64'))
+    resultados['video'] = video.where(valido)
+    resultados['Vínculo'] = vinculo.where(valido)
+    return resultados
+
+
+# ============================================
+# ROI OBTENIDO Y PRIORES
+# ============================================
+def gasto_cop(resultados):
+    return resultados['gasto'] * np.where(resultados['moneda'] == 'USD', TASA_COP_USD, 1.0)
+
+
+def proyectar_pauta(presupuesto_cop, cpm_usd, likes_por_vista, retencion):
+    """Vistas y likes que la página de estrategia proyecta para un presupuesto (vectorizado)"""
+    vistas = np.asarray(presupuesto_cop, dtype='float64') / TASA_COP_USD / np.asarray(cpm_usd) * 1000
+    return vistas, vistas * np.asarray(likes_por_vista, dtype='float64') * retencion
+
+
+def roi_campanas(resultados, df, cpm_prior_usd=CPM_PRIOR_USD, retencion_prior=RETENCION_PRIOR):
+    """
+    Una fila por campaña y video pautado (sumando los períodos reportados):
+    CPM y costo por like obtenidos (COP), retención del engagement frente al
+    orgánico del video y error relativo de la proyección con los priores
+    dados (positivo = la proyección se pasó).
+    """
+    ligados = resultados[resultados['video'].notna()].assign(
+        gasto_cop=lambda r: gasto_cop(r), campana=lambda r: r['campana'].fillna('(sin nombre)'))
+    campanas = ligados.groupby(['perfil', 'campana', 'video'], sort=False).agg(
+        inicio=('inicio', 'min'), vinculo=('Vínculo', 'first'), gasto=('gasto_cop', 'sum'),
+        impresiones=('impresiones', 'sum'), likes=('likes', 'sum')).reset_index()
+
+    organico = df.set_index(df['#'].astype('float64'))
+    likes_por_vista = (organico['Likes'] / organico['Reproducciones']).reindex(campanas['video']).to_numpy()
+    gasto = campanas['gasto'].to_numpy()
+    impresiones = campanas['impresiones'].to_numpy(dtype='float64')
+    likes = campanas['likes'].to_numpy(dtype='float64')
+    vistas_proy, likes_proy = proyectar_pauta(gasto, cpm_prior_usd, likes_por_vista, retencion_prior)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = pd.DataFrame({
+            'Perfil': campanas['perfil'],
+            'Video': campanas['video'].astype(int),
+            'Inicio': campanas['inicio'],
+            'Campaña': campanas['campana'],
+            'Vínculo': campanas['vinculo'],
+            'Gasto_COP': gasto,
+            'Impresiones': impresiones,
+            'Likes': likes,
+            'Likes_Esperados': impresiones * likes_por_vista,
+            'CPM_COP': gasto / impresiones * 1000,
+            'Costo_por_Like': gasto / likes,
+            'Retencion': likes / (impresiones * likes_por_vista),
+            'Vistas_Proyectadas': vistas_proy,
+            'Likes_Proyectados': likes_proy,
+            'Error_Vistas': (vistas_proy - impresiones) / impresiones,
+            'Error_Likes': (likes_proy - likes) / likes,
+        })
+    return roi.replace([np.inf, -np.inf], np.nan)
+
+
+def priores_pauta(roi, cpm_prior_usd=CPM_PRIOR_USD, retencion_prior=RETENCION_PRIOR, peso_prior=PESO_PRIOR):
+    """
+    CPM (USD) y retención para las proyecciones, corregidos con lo obtenido:
+    razón de totales de las campañas (pesa más la que más gastó), combinada
+    con el prior como si valiera `peso_prior` campañas. Sin campañas, el prior.
+    """
+    validas = roi.dropna(subset=['CPM_COP', 'Retencion'])
+    n = len(validas)
+    if n == 0:
+        return {'cpm_usd': cpm_prior_usd, 'retencion': retencion_prior, 'campanas': 0}
+    cpm_obtenido = validas['Gasto_COP'].sum() / validas['Impresiones'].sum() * 1000 / TASA_COP_USD
+    retencion_obtenida = validas['Likes'].sum() / validas['Likes_Esperados'].sum()
+    peso = n / (n + peso_prior)
+    return {
+        'cpm_usd': float(peso * cpm_obtenido + (1 - peso) * cpm_prior_usd),
+        'retencion': float(peso * retencion_obtenida + (1 - peso) * retencion_prior),
+        'campanas': n,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa resultados de Meta Ads (solo archivos nuevos o modificados)")
+    parser.add_argument('origen', nargs='?', default=DIRECTORIO_CAMPANAS, help="Carpeta con una subcarpeta por perfil")
+    parser.add_argument('--salida', default=None, help="Carpeta de la tabla (por defecto, la misma de origen)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    leidos = actualizar_campanas(args.origen, args.salida)
+    resultados = leer_campanas(args.salida or args.origen)
+    log.info("%d archivos nuevos o modificados; %d filas de %d perfiles",
+             leidos, len(resultados), resultados['perfil'].nunique())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+✍️ CAPTIONS - RASGOS DEL TEXTO Y SU EFECTO EN EL ALCANCE
+Extrae en una sola pasada vectorizada (métodos `.str` de pandas, sin recorrer
+filas en Python) los rasgos de `Descripción/Caption`: hashtags, menciones,
+longitud, preguntas, llamados a la acción y emojis. El lift de cada rasgo y
+de cada hashtag se calcula con sumas por grupo (formato largo + un groupby),
+así escala a miles de publicaciones y hashtags.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Tramos de longitud del caption (caracteres)
+CORTES_LONGITUD = [0, 100, 300, 600, np.inf]
+ETIQUETAS_LONGITUD = ['Corto (<100)', 'Medio (100-300)', 'Largo (300-600)', 'Muy largo (600+)']
+
+HASHTAG = r'#(\w+)'
+MENCION = r'@[\w.]+'
+# Llamados a la acción habituales (sobre el texto en minúsculas y sin tildes)
+CTA = (r'\b(?:comenta\w*|dejame|dejanos|cuentame|cuentanos|comparte\w*|guarda\w*|siguem\w*|siguenos|etiqueta\w*|'
+       r'link en (?:la )?bio|enlace en (?:la )?bio|escribe(?:me|nos)|dale like|suscribete|unete|inscribete|participa)\b')
+# Pictogramas y símbolos; los modificadores de tono de piel (U+1F3FB-1F3FF) no cuentan como emoji aparte
+EMOJI = '[\U0001F300-\U0001F3FA\U0001F400-\U0001FAFF\u2600-\u27BF\U0001F1E6-\U0001F1FF]'
+
+# Rasgo binario → columna de `extraer_rasgos` que lo define
+RASGOS = {
+    'Con hashtags': 'Hashtags',
+    'Con menciones': 'Menciones',
+    'Con pregunta': 'Pregunta',
+    'Con llamado a la acción': 'CTA',
+    'Con emojis': 'Emojis',
+}
+
+
+def _plegar(serie):
+    """Minúsculas y sin tildes, vectorizado ('Bolívar' → 'bolivar')"""
+    return (serie.str.normalize('NFKD').str.encode('ascii', errors='ignore')
+            .str.decode('ascii').str.lower())
+
+
+def extraer_rasgos(captions):
+    """
+    Rasgos por publicación: conteos de hashtags/menciones/emojis, longitud y
+    su tramo, presencia de pregunta y de llamado a la acción, y la lista de
+    hashtags normalizados (sin tildes ni mayúsculas).
+    """
+    texto = captions.astype('string').fillna('')
+    plegado = _plegar(texto)
+    longitud = texto.str.len()
+    return pd.DataFrame({
+        'Longitud': longitud.astype('int32'),
+        'Tramo_Longitud': pd.cut(longitud, bins=CORTES_LONGITUD, labels=ETIQUETAS_LONGITUD, right=False),
+        'Palabras': texto.str.count(r'\S+').astype('int32'),
+        'Hashtags': texto.str.count(HASHTAG).astype('int32'),
+        'Menciones': texto.str.count(MENCION).astype('int32'),
+        'Emojis': texto.str.count(EMOJI).astype('int32'),
+        'Pregunta': texto.str.contains('?', regex=False).astype(bool),
+        'CTA': plegado.str.contains(CTA, regex=True).astype(bool),
+        'Lista_Hashtags': plegado.str.findall(HASHTAG).map(lambda h: sorted(set(h))),
+    }, index=captions.index)
+
+
+def _lift(largo, df, min_videos):
+    """
+    Lift de cada grupo frente al resto de publicaciones.
+
+    `largo` tiene una fila por (publicación, grupo). Vistas: cociente de medias
+    geométricas (robusto a virales); Quality_Score: diferencia de medias. Las
+    sumas del resto salen de los totales, sin recorrer cada grupo.
+    """
+    log_vistas = np.log1p(df['Reproducciones'].astype('float64'))
+    qs = df['Quality_Score'].astype('float64')
+    largo = largo.join(pd.DataFrame({'log_vistas': log_vistas, 'qs': qs}), on='etiqueta')
+    grupos = largo.groupby('Grupo', observed=True).agg(
+        Videos=('log_vistas', 'size'),
+        suma_log=('log_vistas', 'sum'),
+        suma_qs=('qs', 'sum'),
+        mediana_log=('log_vistas', 'median'),
+    )
+    n, total_log, total_qs = len(df), log_vistas.sum(), qs.sum()
+    resto = n - grupos['Videos']
+    con = grupos['suma_log'] / grupos['Videos']
+    sin = (total_log - grupos['suma_log']) / resto.where(resto > 0)
+    qs_con = grupos['suma_qs'] / grupos['Videos']
+    qs_sin = (total_qs - grupos['suma_qs']) / resto.where(resto > 0)
+
+    resultado = pd.DataFrame({
+        'Videos': grupos['Videos'],
+        'Mediana_Vistas': np.expm1(grupos['mediana_log']),
+        'Lift_Vistas': np.expm1(con - sin) * 100,
+        'Quality_Score': qs_con,
+        'Lift_QS': qs_con - qs_sin,
+    })
+    resultado = resultado[resultado['Videos'] >= min_videos]
+    return resultado.sort_values('Lift_Vistas', ascending=False).rename_axis('Grupo').reset_index()
+
+
+def lift_rasgos(df, rasgos, min_videos=3):
+    """Lift en vistas (%) y Quality_Score (puntos) de cada rasgo binario y tramo de longitud"""
+    presentes = pd.DataFrame({nombre: rasgos[col] > 0 for nombre, col in RASGOS.items()}, index=rasgos.index)
+    largo = presentes.rename_axis('etiqueta').reset_index().melt(id_vars='etiqueta', var_name='Grupo')
+    largo = largo.loc[largo['value'], ['etiqueta', 'Grupo']]
+    tramos = rasgos['Tramo_Longitud'].rename('Grupo').rename_axis('etiqueta').reset_index()
+    largo = pd.concat([largo, tramos.dropna().astype({'Grupo': 'string'})], ignore_index=True)
+    return _lift(largo, df, min_videos)
+
+
+def lift_hashtags(df, rasgos, min_videos=3):
+    """Lift de cada hashtag (normalizado) frente a las publicaciones que no lo usan"""
+    largo = rasgos['Lista_Hashtags'].explode().dropna().rename('Grupo').rename_axis('etiqueta').reset_index()
+    if largo.empty:
+        return pd.DataFrame(columns=['Grupo', 'Videos', 'Mediana_Vistas', 'Lift_Vistas', 'Quality_Score', 'Lift_QS'])
+    largo['Grupo'] = '#' + largo['Grupo'].astype('string')
+    return _lift(largo, df, min_videos)
+
+
+def resumen_caption(rasgos):
+    """Texto corto por publicación ('#3 @1 ❓ 📣 😀5') para mostrar junto al caption"""
+    partes = [
+        np.where(rasgos['Hashtags'] > 0, '#' + rasgos['Hashtags'].astype(str), ''),
+        np.where(rasgos['Menciones'] > 0, '@' + rasgos['Menciones'].astype(str), ''),
+        np.where(rasgos['Pregunta'], '❓', ''),
+        np.where(rasgos['CTA'], '📣', ''),
+        np.where(rasgos['Emojis'] > 0, '😀' + rasgos['Emojis'].astype(str), ''),
+    ]
+    return pd.Series([' '.join(p for p in fila if p) for fila in zip(*partes)], index=rasgos.index)
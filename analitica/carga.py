@@ -0,0 +1,367 @@
+"""
+🏋️ CARGA - PRUEBA DE CARGA CON SESIONES CONCURRENTES
+Levanta el dashboard en un servidor local (o usa uno ya levantado) y abre
+muchas sesiones sin navegador que hablan el mismo protocolo que el
+frontend: websocket `/_stcore/stream` con mensajes protobuf. Cada sesión
+recorre las páginas y repite interacciones reales (cambiar la métrica, los
+filtros del Explorador, el presupuesto de pauta) con pausas de lectura.
+Por escalón de concurrencia reporta percentiles de latencia de los reruns,
+reruns por segundo y memoria del servidor por sesión. Todo corre local,
+sin red.
+
+Uso:
+    python -m analitica.carga --escalones 1,5,10,20 --duracion 30
+    python -m analitica.carga --url http://127.0.0.1:8501 --pid 12345 --escalones 10
+
+Salida:
+    una tabla por escalón (reruns/s, p50/p90/p99 en ms, MB por sesión) y otra por página y acción
+    --detalle reruns.csv     un rerun por fila
+"""
+
+import argparse
+import asyncio
+import logging
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+from analitica.sesiones import memoria_proceso_mb
+
+log = logging.getLogger(__name__)
+
+PUERTO = 8599
+SCRIPT = 'Home.py'
+RUTA_STREAM = '/_stcore/stream'
+RUTA_SALUD = '/_stcore/health'
+
+# Interacciones por página: etiqueta del widget → rango de valores a probar (None: los del propio widget).
+# Solo widgets de lectura: el checklist y los planes escriben en disco.
+ESCENARIOS = {
+    'Home': {},
+    'Dashboard Analisis': {
+        'Selecciona la métrica:': None,
+        'Ver correlación con Vistas:': None,
+        'Ordenar por': None,
+        'Mínimo de Vistas': (0, 20000),
+        'Mínimo Quality Score': None,
+    },
+    'Dashboard Estrategia': {
+        'Clips diarios TikTok/FB': None,
+        'Clips diarios Instagram': None,
+        'Presupuesto (COP)': (50000, 500000),
+        'CPM estimado ($)': (2.0, 10.0),
+        'Diversificar': None,
+    },
+}
+
+# Probabilidad de ir a cada página al navegar (el análisis es la más visitada)
+PESOS_PAGINA = {'Home': 0.15, 'Dashboard Analisis': 0.5, 'Dashboard Estrategia': 0.35}
+
+# Interacciones por visita (mín, máx) y pausa media de lectura entre acciones
+INTERACCIONES_POR_VISITA = (2, 6)
+PAUSA_SEG = 1.0
+
+TIEMPO_MAXIMO_RERUN_SEG = 120
+PERCENTILES = [50, 90, 99]
+
+
+# ============================================
+# SERVIDOR LOCAL
+# ============================================
+@contextmanager
+def servidor_local(puerto=PUERTO, script=SCRIPT, espera_seg=90):
+    """Corre `streamlit run` en localhost mientras dure el bloque; entrega el pid del servidor"""
+    comando = [sys.executable, '-m', 'streamlit', 'run', script,
+               '--server.headless=true', f'--server.port={puerto}', '--server.address=127.0.0.1',
+               '--server.fileWatcherType=none', '--browser.gatherUsageStats=false']
+    proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        limite = time.monotonic() + espera_seg
+        while not _responde(f'http://127.0.0.1:{puerto}'):
+            if proceso.poll() is not None:
+                raise RuntimeError(f"El servidor terminó al arrancar (código {proceso.returncode})")
+            if time.monotonic() > limite:
+                raise RuntimeError(f"El servidor no respondió en {espera_seg} s")
+            time.sleep(0.25)
+        yield proceso.pid
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+
+def _responde(url):
+    try:
+        with urllib.request.urlopen(url + RUTA_SALUD, timeout=1) as respuesta:
+            return respuesta.status == 200
+    except OSError:
+        return False
+
+
+def url_websocket(url):
+    return url.replace('http://', 'ws://', 1).replace('https://', 'wss://', 1).rstrip('/') + RUTA_STREAM
+
+
+# ============================================
+# WIDGETS
+# ============================================
+def _nuevo_valor(tipo, widget, rango, rng):
+    """Un valor al azar dentro de lo que acepta el widget (o del `rango` dado)"""
+    if tipo == 'selectbox':
+        return str(rng.choice(list(widget.options)))
+    if tipo == 'checkbox':
+        return bool(rng.random() < 0.5)
+    if rango is None:
+        if tipo == 'number_input' and not widget.has_max:
+            rango = (widget.min if widget.has_min else 0, max(widget.default, widget.step or 1) * 10)
+        else:
+            rango = (widget.min, widget.max)
+    paso = widget.step or 1
+    minimo, maximo = rango
+    return float(minimo + np.round(rng.uniform(0, maximo - minimo) / paso) * paso)
+
+
+def _estado_widget(tipo, id_widget, valor):
+    estado = WidgetState(id=id_widget)
+    if tipo == 'selectbox':
+        estado.string_value = valor
+    elif tipo == 'checkbox':
+        estado.bool_value = valor
+    elif tipo == 'slider':
+        estado.double_array_value.data[:] = [valor]
+    else:
+        estado.double_value = valor
+    return estado
+
+
+# ============================================
+# SESIÓN VIRTUAL
+# ============================================
+class SesionVirtual:
+    """Una pestaña del navegador: una conexión, su página actual y los valores que cambió"""
+
+    def __init__(self, numero, url_ws, paginas, registros, rng, pausa_seg=PAUSA_SEG):
+        self.numero = numero
+        self.url_ws = url_ws
+        self.paginas = paginas
+        self.registros = registros
+        self.rng = rng
+        self.pausa_seg = pausa_seg
+        self.pagina = None
+        # Widgets de la última ejecución (etiqueta → (tipo, proto)) y valores elegidos por etiqueta
+        self.widgets = {}
+        self.valores = {}
+        self._ws = None
+
+    async def rerun(self, accion):
+        """Pide una ejecución de la página actual con los valores de sus widgets y espera a que termine"""
+        mensaje = BackMsg()
+        rerun = mensaje.rerun_script
+        rerun.page_script_hash = self.paginas[self.pagina]
+        rerun.widget_states.widgets.extend(
+            _estado_widget(self.widgets[etiqueta][0], self.widgets[etiqueta][1].id, valor)
+            for etiqueta, valor in self.valores.items() if etiqueta in self.widgets)
+
+        inicio = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+        widgets, recibidos, excepciones = {}, 0, 0
+        while True:
+            crudo = await asyncio.wait_for(self._ws.recv(), TIEMPO_MAXIMO_RERUN_SEG)
+            recibidos += len(crudo)
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(crudo)
+            tipo = respuesta.WhichOneof('type')
+            if tipo == 'script_finished':
+                break
+            if tipo != 'delta' or respuesta.delta.WhichOneof('type') != 'new_element':
+                continue
+            elemento = respuesta.delta.new_element
+            tipo_elemento = elemento.WhichOneof('type')
+            if tipo_elemento == 'exception':
+                excepciones += 1
+            elif tipo_elemento in ('selectbox', 'slider', 'number_input', 'checkbox'):
+                widget = getattr(elemento, tipo_elemento)
+                widgets[widget.label] = (tipo_elemento, widget)
+
+        self.registros.append({'Sesión': self.numero, 'Página': self.pagina, 'Acción': accion,
+                               'Inicio': inicio, 'Latencia_ms': (time.perf_counter() - inicio) * 1000,
+                               'KB': recibidos / 1024, 'Excepciones': excepciones})
+        self.widgets = widgets
+
+    async def visitar(self, pagina):
+        """Navega a otra página (sus widgets arrancan en los valores por defecto)"""
+        self.pagina = pagina
+        self.valores = {}
+        await self.rerun('Cargar página')
+
+    async def interactuar(self):
+        candidatos = [e for e in ESCENARIOS.get(self.pagina, {}) if e in self.widgets]
+        if not candidatos:
+            return
+        etiqueta = candidatos[self.rng.integers(len(candidatos))]
+        tipo, widget = self.widgets[etiqueta]
+        self.valores[etiqueta] = _nuevo_valor(tipo, widget, ESCENARIOS[self.pagina][etiqueta], self.rng)
+        await self.rerun(etiqueta)
+
+    async def recorrer(self, hasta, retraso=0.0):
+        """Navega e interactúa hasta el instante `hasta` (reloj monotónico); False si se cayó la conexión"""
+        await asyncio.sleep(retraso)
+        nombres = [p for p in PESOS_PAGINA if p in self.paginas]
+        pesos = np.array([PESOS_PAGINA[p] for p in nombres])
+        try:
+            async with connect(self.url_ws, subprotocols=['streamlit'], max_size=None) as self._ws:
+                while time.monotonic() < hasta:
+                    await self.visitar(nombres[self.rng.choice(len(nombres), p=pesos / pesos.sum())])
+                    for _ in range(self.rng.integers(*INTERACCIONES_POR_VISITA, endpoint=True)):
+                        await asyncio.sleep(self.rng.exponential(self.pausa_seg))
+                        if time.monotonic() >= hasta:
+                            break
+                        await self.interactuar()
+        except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+            log.warning("Sesión %d caída: %s", self.numero, e or type(e).__name__)
+            return False
+        return True
+
+
+async def descubrir_paginas(url_ws):
+    """Nombre → hash de cada página de la app (del mensaje de navegación del primer rerun)"""
+    async with connect(url_ws, subprotocols=['streamlit'], max_size=None) as ws:
+        await ws.send(BackMsg(rerun_script={}).SerializeToString())
+        paginas = {}
+        while True:
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(await asyncio.wait_for(ws.recv(), TIEMPO_MAXIMO_RERUN_SEG))
+            tipo = respuesta.WhichOneof('type')
+            if tipo == 'navigation':
+                paginas = {p.page_name: p.page_script_hash for p in respuesta.navigation.app_pages}
+            elif tipo == 'script_finished':
+                return paginas
+
+
+# ============================================
+# ESCALONES DE CONCURRENCIA
+# ============================================
+async def escalon(url_ws, paginas, sesiones, duracion_seg, pid=None, rampa_seg=5.0, pausa_seg=PAUSA_SEG,
+                  semilla=0):
+    """
+    `sesiones` sesiones simultáneas durante `duracion_seg` (arrancan repartidas
+    en `rampa_seg`). Devuelve los reruns, las sesiones caídas y la memoria del
+    servidor antes y en el pico (MB; None sin `pid`).
+    """
+    registros = []
+    hasta = time.monotonic() + rampa_seg + duracion_seg
+    base = memoria_proceso_mb(pid) if pid else None
+    muestras = []
+
+    async def muestrear():
+        while time.monotonic() < hasta:
+            muestras.append(memoria_proceso_mb(pid))
+            await asyncio.sleep(0.5)
+
+    recorridos = [SesionVirtual(i, url_ws, paginas, registros, np.random.default_rng([semilla, sesiones, i]),
+                                pausa_seg).recorrer(hasta, retraso=i * rampa_seg / sesiones)
+                  for i in range(sesiones)]
+    if pid:
+        recorridos.append(muestrear())
+    resultados = await asyncio.gather(*recorridos)
+    caidas = sum(r is False for r in resultados)
+    pico = max((m for m in muestras if m is not None), default=None)
+    return pd.DataFrame(registros), caidas, base, pico
+
+
+def _percentiles(latencias):
+    return pd.Series({f'p{p}_ms': np.percentile(latencias, p) for p in PERCENTILES})
+
+
+def resumir_escalon(reruns, sesiones, duracion_seg, caidas, base_mb, pico_mb):
+    """Una fila por escalón: throughput, percentiles de latencia y memoria por sesión"""
+    fila = {'Sesiones': sesiones, 'Reruns': len(reruns), 'Reruns/s': len(reruns) / duracion_seg,
+            **(_percentiles(reruns['Latencia_ms']) if len(reruns) else {}),
+            'Excepciones': int(reruns['Excepciones'].sum()) if len(reruns) else 0, 'Caídas': caidas,
+            'MB servidor': pico_mb,
+            'MB/sesión': (pico_mb - base_mb) / sesiones if pico_mb is not None and base_mb is not None else None}
+    return fila
+
+
+def resumir_acciones(reruns):
+    """Percentiles de latencia por escalón, página y acción"""
+    grupos = reruns.groupby(['Sesiones', 'Página', 'Acción'], sort=False)['Latencia_ms']
+    tabla = grupos.apply(_percentiles).unstack()
+    tabla.insert(0, 'Reruns', grupos.size())
+    return tabla.reset_index()
+
+
+async def prueba_carga(url, escalones, duracion_seg, pid=None, rampa_seg=5.0, pausa_seg=PAUSA_SEG, semilla=0):
+    """Corre los escalones en orden; (resumen por escalón, todos los reruns)"""
+    url_ws = url_websocket(url)
+    paginas = await descubrir_paginas(url_ws)
+    # Calentamiento: una sesión carga cada página para que el primer escalón no mida la carga en frío
+    calentamiento = SesionVirtual(-1, url_ws, paginas, [], np.random.default_rng(semilla), pausa_seg)
+    async with connect(url_ws, subprotocols=['streamlit'], max_size=None) as calentamiento._ws:
+        for pagina in paginas:
+            await calentamiento.visitar(pagina)
+
+    filas, detalle = [], []
+    for sesiones in escalones:
+        log.info("Escalón de %d sesiones durante %d s...", sesiones, duracion_seg)
+        reruns, caidas, base, pico = await escalon(url_ws, paginas, sesiones, duracion_seg, pid, rampa_seg,
+                                                   pausa_seg, semilla)
+        # Solo cuenta la ventana con todas las sesiones abiertas (fuera la rampa)
+        if len(reruns):
+            reruns = reruns[reruns['Inicio'] >= reruns['Inicio'].min() + rampa_seg].assign(Sesiones=sesiones)
+        filas.append(resumir_escalon(reruns, sesiones, duracion_seg, caidas, base, pico))
+        detalle.append(reruns)
+    return pd.DataFrame(filas), pd.concat(detalle, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del dashboard con sesiones concurrentes")
+    parser.add_argument('--url', default=None,
+                        help="Servidor ya levantado (por defecto se levanta uno local con Home.py)")
+    parser.add_argument('--pid', type=int, default=None, help="Pid del servidor de --url, para medir su memoria")
+    parser.add_argument('--puerto', type=int, default=PUERTO, help="Puerto del servidor local")
+    parser.add_argument('--escalones', default='1,5,10,20', help="Sesiones simultáneas por escalón")
+    parser.add_argument('--duracion', type=float, default=30, help="Segundos medidos por escalón")
+    parser.add_argument('--rampa', type=float, default=5, help="Segundos para abrir las sesiones de un escalón")
+    parser.add_argument('--pausa', type=float, default=PAUSA_SEG, help="Pausa media entre acciones (s)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--detalle', default=None, help="CSV con un rerun por fila")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    escalones = [int(e) for e in args.escalones.split(',')]
+
+    def correr(url, pid):
+        return asyncio.run(prueba_carga(url, escalones, args.duracion, pid, args.rampa, args.pausa, args.semilla))
+
+    if args.url:
+        resumen, reruns = correr(args.url, args.pid)
+    else:
+        with servidor_local(args.puerto) as pid:
+            resumen, reruns = correr(f'http://127.0.0.1:{args.puerto}', pid)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.1f}'.format):
+        print(resumen.to_string(index=False))
+        if len(reruns):
+            print()
+            print(resumir_acciones(reruns).to_string(index=False))
+    if args.detalle:
+        reruns.to_csv(args.detalle, index=False)
+        log.info("Detalle en %s", args.detalle)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
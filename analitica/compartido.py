@@ -0,0 +1,203 @@
+"""
+🔗 COMPARTIDO - DATASET EN MEMORIA COMPARTIDA ENTRE WORKERS
+Modo multi-worker: un proceso cargador lee `datos.xlsx` una vez y publica los
+DataFrames como archivos memory-mapped (un `.npy` por columna); cada worker
+de Streamlit se adjunta sin copiar, y el sistema operativo comparte las
+páginas entre procesos, así la memoria no crece al sumar workers.
+
+Uso:
+    python -m analitica.compartido --vigilar 30      # cargador
+    DASHBOARD_COMPARTIDO=1 streamlit run Home.py     # cada worker
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analitica.datos import DIRECTORIO_CACHE, RUTA_DATOS, preparar_instagram, version_dataset
+
+log = logging.getLogger(__name__)
+
+MODO_COMPARTIDO = os.environ.get('DASHBOARD_COMPARTIDO', '') not in ('', '0')
+
+
+def directorio_compartido(version, directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, 'compartido', version)
+
+
+def marca_dataset(ruta=RUTA_DATOS):
+    """Orden de las versiones: mtime del libro del que salieron"""
+    return os.stat(ruta).st_mtime_ns
+
+
+def marcar_version(version, marca, directorio=DIRECTORIO_CACHE):
+    """Guarda la marca de la versión si aún no tiene (la primera publicación manda)"""
+    carpeta = directorio_compartido(version, directorio)
+    os.makedirs(carpeta, exist_ok=True)
+    try:
+        with open(os.path.join(carpeta, 'orden'), 'x', encoding='utf-8') as f:
+            f.write(str(marca))
+    except FileExistsError:
+        pass
+
+
+def _marca(carpeta):
+    try:
+        with open(os.path.join(carpeta, 'orden'), encoding='utf-8') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        # Sin marca (a medio publicar o anterior a las marcas): cuenta como la más vieja
+        return -1
+
+
+# ============================================
+# PUBLICAR / ADJUNTAR
+# ============================================
+def _arreglo(serie):
+    """Arreglo de numpy que se puede memory-mapear, o None si la columna es de objetos"""
+    valores = serie.to_numpy()
+    if valores.dtype.kind in 'biufcmM':
+        return np.ascontiguousarray(valores)
+    return None
+
+
+def publicar(df, nombre, version, directorio=DIRECTORIO_CACHE):
+    """Escribe `df` como `<version>/<nombre>/` (columnas en .npy + metadatos) y devuelve la ruta"""
+    destino = os.path.join(directorio_compartido(version, directorio), nombre)
+    if os.path.isdir(destino):
+        return destino
+
+    temporal = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+    os.makedirs(temporal, exist_ok=True)
+    columnas = []
+    for i, columna in enumerate(df.columns):
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(temporal, f'{i}.npy'), np.ascontiguousarray(serie.cat.codes.to_numpy()))
+            columnas.append((columna, 'categoria', (serie.cat.categories, serie.cat.ordered)))
+            continue
+        arreglo = _arreglo(serie)
+        if arreglo is not None:
+            np.save(os.path.join(temporal, f'{i}.npy'), arreglo)
+            columnas.append((columna, 'arreglo', None))
+        else:
+            # Texto corto u objetos mixtos: pocos bytes, viajan en los metadatos
+            columnas.append((columna, 'objeto', serie.to_numpy(dtype=object)))
+    with open(os.path.join(temporal, 'meta.pkl'), 'wb') as f:
+        pickle.dump({'indice': df.index, 'columnas': columnas}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    try:
+        os.replace(temporal, destino)
+    except OSError:
+        # Otro proceso publicó la misma versión primero
+        shutil.rmtree(temporal, ignore_errors=True)
+    return destino
+
+
+def adjuntar(nombre, version, directorio=DIRECTORIO_CACHE):
+    """DataFrame de solo lectura respaldado por los archivos publicados (sin copiar)"""
+    ruta = os.path.join(directorio_compartido(version, directorio), nombre)
+    with open(os.path.join(ruta, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+
+    datos = {}
+    for i, (columna, tipo, extra) in enumerate(meta['columnas']):
+        if tipo == 'objeto':
+            datos[columna] = pd.Series(extra, index=meta['indice'], name=columna)
+            continue
+        # Vista ndarray sobre el memmap (la subclase np.memmap se propagaría a los resultados)
+        arreglo = np.asarray(np.load(os.path.join(ruta, f'{i}.npy'), mmap_mode='r'))
+        if tipo == 'categoria':
+            categorias, ordenada = extra
+            valores = pd.Categorical.from_codes(arreglo, categories=categorias, ordered=ordenada, validate=False)
+        else:
+            valores = arreglo
+        datos[columna] = pd.Series(valores, index=meta['indice'], name=columna, copy=False)
+    return pd.DataFrame(datos, index=meta['indice'], copy=False)
+
+
+def publicado(nombre, version, directorio=DIRECTORIO_CACHE):
+    return os.path.isfile(os.path.join(directorio_compartido(version, directorio), nombre, 'meta.pkl'))
+
+
+def compartir(nombre, version, calcular, directorio=DIRECTORIO_CACHE, ruta=RUTA_DATOS):
+    """
+    En modo compartido se adjunta a lo publicado (publicándolo si el cargador
+    aún no lo hizo); fuera de ese modo solo calcula.
+    """
+    if not MODO_COMPARTIDO:
+        return calcular(version)
+    if not publicado(nombre, version, directorio):
+        log.info("%s (%s) no publicado aún: se calcula en este worker", nombre, version)
+        # Si el libro cambió mientras tanto, la marca empata con la versión nueva y ninguna borra a la otra
+        marcar_version(version, marca_dataset(ruta), directorio)
+        publicar(calcular(version), nombre, version, directorio)
+        limpiar_versiones(version, directorio)
+    return adjuntar(nombre, version, directorio)
+
+
+def limpiar_versiones(version, directorio=DIRECTORIO_CACHE):
+    """
+    Borra las versiones anteriores a `version` según su marca; nunca la más
+    nueva, aunque la haya publicado otro worker (los que aún tienen mapeada
+    una versión borrada no se ven afectados en POSIX).
+    """
+    carpeta = os.path.dirname(directorio_compartido(version, directorio))
+    marcas = {nombre: _marca(os.path.join(carpeta, nombre))
+              for nombre in os.listdir(carpeta) if not nombre.endswith('.tmp')}
+    if version not in marcas:
+        return
+    mas_nueva = max(marcas, key=marcas.get)
+    for nombre, marca in marcas.items():
+        if nombre not in (version, mas_nueva) and marca < marcas[version]:
+            shutil.rmtree(os.path.join(carpeta, nombre), ignore_errors=True)
+
+
+# ============================================
+# PROCESO CARGADOR
+# ============================================
+def publicar_dataset(ruta=RUTA_DATOS, directorio=DIRECTORIO_CACHE):
+    """Lee el libro una vez y publica `libro`, `metricas` y los textos de la versión actual"""
+    from analitica.textos import ingerir_libro
+
+    version = version_dataset(ruta)
+    if publicado('libro', version, directorio) and publicado('metricas', version, directorio):
+        return version
+
+    libro = ingerir_libro(ruta, version, directorio=directorio)
+    marcar_version(version, marca_dataset(ruta), directorio)
+    publicar(libro, 'libro', version, directorio)
+    publicar(preparar_instagram(libro)[0], 'metricas', version, directorio)
+    limpiar_versiones(version, directorio)
+    log.info("Dataset %s publicado en %s", version, directorio_compartido(version, directorio))
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publica el dataset para los workers en modo compartido")
+    parser.add_argument('--datos', default=RUTA_DATOS)
+    parser.add_argument('--vigilar', type=float, default=0,
+                        help="Segundos entre revisiones del libro (0 = publicar una vez y salir)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    publicar_dataset(args.datos)
+    while args.vigilar:
+        time.sleep(args.vigilar)
+        try:
+            publicar_dataset(args.datos)
+        except Exception as e:
+            # El libro puede estar a medio guardar: se reintenta en la próxima vuelta
+            log.warning("No se pudo publicar: %s", e)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+🔗 CORRELACIONES - ¿QUÉ PREDICE LAS VISTAS?
+Pearson de cada métrica de engagement contra `Reproducciones`
+"""
+
+import pandas as pd
+from scipy import stats
+
+from analitica.perfilado import seccion
+
+METRICAS_CORRELACION = {
+    'Compartidos': 'Compartidos',
+    'Likes': 'Likes',
+    'Comentarios': 'Conteo Comentarios',
+}
+
+
+def fuerza_correlacion(corr):
+    if abs(corr) < 0.3:
+        return "🔴 Débil"
+    elif abs(corr) < 0.7:
+        return "🟡 Moderada"
+    return "🟢 Fuerte"
+
+
+def correlaciones_vistas(df):
+    """Correlación, p-valor, R² (%) y fuerza de cada métrica frente a las vistas"""
+    filas = []
+    for metrica, columna in METRICAS_CORRELACION.items():
+        with seccion('pearsonr'):
+            corr, pval = stats.pearsonr(df[columna].astype('float64'), df['Reproducciones'].astype('float64'))
+        filas.append({
+            'Métrica': metrica,
+            'Correlación': corr,
+            'p-valor': pval,
+            'R²': corr**2 * 100,
+            'Fuerza': fuerza_correlacion(corr),
+        })
+    return pd.DataFrame(filas)
@@ -0,0 +1,159 @@
+"""
+📂 DATOS - CARGA DEL LIBRO Y MÉTRICAS BASE
+Lectura de `datos.xlsx`, versión del dataset y métricas de Instagram
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from analitica.lector import LectorHoja
+from analitica.validacion import validar_esquema, validar_instagram
+
+RUTA_DATOS = 'datos.xlsx'
+HOJA = 'instagram'
+DIRECTORIO_CACHE = os.environ.get('DASHBOARD_CACHE', '.cache')
+
+# Tabla de un perfil importado desde las exportaciones de las plataformas (ver analitica/importar.py)
+ARCHIVO_IMPORTADO = 'tabla.arrow'
+
+# Textos largos que no viajan en el DataFrame principal (ver analitica/textos.py)
+COLUMNAS_TEXTO = ['Descripción/Caption', 'Raw Data: Comentarios']
+
+
+@lru_cache(maxsize=32)
+def _hash_archivo(ruta, mtime_ns, tamano):
+    """Hash del contenido; se recalcula solo si cambian mtime o tamaño"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()[:16]
+
+
+def version_dataset(ruta=RUTA_DATOS):
+    """Identificador corto del contenido del libro (cambia cuando cambian los datos)"""
+    st_ = os.stat(ruta)
+    return _hash_archivo(ruta, st_.st_mtime_ns, st_.st_size)
+
+
+# ============================================
+# LECTURA Y MÉTRICAS
+# ============================================
+def es_importado(ruta):
+    return os.path.basename(ruta) == ARCHIVO_IMPORTADO
+
+
+def nombre_perfil(ruta):
+    """'perfiles/ana.xlsx' → 'ana'; 'importados/ana/tabla.arrow' → 'ana'"""
+    if es_importado(ruta):
+        return os.path.basename(os.path.dirname(os.path.abspath(ruta)))
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+
+def leer_importado(ruta, columnas=None):
+    """Tabla de un perfil importado (memory-map); sus textos están en el almacén lateral del perfil"""
+    tabla = feather.read_table(ruta, memory_map=True)
+    validar_esquema([*tabla.column_names, *COLUMNAS_TEXTO])
+    if columnas is not None:
+        tabla = tabla.select([c for c in tabla.column_names if c in set(columnas)])
+    return tabla.to_pandas()
+
+
+def leer_libro(ruta=RUTA_DATOS, columnas=None):
+    """
+    Hoja completa del Excel (todas las plataformas), o solo `columnas`.
+    Lectura en streaming (ver analitica/lector.py); ErrorEsquema si falta
+    alguna columna de Tabla_1. Acepta también la tabla de un perfil importado.
+    """
+    if es_importado(ruta):
+        return leer_importado(ruta, columnas)
+    lector = LectorHoja(ruta, HOJA)
+    validar_esquema(lector.columnas)
+    return lector.leer(columnas)
+
+
+def filtrar_instagram(df):
+    """Solo las publicaciones de Instagram"""
+    return df[df['Link Publicación'] == 'Instagram'].copy()
+
+
+def normalize_to_10(series):
+    """Escala min-max a 1-10 (5.0 si no hay variación)"""
+    min_val = series.min()
+    max_val = series.max()
+    if max_val == min_val:
+        return pd.Series([5.0] * len(series), index=series.index)
+    return 1 + 9 * (series - min_val) / (max_val - min_val)
+
+
+def calcular_metricas(ig_df):
+    """Sends/Likes per Reach y Quality Score"""
+    ig_df['Sends_per_Reach'] = ((ig_df['Compartidos'] + ig_df['Reposteados']) / ig_df['Reproducciones']) * 100
+    ig_df['Likes_per_Reach'] = (ig_df['Likes'] / ig_df['Reproducciones']) * 100
+
+    ig_df['Sends_Score'] = normalize_to_10(ig_df['Sends_per_Reach'])
+    ig_df['Likes_Score'] = normalize_to_10(ig_df['Likes_per_Reach'])
+    ig_df['Quality_Score'] = (ig_df['Sends_Score'] * 0.6) + (ig_df['Likes_Score'] * 0.4)
+
+    return ig_df
+
+
+def preparar_instagram(libro):
+    """Valida las filas de Instagram y calcula métricas; devuelve (df, cuarentena)"""
+    validos, cuarentena = validar_instagram(filtrar_instagram(libro))
+    return compactar(calcular_metricas(validos)), cuarentena
+
+
+def cargar_instagram(ruta=RUTA_DATOS):
+    """Videos de Instagram con métricas y tipos compactos, sin textos (uso fuera de Streamlit)"""
+    if es_importado(ruta):
+        return preparar_instagram(compactar(leer_importado(ruta)))[0]
+    lector = LectorHoja(ruta, HOJA)
+    validar_esquema(lector.columnas)
+    # Los textos no se leen: de sharedStrings.xml solo se retiene lo de las demás columnas
+    columnas = [c for c in lector.columnas if c not in COLUMNAS_TEXTO]
+    return preparar_instagram(compactar(lector.leer(columnas)))[0]
+
+
+def calcular_pauta_score(df):
+    """Puntaje para elegir el video a pautar (combinación de QS, vistas y likes)"""
+    return (
+        df['Quality_Score'] * 0.3 +
+        (df['Reproducciones'] / df['Reproducciones'].max()) * 10 * 0.4 +
+        (df['Likes'] / df['Likes'].max()) * 10 * 0.3
+    )
+
+
+# ============================================
+# REPRESENTACIÓN COMPACTA
+# ============================================
+COLUMNAS_CATEGORICAS = ['Tema/Categoría', 'Formato', 'Link Publicación']
+COLUMNAS_RATIO = ['Sends_per_Reach', 'Likes_per_Reach', 'Sends_Score', 'Likes_Score', 'Quality_Score']
+
+
+def compactar(df):
+    """
+    Tipos compactos: conteos enteros a int32 (float32 si tienen vacíos),
+    ratios a float32 y columnas de baja cardinalidad a category.
+    """
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in COLUMNAS_CATEGORICAS:
+            columnas[col] = serie.astype('category')
+        elif pd.api.types.is_bool_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+            continue
+        elif pd.api.types.is_numeric_dtype(serie):
+            valores = serie.to_numpy(dtype='float64', na_value=float('nan'))
+            enteros = not serie.isna().any() and (valores == valores.round()).all()
+            if enteros and abs(valores).max(initial=0) < 2**31:
+                columnas[col] = serie.astype('int32')
+            else:
+                columnas[col] = serie.astype('float32')
+        elif serie.nunique(dropna=True) <= max(len(serie) // 2, 1):
+            columnas[col] = serie.astype('category')
+    return df.assign(**columnas)
@@ -0,0 +1,315 @@
+"""
+🧾 EXPORTAR - REPORTES ESTÁTICOS (HTML / XLSX / PDF)
+KPIs, rankings, correlaciones y calendario semanal de la página de estrategia,
+sin Streamlit. Las imágenes de los gráficos se renderizan en un pool de
+procesos (kaleido, opcional) y se cachean en disco por versión del dataset.
+
+Uso:
+    python -m analitica.exportar datos.xlsx perfiles/*.xlsx --salida reportes --formatos html xlsx pdf
+"""
+
+import argparse
+import base64
+import hashlib
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from string import Template
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from analitica.correlaciones import correlaciones_vistas
+from analitica.datos import DIRECTORIO_CACHE, cargar_instagram, nombre_perfil, version_dataset
+from analitica.planes import inicio_semana
+from analitica.recomendaciones import calendario_semanal, ranking_pauta
+from analitica.semaforos import semaforo_likes, semaforo_qs, semaforo_sends
+
+log = logging.getLogger(__name__)
+
+FORMATOS = ('html', 'xlsx', 'pdf')
+ANCHO_IMAGEN, ALTO_IMAGEN = 1100, 550
+# Versiones del dataset cuyas imágenes se conservan en caché (además de las usadas en la corrida)
+VERSIONES_RETENIDAS = 3
+
+
+# ============================================
+# CONTENIDO DEL REPORTE
+# ============================================
+def contenido_reporte(df, fecha_inicio=None, clips_tiktok_fb=7, clips_instagram=2):
+    """Tablas del reporte (sin formato de presentación)"""
+    # El calendario arranca siempre en lunes, como en la página y la API
+    fecha_inicio = inicio_semana(fecha_inicio or date.today())
+    sends_avg = df['Sends_per_Reach'].mean()
+    likes_avg = df['Likes_per_Reach'].mean()
+    qs_avg = df['Quality_Score'].mean()
+
+    kpis = pd.DataFrame([
+        {'KPI': '👁️ Total Vistas', 'Valor': f"{df['Reproducciones'].sum():,.0f}",
+         'Detalle': f"Prom: {df['Reproducciones'].mean():,.0f}/video"},
+        {'KPI': '❤️ Total Likes', 'Valor': f"{df['Likes'].sum():,.0f}",
+         'Detalle': f"Prom: {df['Likes'].mean():,.0f}/video"},
+        {'KPI': '💬 Total Comentarios', 'Valor': f"{df['Conteo Comentarios'].sum():,.0f}",
+         'Detalle': f"Prom: {df['Conteo Comentarios'].mean():,.0f}/video"},
+        {'KPI': '🔄 Total Compartidos', 'Valor': f"{df['Compartidos'].sum():,.0f}",
+         'Detalle': f"Prom: {df['Compartidos'].mean():,.0f}/video"},
+        {'KPI': '📤 Sends per Reach', 'Valor': f"{sends_avg:.2f}%", 'Detalle': ' '.join(semaforo_sends(sends_avg))},
+        {'KPI': '❤️ Likes per Reach', 'Valor': f"{likes_avg:.2f}%", 'Detalle': ' '.join(semaforo_likes(likes_avg))},
+        {'KPI': '⭐ Quality Score', 'Valor': f"{qs_avg:.1f}/10", 'Detalle': ' '.join(semaforo_qs(qs_avg))},
+    ])
+
+    ranking = df.nlargest(10, 'Reproducciones')[
+        ['#', 'Fecha', 'Reproducciones', 'Likes', 'Sends_per_Reach', 'Likes_per_Reach', 'Quality_Score']].copy()
+    ranking['Fecha'] = pd.to_datetime(ranking['Fecha']).dt.strftime('%Y-%m-%d')
+
+    pauta = ranking_pauta(df, 5)[['#', 'Reproducciones', 'Likes', 'Quality_Score', 'Pauta_Score']]
+
+    return {
+        'KPIs': kpis,
+        'Ranking': ranking.round(2),
+        'Pauta': pauta.round(2),
+        'Correlaciones': correlaciones_vistas(df).round(3),
+        'Calendario': calendario_semanal(df, fecha_inicio, clips_tiktok_fb, clips_instagram),
+    }
+
+
+def figuras_reporte(df, tablas=None):
+    """Gráficos del reporte; con `tablas` se agregan como figuras (para el PDF)"""
+    top = df.nlargest(10, 'Reproducciones')
+    fig_top = px.bar(top, x='#', y='Reproducciones', color='Quality_Score', color_continuous_scale='RdYlGn',
+                     title='TOP 10 Videos por Reproducciones')
+    fig_top.update_layout(xaxis_type='category')
+
+    fig_scatter = px.scatter(df, x='Likes', y='Reproducciones', color='Quality_Score',
+                             color_continuous_scale='RdYlGn', title='Likes vs Vistas')
+
+    temporal = df.assign(Fecha=pd.to_datetime(df['Fecha'])).sort_values('Fecha')
+    fig_tendencia = px.line(temporal, x='Fecha', y='Reproducciones', markers=True,
+                            title='Reproducciones por Video (Cronológico)')
+
+    figuras = {'top10': fig_top, 'likes_vs_vistas': fig_scatter, 'tendencia': fig_tendencia}
+    for nombre, tabla in (tablas or {}).items():
+        figuras[f'tabla_{nombre.lower()}'] = figura_tabla(nombre, tabla)
+    return figuras
+
+
+def figura_tabla(titulo, tabla):
+    fig = go.Figure(go.Table(
+        header=dict(values=list(tabla.columns), fill_color='#667eea', font=dict(color='white')),
+        cells=dict(values=[tabla[c].astype(str) for c in tabla.columns], fill_color='#f7fafc', align='left'),
+    ))
+    fig.update_layout(title=titulo)
+    return fig
+
+
+# ============================================
+# RENDER DE IMÁGENES (POOL DE PROCESOS)
+# ============================================
+def _renderizar_png(fig_json, ruta, ancho, alto):
+    """Se ejecuta en un proceso del pool"""
+    import plotly.io as pio
+
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    pio.from_json(fig_json).write_image(temporal, format='png', width=ancho, height=alto)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+class MotorExportes:
+    """Pool de procesos para las imágenes, con caché en disco por contenido de cada figura"""
+
+    def __init__(self, procesos=None, directorio_cache=DIRECTORIO_CACHE):
+        self.directorio_cache = directorio_cache
+        self._pool = ProcessPoolExecutor(max_workers=procesos)
+        self._versiones = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown()
+        if self._versiones:
+            _podar_versiones(self._versiones, os.path.join(self.directorio_cache, 'reportes'))
+
+    def ruta_imagen(self, version, nombre, fig_json):
+        """PNG de la figura: la huella de su JSON cambia con todo lo que muestra (p. ej. la semana del calendario)"""
+        huella = hashlib.sha1(f'{ANCHO_IMAGEN}x{ALTO_IMAGEN}|{fig_json}'.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directorio_cache, 'reportes', version, f'{nombre}-{huella}.png')
+
+    def enviar(self, version, figuras):
+        """Encola las imágenes que no están en caché; devuelve {nombre: ruta | future}"""
+        pendientes = {}
+        self._versiones.add(version)
+        for nombre, fig in figuras.items():
+            fig_json = fig.to_json()
+            ruta = self.ruta_imagen(version, nombre, fig_json)
+            if os.path.exists(ruta):
+                pendientes[nombre] = ruta
+                continue
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            pendientes[nombre] = self._pool.submit(_renderizar_png, fig_json, ruta, ANCHO_IMAGEN, ALTO_IMAGEN)
+        return pendientes
+
+    @staticmethod
+    def esperar(pendientes):
+        """Rutas de las imágenes listas (None si el render no está disponible)"""
+        imagenes = {}
+        for nombre, pendiente in pendientes.items():
+            if isinstance(pendiente, str):
+                imagenes[nombre] = pendiente
+                continue
+            try:
+                imagenes[nombre] = pendiente.result()
+            except Exception as e:  # kaleido/Chrome ausentes o fallo de render
+                log.warning("No se pudo renderizar %s: %s", nombre, e)
+                imagenes[nombre] = None
+        return imagenes
+
+
+def _podar_versiones(actuales, carpeta):
+    """Conserva las imágenes de las versiones `actuales` y de las VERSIONES_RETENIDAS - 1 más recientes"""
+    if not os.path.isdir(carpeta):
+        return
+    actuales = {os.path.join(carpeta, v) for v in actuales}
+    versiones = sorted((os.path.join(carpeta, n) for n in os.listdir(carpeta)), key=os.path.getmtime, reverse=True)
+    retenidas = actuales | set([v for v in versiones if v not in actuales][:VERSIONES_RETENIDAS - 1])
+    for ruta in versiones:
+        if ruta not in retenidas:
+            shutil.rmtree(ruta, ignore_errors=True)
+
+
+# ============================================
+# ESCRITORES
+# ============================================
+PLANTILLA_HTML = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte $perfil</title>
+<style>
+    body { font-family: sans-serif; color: #2d3748; max-width: 1100px; margin: 2rem auto; }
+    h1 { color: #1a365d; text-align: center; }
+    .sub { color: #718096; text-align: center; }
+    table.tabla { border-collapse: collapse; width: 100%; margin-bottom: 1.5rem; }
+    table.tabla th { background: #667eea; color: white; padding: 0.4rem; text-align: left; }
+    table.tabla td { border-bottom: 1px solid #e2e8f0; padding: 0.4rem; }
+    img { width: 100%; }
+</style>
+</head>
+<body>
+<h1>📊 Reporte semanal - $perfil</h1>
+<p class="sub">Generado el $fecha | Dataset $version</p>
+$secciones
+</body>
+</html>
+""")
+
+
+def html_reporte(perfil, version, tablas, figuras, imagenes):
+    """Documento HTML; sin imagen renderizada el gráfico va interactivo (plotly.js embebido una vez)"""
+    secciones = [f'<h2>{nombre}</h2>\n{tabla.to_html(index=False, classes="tabla", border=0)}'
+                 for nombre, tabla in tablas.items()]
+    js_incluido = False
+    for nombre, fig in figuras.items():
+        if nombre.startswith('tabla_'):
+            continue
+        ruta_imagen = imagenes.get(nombre)
+        if ruta_imagen:
+            with open(ruta_imagen, 'rb') as f:
+                secciones.append(f'<img src="data:image/png;base64,{base64.b64encode(f.read()).decode()}">')
+        else:
+            secciones.append(fig.to_html(full_html=False, include_plotlyjs=not js_incluido))
+            js_incluido = True
+    return PLANTILLA_HTML.substitute(perfil=perfil, version=version, fecha=date.today().isoformat(),
+                                     secciones='\n'.join(secciones))
+
+
+def escribir_html(ruta, perfil, version, tablas, figuras, imagenes):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(html_reporte(perfil, version, tablas, figuras, imagenes))
+
+
+def escribir_xlsx(ruta, tablas, imagenes):
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        for nombre, tabla in tablas.items():
+            tabla.to_excel(writer, sheet_name=nombre, index=False)
+        graficos = [r for n, r in imagenes.items() if r and not n.startswith('tabla_')]
+        if graficos:
+            from openpyxl.drawing.image import Image
+
+            hoja = writer.book.create_sheet('Gráficos')
+            for i, ruta_img in enumerate(graficos):
+                hoja.add_image(Image(ruta_img), f'A{1 + i * 30}')
+
+
+def escribir_pdf(ruta, imagenes, orden):
+    """PDF con una página por tabla/gráfico (requiere las imágenes renderizadas)"""
+    from PIL import Image
+
+    rutas = [imagenes.get(nombre) for nombre in orden]
+    if not rutas or any(r is None for r in rutas):
+        raise RuntimeError("El PDF requiere renderizar imágenes (instalar kaleido y Chrome)")
+    paginas = [Image.open(r).convert('RGB') for r in rutas]
+    paginas[0].save(ruta, format='PDF', save_all=True, append_images=paginas[1:])
+
+
+# ============================================
+# EXPORTACIÓN POR LOTES
+# ============================================
+def exportar_perfiles(rutas_libros, salida, formatos=FORMATOS, procesos=None, fecha_inicio=None):
+    """
+    Exporta un reporte por libro. Las imágenes de todos los perfiles se encolan
+    juntas en el pool antes de escribir los archivos.
+    """
+    os.makedirs(salida, exist_ok=True)
+    generados = {}
+    with MotorExportes(procesos) as motor:
+        trabajos = []
+        for ruta in rutas_libros:
+            perfil = nombre_perfil(ruta)
+            version = version_dataset(ruta)
+            df = cargar_instagram(ruta)
+            tablas = contenido_reporte(df, fecha_inicio)
+            figuras = figuras_reporte(df, tablas if 'pdf' in formatos else None)
+            trabajos.append((perfil, version, tablas, figuras, motor.enviar(version, figuras)))
+
+        for perfil, version, tablas, figuras, pendientes in trabajos:
+            imagenes = motor.esperar(pendientes)
+            archivos = []
+            base = os.path.join(salida, perfil)
+            if 'html' in formatos:
+                escribir_html(f'{base}.html', perfil, version, tablas, figuras, imagenes)
+                archivos.append(f'{base}.html')
+            if 'xlsx' in formatos:
+                escribir_xlsx(f'{base}.xlsx', tablas, imagenes)
+                archivos.append(f'{base}.xlsx')
+            if 'pdf' in formatos:
+                orden = [f'tabla_{n.lower()}' for n in tablas] + [n for n in figuras if not n.startswith('tabla_')]
+                try:
+                    escribir_pdf(f'{base}.pdf', imagenes, orden)
+                    archivos.append(f'{base}.pdf')
+                except RuntimeError as e:
+                    log.warning("%s: PDF omitido (%s)", perfil, e)
+            generados[perfil] = archivos
+    return generados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta reportes estáticos por perfil")
+    parser.add_argument('libros', nargs='+',
+                        help="Libros .xlsx con el esquema de datos.xlsx o tablas importadas (<perfil>/tabla.arrow)")
+    parser.add_argument('--salida', default='reportes')
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS, default=list(FORMATOS))
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos para renderizar imágenes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    for perfil, archivos in exportar_perfiles(args.libros, args.salida, args.formatos, args.procesos).items():
+        log.info("%s: %s", perfil, ', '.join(archivos) or 'sin archivos')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+🎬 FORMATOS - RENDIMIENTO POR CATEGORÍA, FORMATO Y DURACIÓN
+Agregación agrupada sobre `Tema/Categoría`, `Formato` y `Duración (min:seg)`
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+SIN_DATO = 'Sin dato'
+
+# Tramos de duración (segundos) y sus etiquetas en formato m:ss
+CORTES_DURACION = [0, 30, 60, 90, 120, np.inf]
+ETIQUETAS_DURACION = ['0:00 - 0:30', '0:30 - 1:00', '1:00 - 1:30', '1:30 - 2:00', '2:00+']
+
+DIMENSIONES = {
+    'Categoría': 'Tema/Categoría',
+    'Formato': 'Formato',
+    'Duración': 'Duración (min:seg)',
+}
+
+# Guía editorial: se mantiene como base y se completa con lo que dicen los datos
+FORMATO_BASE = {
+    'tipo': 'Preguntas en la Calle',
+    'duracion': '0:30 - 1:00',
+    'elementos': [
+        '✅ Rostro visible hablando a cámara',
+        '✅ Interacción con personas reales',
+        '✅ Preguntas de interés general',
+        '✅ Locación reconocible (Cartagena)'
+    ],
+    'evitar': [
+        '❌ Contenido político tradicional',
+        '❌ Videos muy editados',
+        '❌ Contenido solo para círculo cercano'
+    ]
+}
+
+
+def duracion_a_segundos(serie):
+    """Convierte 'm:ss' (texto u hora de Excel) a segundos, vectorizado"""
+    texto = serie.astype('string').str.strip()
+    partes = texto.str.extract(r'^(?:(\d+):)?(\d+):(\d+)')
+    partes = partes.apply(pd.to_numeric, errors='coerce')
+    # 'm:ss' deja la primera captura vacía; 'h:mm:ss' (hora de Excel) la usa
+    horas = partes[0].fillna(0)
+    return horas * 3600 + partes[1] * 60 + partes[2]
+
+
+def preparar_dimensiones(df):
+    """Columnas categóricas de agrupación (baratas de agrupar a gran escala)"""
+    segundos = duracion_a_segundos(df[DIMENSIONES['Duración']])
+    return pd.DataFrame({
+        'Categoría': df[DIMENSIONES['Categoría']].astype('string').fillna(SIN_DATO).astype('category'),
+        'Formato': df[DIMENSIONES['Formato']].astype('string').str.strip().str.lower()
+                   .fillna(SIN_DATO).astype('category'),
+        'Duración': pd.cut(segundos, bins=CORTES_DURACION, labels=ETIQUETAS_DURACION, right=False),
+    }, index=df.index)
+
+
+def rendimiento_por_grupo(df, nivel_confianza=0.95):
+    """
+    Rendimiento por categoría, formato y tramo de duración.
+
+    Las tres dimensiones se apilan en formato largo para resolverlas con un único
+    groupby. Incluye mediana de vistas, medias de Sends_per_Reach y Quality_Score
+    e intervalos de confianza (t de Student) para ambas medias.
+    """
+    dims = preparar_dimensiones(df)
+    metricas = df[['Reproducciones', 'Sends_per_Reach', 'Quality_Score']]
+
+    largo = dims.melt(ignore_index=False, var_name='Dimensión', value_name='Grupo')
+    largo = largo.dropna(subset=['Grupo']).join(metricas)
+    largo['Dimensión'] = largo['Dimensión'].astype('category')
+    largo['Grupo'] = largo['Grupo'].astype('category')
+
+    resumen = largo.groupby(['Dimensión', 'Grupo'], observed=True).agg(
+        Videos=('Reproducciones', 'size'),
+        Mediana_Vistas=('Reproducciones', 'median'),
+        Sends_per_Reach=('Sends_per_Reach', 'mean'),
+        Sends_std=('Sends_per_Reach', 'std'),
+        Quality_Score=('Quality_Score', 'mean'),
+        QS_std=('Quality_Score', 'std'),
+    ).reset_index()
+
+    n = resumen['Videos'].to_numpy()
+    t = np.where(n > 1, stats.t.ppf((1 + nivel_confianza) / 2, np.maximum(n - 1, 1)), np.nan)
+    raiz_n = np.sqrt(n)
+    for col, std in [('Sends_per_Reach', 'Sends_std'), ('Quality_Score', 'QS_std')]:
+        margen = t * resumen[std].to_numpy() / raiz_n
+        resumen[f'{col}_IC_inf'] = resumen[col] - margen
+        resumen[f'{col}_IC_sup'] = resumen[col] + margen
+
+    return resumen.drop(columns=['Sends_std', 'QS_std'])
+
+
+def mejor_grupo(resumen, dimension, min_videos=3):
+    """Grupo con mayor cota inferior de Quality_Score (criterio conservador)"""
+    candidatos = resumen[(resumen['Dimensión'] == dimension) &
+                         (resumen['Videos'] >= min_videos) &
+                         (resumen['Grupo'] != SIN_DATO)]
+    if candidatos.empty:
+        return None
+    orden = candidatos['Quality_Score_IC_inf'].fillna(candidatos['Quality_Score'])
+    return candidatos.loc[orden.idxmax()]
+
+
+def recomendar_formato(resumen, min_videos=3):
+    """Formato recomendado: guía editorial + categoría/formato/duración según datos"""
+    formato = {**FORMATO_BASE, 'elementos': list(FORMATO_BASE['elementos']),
+               'evitar': list(FORMATO_BASE['evitar']), 'basado_en_datos': False}
+
+    categoria = mejor_grupo(resumen, 'Categoría', min_videos)
+    if categoria is not None:
+        formato['tipo'] = str(categoria['Grupo'])
+        formato['basado_en_datos'] = True
+
+    duracion = mejor_grupo(resumen, 'Duración', min_videos)
+    if duracion is not None:
+        formato['duracion'] = str(duracion['Grupo'])
+        formato['basado_en_datos'] = True
+
+    mejor_fmt = mejor_grupo(resumen, 'Formato', min_videos)
+    if mejor_fmt is not None:
+        formato['formato'] = str(mejor_fmt['Grupo'])
+
+    return formato
@@ -0,0 +1,117 @@
+"""
+🕰️ HISTORIAL - SNAPSHOTS POR INGESTA Y COMPARACIONES ENTRE PERÍODOS
+Cada versión nueva del libro deja un snapshot inmutable (Arrow IPC sin
+comprimir, se lee con memory-map) y una línea en un índice append-only con
+sus agregados precalculados. Las comparaciones de KPIs usan solo el índice;
+las de video a video leen un snapshot puntual.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DIRECTORIO_HISTORIAL = os.environ.get('DASHBOARD_HISTORIAL', 'historial')
+
+COLUMNAS_SNAPSHOT = ['#', 'Fecha', 'Reproducciones', 'Likes', 'Conteo Comentarios', 'Compartidos',
+                     'Reposteados', 'Sends_per_Reach', 'Likes_per_Reach', 'Quality_Score']
+
+# Agregado → (columna, operación); se guardan en el índice al registrar
+AGREGADOS = {
+    'videos': ('#', 'count'),
+    'total_vistas': ('Reproducciones', 'sum'),
+    'total_likes': ('Likes', 'sum'),
+    'total_comentarios': ('Conteo Comentarios', 'sum'),
+    'total_compartidos': ('Compartidos', 'sum'),
+    'total_reposteados': ('Reposteados', 'sum'),
+    'sends_per_reach': ('Sends_per_Reach', 'mean'),
+    'likes_per_reach': ('Likes_per_Reach', 'mean'),
+    'quality_score': ('Quality_Score', 'mean'),
+}
+
+_lock = threading.Lock()
+
+
+def agregados(df):
+    return {nombre: float(getattr(df[col], op)()) for nombre, (col, op) in AGREGADOS.items()}
+
+
+def _ruta_indice(directorio):
+    return os.path.join(directorio, 'indice.jsonl')
+
+
+def leer_indice(directorio=DIRECTORIO_HISTORIAL):
+    """Snapshots registrados, ordenados por fecha de ingesta (una fila por versión)"""
+    ruta = _ruta_indice(directorio)
+    if not os.path.isfile(ruta):
+        return pd.DataFrame(columns=['version', 'fecha', 'archivo', *AGREGADOS])
+    with open(ruta, encoding='utf-8') as f:
+        registros = [json.loads(linea) for linea in f if linea.strip()]
+    indice = pd.DataFrame(registros)
+    indice['fecha'] = pd.to_datetime(indice['fecha'])
+    # Dos procesos pueden registrar la misma versión a la vez: vale la primera
+    return indice.drop_duplicates('version').sort_values('fecha', kind='stable').reset_index(drop=True)
+
+
+def registrar_snapshot(df, version, fecha=None, directorio=DIRECTORIO_HISTORIAL):
+    """Guarda el snapshot de `version` si aún no existe; devuelve True si lo agregó"""
+    indice = leer_indice(directorio)
+    if version in set(indice['version']):
+        return False
+
+    fecha = fecha or datetime.now()
+    carpeta = os.path.join(directorio, 'snapshots')
+    os.makedirs(carpeta, exist_ok=True)
+    archivo = f"{fecha:%Y%m%d-%H%M%S}_{version}.arrow"
+    destino = os.path.join(carpeta, archivo)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+
+    tabla = pa.Table.from_pandas(df[COLUMNAS_SNAPSHOT].reset_index(drop=True), preserve_index=False)
+    feather.write_feather(tabla, temporal, compression='uncompressed')
+    os.replace(temporal, destino)
+
+    linea = json.dumps({'version': version, 'fecha': fecha.isoformat(timespec='seconds'),
+                        'archivo': archivo, **agregados(df)}, ensure_ascii=False)
+    with _lock, open(_ruta_indice(directorio), 'a', encoding='utf-8') as f:
+        f.write(linea + '\n')
+    return True
+
+
+def leer_snapshot(archivo, directorio=DIRECTORIO_HISTORIAL):
+    """Snapshot completo (memory-map del archivo Arrow)"""
+    return feather.read_table(os.path.join(directorio, 'snapshots', archivo), memory_map=True).to_pandas()
+
+
+def snapshot_anterior(indice, fecha):
+    """Última fila del índice registrada en o antes de `fecha` (None si no hay)"""
+    if indice.empty:
+        return None
+    posicion = np.searchsorted(indice['fecha'].to_numpy(), np.datetime64(pd.Timestamp(fecha)), side='right')
+    return indice.iloc[posicion - 1] if posicion else None
+
+
+def comparar_periodo(indice, version, dias):
+    """
+    Agregados actuales vs. los del snapshot vigente hace `dias` días.
+    Devuelve (actual, anterior) como Series, o (actual, None) sin historial suficiente.
+    """
+    actual = indice.loc[indice['version'] == version]
+    if actual.empty:
+        return None, None
+    actual = actual.iloc[0]
+    anterior = snapshot_anterior(indice, actual['fecha'] - pd.Timedelta(days=dias))
+    if anterior is None or anterior['version'] == version:
+        return actual, None
+    return actual, anterior
+
+
+def deltas_por_video(df, anterior, columnas=('Reproducciones', 'Likes', 'Quality_Score')):
+    """Diferencia por video (mismo `#`) entre el dataset actual y un snapshot"""
+    previo = anterior.set_index('#')[list(columnas)]
+    actual = df.set_index('#')[list(columnas)]
+    return (actual - previo.reindex(actual.index)).set_axis(df.index)
@@ -0,0 +1,524 @@
+"""
+📥 IMPORTAR - EXPORTACIONES DE INSTAGRAM, TIKTOK Y FACEBOOK AL ESQUEMA DE `Tabla_1`
+Lee las exportaciones nativas de cada plataforma (JSON, JSON Lines o CSV en
+disco) como una cadena de generadores: archivos → registros → filas de
+`Tabla_1` → vínculo con Instagram → bloques. Cada bloque se escribe directo a
+la tabla columnar del perfil (Arrow IPC) y sus textos al almacén lateral, sin
+armar el libro completo en memoria. Los perfiles se importan en paralelo (un
+proceso por perfil) y un perfil cuyas exportaciones no cambiaron se salta,
+así una corrida interrumpida se retoma donde quedó.
+
+Uso:
+    python -m analitica.importar exportaciones/ --salida importados --procesos 8
+
+Entrada (una carpeta por perfil; la plataforma sale de la ruta o del nombre):
+    exportaciones/<perfil>/instagram/*.json|*.jsonl|*.csv
+    exportaciones/<perfil>/tiktok/...
+    exportaciones/<perfil>/facebook/...
+
+Salida:
+    importados/<perfil>/tabla.arrow            columnas de Tabla_1 sin textos
+    importados/<perfil>/textos/<huella>/       captions y comentarios
+    importados/<perfil>/estado.json            huella de las exportaciones leídas
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import chain, islice
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from analitica.datos import ARCHIVO_IMPORTADO, COLUMNAS_TEXTO
+from analitica.plataformas import CLAVE_VINCULO, PLATAFORMAS
+from analitica.textos import EscritorTextos, TextosLaterales, directorio_textos
+from analitica.validacion import ESQUEMA_TABLA_1
+
+log = logging.getLogger(__name__)
+
+# Cambia cuando cambia el mapeo: invalida las importaciones ya hechas
+VERSION_IMPORTADOR = 1
+
+EXTENSIONES = ('.json', '.jsonl', '.csv')
+FILAS_POR_BLOQUE = 5000
+
+# Un post de TikTok/Facebook se vincula al de Instagram publicado a lo sumo estos días antes o después
+VENTANA_VINCULO_DIAS = 3
+
+# Campo interno → nombres con que aparece en las exportaciones (en minúsculas)
+ALIAS = {
+    'id': ['id', 'post id', 'video id', 'media id', 'media_id', 'id de la publicación'],
+    'enlace': ['permalink', 'video link', 'link', 'url', 'share_url', 'enlace permanente', 'enlace'],
+    'fecha': ['publish time', 'post time', 'create_time', 'creation_timestamp', 'taken_at', 'timestamp', 'date',
+              'hora de publicación', 'fecha'],
+    'caption': ['description', 'caption', 'video title', 'title', 'descripción', 'título'],
+    'categoria': ['category', 'categoría', 'tema'],
+    'formato': ['post type', 'type', 'media_type', 'tipo de publicación', 'formato'],
+    'duracion': ['duration (sec)', 'duration', 'video duration', 'duración (s)', 'duración'],
+    'reproducciones': ['views', 'plays', 'video views', 'total views', 'total video views', 'reproducciones',
+                       'visualizaciones'],
+    'likes': ['likes', 'total likes', 'like_count', 'reactions', 'me gusta', 'reacciones'],
+    'comentarios': ['comments_count', 'comments', 'total comments', 'comment_count', 'comentarios'],
+    'compartidos': ['shares', 'total shares', 'share_count', 'veces que se compartió', 'compartidos'],
+    'reposteados': ['reposts', 'total reposts', 'reposteados'],
+    'guardados': ['saves', 'add to favorites', 'favorites', 'guardados'],
+}
+
+# Campo interno → columna de Tabla_1 (conteos)
+CONTEOS_TABLA = {
+    'reproducciones': 'Reproducciones',
+    'likes': 'Likes',
+    'comentarios': 'Conteo Comentarios',
+    'reposteados': 'Reposteados',
+    'compartidos': 'Compartidos',
+    'guardados': 'Guardados TikTok',
+}
+
+COLUMNAS_TABLA = [c for c in ESQUEMA_TABLA_1 if c not in COLUMNAS_TEXTO]
+
+# Tipos fijos: todos los bloques de un perfil comparten el esquema Arrow
+ESQUEMA_ARROW = pa.schema([
+    (columna, pa.timestamp('ns') if columna == 'Fecha'
+     else pa.string() if ESQUEMA_TABLA_1[columna] != 'numero' and columna not in CLAVE_VINCULO.values()
+     else pa.float64())
+    for columna in COLUMNAS_TABLA
+])
+
+
+# ============================================
+# ARCHIVOS → REGISTROS
+# ============================================
+def plataforma_de(ruta):
+    """Plataforma según la carpeta o el nombre del archivo (None si no se reconoce)"""
+    texto = ruta.lower()
+    for plataforma in PLATAFORMAS:
+        if plataforma.lower() in texto:
+            return plataforma
+    if re.search(r'(^|[^a-z])(ig|reels?)([^a-z]|$)', texto):
+        return 'Instagram'
+    if re.search(r'(^|[^a-z])(tk|tt)([^a-z]|$)', texto):
+        return 'TikTok'
+    if re.search(r'(^|[^a-z])fb([^a-z]|$)', texto):
+        return 'Facebook'
+    return None
+
+
+def archivos_perfil(carpeta):
+    """(plataforma, ruta) de cada exportación, las más recientes primero (ganan en duplicados)"""
+    encontrados = []
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            if not nombre.lower().endswith(EXTENSIONES) or nombre.startswith('.'):
+                continue
+            plataforma = plataforma_de(os.path.relpath(ruta, carpeta))
+            if plataforma is None:
+                log.warning("Plataforma desconocida, se omite: %s", ruta)
+                continue
+            encontrados.append((os.path.getmtime(ruta), plataforma, ruta))
+    encontrados.sort(key=lambda t: (-t[0], t[2]))
+    return [(plataforma, ruta) for _, plataforma, ruta in encontrados]
+
+
+def _reparar_texto(texto):
+    # Las exportaciones JSON de Meta escriben UTF-8 como si fuera latin-1 ('Ã±' en vez de 'ñ')
+    try:
+        return texto.encode('latin-1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return texto
+
+
+def _listas_de_registros(nodo):
+    """Listas de objetos dentro de un JSON anidado (`{"Video": {"VideoList": [...]}}`, etc.)"""
+    if isinstance(nodo, list):
+        if nodo and all(isinstance(e, dict) for e in nodo):
+            yield nodo
+        return
+    if isinstance(nodo, dict):
+        for valor in nodo.values():
+            yield from _listas_de_registros(valor)
+
+
+def _aplanar(registro):
+    """Sube los campos de `media`/`string_map_data` al nivel del registro"""
+    plano = {}
+    for clave, valor in registro.items():
+        if clave in ('media', 'attachments') and isinstance(valor, list) and valor and isinstance(valor[0], dict):
+            plano.update({k: v for k, v in _aplanar(valor[0]).items() if k not in plano})
+        elif clave == 'string_map_data' and isinstance(valor, dict):
+            plano.update({k: (v.get('value') or v.get('timestamp')) for k, v in valor.items() if isinstance(v, dict)})
+        else:
+            plano[clave] = valor
+    return plano
+
+
+def leer_registros(ruta):
+    """Registros (dicts) de una exportación; CSV y JSON Lines se leen fila a fila"""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.csv':
+        with open(ruta, encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+    elif extension == '.jsonl':
+        with open(ruta, encoding='utf-8') as f:
+            for linea in f:
+                if linea.strip():
+                    yield _aplanar(json.loads(linea))
+    else:
+        with open(ruta, encoding='utf-8') as f:
+            contenido = json.load(f)
+        for lista in _listas_de_registros(contenido):
+            for registro in lista:
+                yield _aplanar(registro)
+
+
+# ============================================
+# REGISTROS → FILAS DE TABLA_1
+# ============================================
+def _campos(registro, exportados=None):
+    """
+    Campo interno → valor, según ALIAS (el primer alias presente gana). En
+    `exportados` (si se da) agrega los campos que el registro trae aunque vacíos.
+    """
+    normalizado = {str(k).strip().lower(): v for k, v in registro.items()}
+    campos = {}
+    for campo, alias in ALIAS.items():
+        if exportados is not None and any(nombre in normalizado for nombre in alias):
+            exportados.add(campo)
+        for nombre in alias:
+            valor = normalizado.get(nombre)
+            if valor not in (None, ''):
+                campos[campo] = valor
+                break
+    return campos
+
+
+def _numero(valor):
+    if isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, list):
+        return float(len(valor))
+    texto = str(valor).strip().replace(',', '').replace(' ', '')
+    if texto in ('', '-'):
+        return np.nan
+    try:
+        return float(texto)
+    except ValueError:
+        return np.nan
+
+
+def _fecha(valor):
+    if isinstance(valor, (int, float)) or (isinstance(valor, str) and valor.strip().isdigit()):
+        # Epoch en UTC (independiente de la zona horaria de la máquina)
+        return pd.Timestamp(int(valor), unit='s')
+    try:
+        fecha = pd.Timestamp(str(valor).strip())
+    except ValueError:
+        return pd.NaT
+    return fecha.tz_convert(None) if fecha.tzinfo else fecha
+
+
+def _duracion(valor):
+    """Segundos → 'm:ss' como en el libro (acepta también 'm:ss' ya formateado)"""
+    if isinstance(valor, str) and ':' in valor:
+        return valor.strip()
+    segundos = _numero(valor)
+    if np.isnan(segundos):
+        return None
+    segundos = int(round(segundos))
+    return f"{segundos // 60}:{segundos % 60:02d}"
+
+
+def _formato(valor):
+    """Reels y videos son 'vertical' como en el libro; otros tipos de post quedan con su nombre"""
+    if valor is None or re.search(r'reel|video|clip', str(valor), re.IGNORECASE):
+        return 'vertical'
+    return str(valor).strip().lower()
+
+
+def _texto(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, list):
+        partes = [_texto(v.get('comment') or v.get('text') or v.get('value')) if isinstance(v, dict) else _texto(v)
+                  for v in valor]
+        return '\n'.join(p for p in partes if p) or None
+    return _reparar_texto(str(valor))
+
+
+def clave_caption(texto):
+    """Caption normalizado (sin tildes, signos ni emojis) para reconocer el mismo video entre plataformas"""
+    if not texto:
+        return None
+    plano = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode().lower()
+    plano = re.sub(r'[^a-z0-9]+', '', plano)
+    return plano[:40] or None
+
+
+def mapear(registros, plataforma):
+    """Filas de Tabla_1 (más `_id`, `_segundos` y `_clave` para deduplicar y vincular)"""
+    for registro in registros:
+        exportados = set()
+        campos = _campos(registro, exportados)
+        fecha = _fecha(campos['fecha']) if 'fecha' in campos else pd.NaT
+        comentarios = campos.get('comentarios')
+        caption = _texto(campos.get('caption'))
+        fila = {columna: None for columna in COLUMNAS_TABLA}
+        fila.update({
+            # `filtrar_instagram` reconoce las filas de Instagram por el nombre, el resto por su URL
+            'Link Publicación': 'Instagram' if plataforma == 'Instagram' else (campos.get('enlace') or plataforma),
+            'Fecha': fecha.normalize() if not pd.isna(fecha) else pd.NaT,
+            'Tema/Categoría': _texto(campos.get('categoria')),
+            'Formato': _formato(campos.get('formato')),
+            'Duración (min:seg)': _duracion(campos['duracion']) if 'duracion' in campos else None,
+            'Descripción/Caption': caption,
+            'Raw Data: Comentarios': _texto(comentarios) if isinstance(comentarios, list) else None,
+        })
+        for campo, columna in CONTEOS_TABLA.items():
+            if campo in campos:
+                fila[columna] = _numero(campos[campo])
+            else:
+                # Conteo que la plataforma no exporta: 0 (si no, la validación pondría la fila en cuarentena);
+                # celda vacía de una columna que sí exporta: NaN
+                fila[columna] = np.nan if campo in exportados or campo == 'reproducciones' else 0.0
+        if pd.isna(fila['Reproducciones']):
+            continue  # Historias, fotos o filas de totales: sin reproducciones no son videos
+        fila['_id'] = str(campos.get('id') or campos.get('enlace') or (fecha, caption))
+        fila['_fecha'] = fecha
+        fila['_segundos'] = _numero(campos['duracion']) if 'duracion' in campos else np.nan
+        fila['_clave'] = clave_caption(caption)
+        yield fila
+
+
+def sin_duplicados(filas):
+    """Primera aparición de cada publicación (los archivos llegan de más nuevo a más viejo)"""
+    vistos = set()
+    for fila in filas:
+        if fila['_id'] in vistos:
+            continue
+        vistos.add(fila['_id'])
+        yield fila
+
+
+# ============================================
+# VÍNCULO CON INSTAGRAM
+# ============================================
+def numerar_instagram(filas):
+    """`#` (1 = el más reciente) y `Días sin publicar` como en el libro"""
+    filas = sorted(filas, key=lambda f: f['_fecha'] if not pd.isna(f['_fecha']) else pd.Timestamp.min,
+                   reverse=True)
+    for i, fila in enumerate(filas):
+        fila['#'] = float(i + 1)
+        anterior = filas[i + 1]['Fecha'] if i + 1 < len(filas) else pd.NaT
+        fila['Días sin publicar'] = float((fila['Fecha'] - anterior).days) if not pd.isna(anterior) else np.nan
+    return filas
+
+
+class IndiceInstagram:
+    """Busca el `#` de Instagram de un post de otra plataforma: mismo caption o misma duración, fecha cercana"""
+
+    def __init__(self, filas_ig):
+        fechadas = sorted((f for f in filas_ig if not pd.isna(f['Fecha'])), key=lambda f: f['Fecha'])
+        self._fechas = [f['Fecha'] for f in fechadas]
+        self._filas = fechadas
+        self._por_clave = {}
+        for fila in filas_ig:
+            if fila['_clave']:
+                self._por_clave.setdefault(fila['_clave'], fila['#'])
+
+    def buscar(self, fila):
+        if fila['_clave'] in self._por_clave:
+            return self._por_clave[fila['_clave']]
+        if pd.isna(fila['Fecha']) or np.isnan(fila['_segundos']):
+            return np.nan
+        ventana = pd.Timedelta(days=VENTANA_VINCULO_DIAS)
+        inicio = bisect_left(self._fechas, fila['Fecha'] - ventana)
+        fin = bisect_right(self._fechas, fila['Fecha'] + ventana)
+        candidatos = [f for f in self._filas[inicio:fin] if abs(f['_segundos'] - fila['_segundos']) <= 1]
+        if not candidatos:
+            return np.nan
+        return min(candidatos, key=lambda f: abs(f['Fecha'] - fila['Fecha']))['#']
+
+
+def vincular(filas, indice, plataforma):
+    columna = CLAVE_VINCULO.get(plataforma)
+    for fila in filas:
+        if columna:
+            fila[columna] = indice.buscar(fila)
+        yield fila
+
+
+# ============================================
+# BLOQUES → TABLA COLUMNAR
+# ============================================
+def en_bloques(filas, tamano=FILAS_POR_BLOQUE):
+    iterador = iter(filas)
+    while bloque := list(islice(iterador, tamano)):
+        yield bloque
+
+
+class EscritorTabla:
+    """Tabla Arrow IPC (tabla.arrow) y almacén de textos de un perfil, escritos por bloques"""
+
+    def __init__(self, carpeta, huella):
+        self.destino = os.path.join(carpeta, ARCHIVO_IMPORTADO)
+        self.temporal = f'{self.destino}.{os.getpid()}.tmp'
+        self.textos = EscritorTextos(huella, directorio=carpeta)
+        self._archivo = pa.ipc.new_file(self.temporal, ESQUEMA_ARROW)
+        self.filas = 0
+
+    def agregar(self, filas):
+        bloque = pd.DataFrame(filas, columns=[*COLUMNAS_TABLA, *COLUMNAS_TEXTO],
+                              index=pd.RangeIndex(self.filas, self.filas + len(filas)))
+        self.textos.agregar(bloque[COLUMNAS_TEXTO])
+        self._archivo.write_batch(pa.RecordBatch.from_pandas(bloque[COLUMNAS_TABLA], schema=ESQUEMA_ARROW,
+                                                             preserve_index=False))
+        self.filas += len(filas)
+
+    def cerrar(self):
+        self._archivo.close()
+        self.textos.cerrar()
+        os.replace(self.temporal, self.destino)
+
+    def descartar(self):
+        self._archivo.close()
+        self.textos.descartar()
+        if os.path.exists(self.temporal):
+            os.remove(self.temporal)
+
+
+# ============================================
+# PERFILES
+# ============================================
+def huella_exportaciones(archivos, carpeta):
+    """Cambia si se agrega, quita o modifica alguna exportación (o cambia el mapeo)"""
+    h = hashlib.sha256(f'v{VERSION_IMPORTADOR}'.encode())
+    for plataforma, ruta in sorted(archivos, key=lambda a: a[1]):
+        estado = os.stat(ruta)
+        h.update(f'{plataforma}|{os.path.relpath(ruta, carpeta)}|{estado.st_size}|{estado.st_mtime_ns}\n'.encode())
+    return h.hexdigest()[:16]
+
+
+def leer_estado(carpeta):
+    try:
+        with open(os.path.join(carpeta, 'estado.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def importar_perfil(origen, salida, forzar=False):
+    """Se ejecuta en un proceso del pool: importa un perfil y devuelve su resumen"""
+    perfil = os.path.basename(os.path.normpath(origen))
+    carpeta = os.path.join(salida, perfil)
+    archivos = archivos_perfil(origen)
+    huella = huella_exportaciones(archivos, origen)
+    estado = leer_estado(carpeta)
+    if not forzar and estado.get('huella') == huella and os.path.isfile(os.path.join(carpeta, ARCHIVO_IMPORTADO)):
+        return {**estado, 'omitido': True}
+
+    def flujo(plataforma):
+        rutas = (ruta for p, ruta in archivos if p == plataforma)
+        return sin_duplicados(mapear(chain.from_iterable(map(leer_registros, rutas)), plataforma))
+
+    # Instagram se lee entero (es lo que se numera y a lo que apuntan los vínculos); el resto fluye
+    instagram = numerar_instagram(flujo('Instagram'))
+    indice = IndiceInstagram(instagram)
+    filas = chain(instagram, *(vincular(flujo(p), indice, p) for p in PLATAFORMAS if p != 'Instagram'))
+
+    os.makedirs(carpeta, exist_ok=True)
+    escritor = EscritorTabla(carpeta, huella)
+    try:
+        for bloque in en_bloques(filas):
+            escritor.agregar(bloque)
+    except BaseException:
+        escritor.descartar()
+        raise
+    escritor.cerrar()
+
+    estado = {
+        'perfil': perfil,
+        'huella': huella,
+        'filas': escritor.filas,
+        'instagram': len(instagram),
+        'archivos': len(archivos),
+        'importado': datetime.now().isoformat(timespec='seconds'),
+    }
+    # estado.json se escribe al final: sin él (corrida cortada) el perfil se vuelve a importar
+    temporal = os.path.join(carpeta, f'.estado.{os.getpid()}.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(temporal, os.path.join(carpeta, 'estado.json'))
+    return {**estado, 'omitido': False}
+
+
+def textos_importados(carpeta):
+    """Almacén de textos de un perfil importado"""
+    return TextosLaterales(directorio_textos(leer_estado(carpeta)['huella'], carpeta))
+
+
+def perfiles_en(rutas):
+    """Carpetas de perfil: cada subcarpeta de las rutas dadas (o la ruta misma si ya es un perfil)"""
+    perfiles = []
+    for ruta in rutas:
+        subcarpetas = sorted(os.path.join(ruta, n) for n in os.listdir(ruta)
+                             if os.path.isdir(os.path.join(ruta, n)) and not n.startswith('.'))
+        if subcarpetas and not any(plataforma_de(os.path.basename(s)) for s in subcarpetas):
+            perfiles.extend(subcarpetas)
+        else:
+            perfiles.append(ruta)
+    return perfiles
+
+
+def importar_perfiles(perfiles, salida, procesos=None, forzar=False):
+    """Importa todos los perfiles en paralelo; devuelve (resúmenes, errores)"""
+    os.makedirs(salida, exist_ok=True)
+    resumenes, errores = [], {}
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {pool.submit(importar_perfil, origen, salida, forzar): origen for origen in perfiles}
+        for futuro in as_completed(futuros):
+            origen = futuros[futuro]
+            try:
+                resumen = futuro.result()
+                resumenes.append(resumen)
+                log.info("%s %s (%d filas)", '⏭️' if resumen['omitido'] else '✅', origen, resumen['filas'])
+            except Exception as e:
+                errores[origen] = str(e)
+                log.error("❌ %s: %s", origen, e)
+    return resumenes, errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa exportaciones de Instagram/TikTok/Facebook por perfil")
+    parser.add_argument('rutas', nargs='+', help="Carpeta de un perfil o carpeta con una subcarpeta por perfil")
+    parser.add_argument('--salida', default='importados')
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--forzar', action='store_true', help="Reimportar aunque las exportaciones no hayan cambiado")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    perfiles = perfiles_en(args.rutas)
+    if not perfiles:
+        parser.error("No se encontraron perfiles")
+
+    resumenes, errores = importar_perfiles(perfiles, args.salida, args.procesos, args.forzar)
+    omitidos = sum(r['omitido'] for r in resumenes)
+    log.info("%d perfiles importados (%d sin cambios), %d con error → %s",
+             len(resumenes), omitidos, len(errores), args.salida)
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
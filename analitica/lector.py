@@ -0,0 +1,336 @@
+"""
+🌊 LECTOR - LECTURA EN STREAMING DE LIBROS .XLSX
+Parsea el XML de la hoja con `iterparse` (SAX) en vez de construir el
+libro completo en memoria como `pd.read_excel`: las filas salen en bloques
+de DataFrames ya tipados y las columnas que no se piden no se guardan nunca.
+De `sharedStrings.xml` solo se conservan los textos que usan esas columnas,
+volcados a un archivo temporal y decodificados al armar cada bloque. La
+memoria pico depende del tamaño del bloque, no del libro ni de sus textos.
+Los tipos replican a `pd.read_excel` (openpyxl): horas sueltas como
+`datetime.time` y formatos de duración (`[h]:mm:ss`) como timedelta.
+"""
+
+import mmap
+import posixpath
+import re
+import tempfile
+import zipfile
+from array import array
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+import pandas as pd
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# numFmtId de fábrica que son fechas/horas (ECMA-376, 18.8.30)
+FORMATOS_FECHA = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+EPOCA_1900 = datetime(1899, 12, 30)
+EPOCA_1904 = datetime(1904, 1, 1)
+# numFmtId de fábrica de duración ([h]:mm:ss)
+FORMATOS_DURACION = {46}
+
+PANDAS_3 = int(pd.__version__.split('.')[0]) >= 3
+
+
+def _columna(referencia):
+    """'AB12' → 27 (índice 0-based de la columna)"""
+    indice = 0
+    for c in referencia:
+        if c.isdigit():
+            break
+        indice = indice * 26 + ord(c) - 64
+    return indice - 1
+
+
+def _es_formato_fecha(codigo):
+    # Sin literales entre comillas ni [colores/condiciones], ¿quedan tokens de fecha?
+    limpio = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', codigo)
+    return bool(re.search(r'[dmyhs]', limpio, re.IGNORECASE))
+
+
+def _es_formato_duracion(codigo):
+    # Horas/minutos acumulados entre corchetes en la primera sección: [h]:mm:ss, [mm]:ss
+    return bool(re.search(r'\[(h+|m+|s+)\]', codigo.split(';')[0], re.IGNORECASE))
+
+
+def fecha_excel(numero, epoca=EPOCA_1900, duracion=False):
+    """
+    Serial de Excel → datetime como lo convierte openpyxl: timedelta en
+    formatos de duración y `time` si es solo una hora (serial entre 0 y 1).
+    """
+    if duracion:
+        return timedelta(milliseconds=round(numero * 86400000))
+    dias, fraccion = divmod(numero, 1)
+    resto = timedelta(milliseconds=round(fraccion * 86400000))
+    if 0 <= numero < 1 and resto.days == 0:
+        return (datetime.min + resto).time()
+    if 0 < numero < 60 and epoca == EPOCA_1900:
+        dias += 1  # antes del 29/02/1900 inexistente que Excel sí cuenta
+    return epoca + timedelta(days=dias) + resto
+
+
+class TextosCompartidos:
+    """
+    Los textos de `sharedStrings.xml` marcados en `usados`, volcados a un
+    archivo temporal: en memoria solo queda un offset por texto y cada uno
+    se decodifica cuando se pide.
+    """
+
+    def __init__(self, z, usados):
+        self._archivo = tempfile.TemporaryFile()
+        offsets, total, i = array('q', [0]), 0, 0
+        with z.open('xl/sharedStrings.xml') as f:
+            for _, e in iterparse(f):
+                if e.tag == f'{NS}si':
+                    if i < len(usados) and usados[i]:
+                        # Texto simple (<t>) o enriquecido (varios <r><t>)
+                        datos = ''.join(t.text or '' for t in e.iter(f'{NS}t')).encode('utf-8')
+                        self._archivo.write(datos)
+                        total += len(datos)
+                    offsets.append(total)
+                    i += 1
+                    e.clear()
+        self._archivo.flush()
+        self._offsets = np.frombuffer(offsets, dtype=np.int64)
+        self._blob = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ) if total else b''
+
+    def get(self, indice, defecto=None):
+        if not 0 <= indice < len(self._offsets) - 1:
+            return defecto
+        return self._blob[self._offsets[indice]:self._offsets[indice + 1]].decode('utf-8')
+
+    def cerrar(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._archivo.close()
+
+
+class LectorHoja:
+    """Lectura por bloques de una hoja de un libro .xlsx"""
+
+    def __init__(self, ruta, hoja):
+        self.ruta = ruta
+        self.hoja = hoja
+        with zipfile.ZipFile(ruta) as z:
+            self._ruta_hoja, epoca_1904 = self._ubicar_hoja(z)
+            self._estilos_fecha = self._leer_estilos(z)
+            indices_encabezado = {}
+            with z.open(self._ruta_hoja) as f:
+                celdas = self._celdas_fila(f, 1)
+            for col, (tipo, valor, _) in celdas.items():
+                if tipo == 's':
+                    indices_encabezado[int(valor)] = col
+            textos = self._textos(z, set(indices_encabezado)) if indices_encabezado else {}
+        self._epoca = EPOCA_1904 if epoca_1904 else EPOCA_1900
+
+        # Encabezados como los arma pandas: vacíos → 'Unnamed: <i>'
+        ultima = max(celdas) if celdas else -1
+        self.columnas = []
+        for i in range(ultima + 1):
+            tipo, valor, _ = celdas.get(i, (None, None, None))
+            nombre = textos.get(int(valor)) if tipo == 's' else valor
+            self.columnas.append(nombre if nombre not in (None, '') else f'Unnamed: {i}')
+
+    # ---------- Metadatos del paquete ----------
+    def _ubicar_hoja(self, z):
+        with z.open('xl/workbook.xml') as f:
+            libro = [(e.tag, dict(e.attrib)) for _, e in iterparse(f)]
+        epoca_1904 = any(t == f'{NS}workbookPr' and a.get('date1904') in ('1', 'true') for t, a in libro)
+        rid = next((a[f'{NS_REL}id'] for t, a in libro if t == f'{NS}sheet' and a.get('name') == self.hoja), None)
+        if rid is None:
+            raise KeyError(f"El libro no tiene la hoja '{self.hoja}'")
+        with z.open('xl/_rels/workbook.xml.rels') as f:
+            destinos = {e.get('Id'): e.get('Target') for _, e in iterparse(f) if e.tag == f'{NS_PKG}Relationship'}
+        destino = destinos[rid]
+        ruta = destino.lstrip('/') if destino.startswith('/') else posixpath.normpath(posixpath.join('xl', destino))
+        return ruta, epoca_1904
+
+    def _leer_estilos(self, z):
+        """Índice de `cellXfs` → 'fecha' o 'duracion', solo para los formatos numéricos de fecha/hora"""
+        if 'xl/styles.xml' not in z.namelist():
+            return {}
+        propios, xfs, en_cellxfs = {}, [], False
+        with z.open('xl/styles.xml') as f:
+            for evento, e in iterparse(f, events=('start', 'end')):
+                if e.tag == f'{NS}cellXfs':
+                    en_cellxfs = evento == 'start'
+                elif evento == 'end' and e.tag == f'{NS}numFmt':
+                    propios[int(e.get('numFmtId'))] = e.get('formatCode', '')
+                elif evento == 'end' and e.tag == f'{NS}xf' and en_cellxfs:
+                    xfs.append(int(e.get('numFmtId', 0)))
+        estilos = {}
+        for i, fmt in enumerate(xfs):
+            if fmt in FORMATOS_DURACION or (fmt in propios and _es_formato_duracion(propios[fmt])):
+                estilos[i] = 'duracion'
+            elif fmt in FORMATOS_FECHA or (fmt in propios and _es_formato_fecha(propios[fmt])):
+                estilos[i] = 'fecha'
+        return estilos
+
+    def _textos(self, z, indices):
+        """Solo las entradas de sharedStrings.xml cuyos índices se usan"""
+        textos, i = {}, 0
+        with z.open('xl/sharedStrings.xml') as f:
+            for _, e in iterparse(f):
+                if e.tag == f'{NS}si':
+                    if i in indices:
+                        # Texto simple (<t>) o enriquecido (varios <r><t>)
+                        textos[i] = ''.join(t.text or '' for t in e.iter(f'{NS}t'))
+                    i += 1
+                    e.clear()
+        return textos
+
+    # ---------- Celdas ----------
+    @staticmethod
+    def _valor_celda(c):
+        tipo = c.get('t', 'n')
+        if tipo == 'inlineStr':
+            return tipo, ''.join(t.text or '' for t in c.iter(f'{NS}t')), c.get('s')
+        v = c.find(f'{NS}v')
+        return tipo, (v.text if v is not None else None), c.get('s')
+
+    def _filas(self, f):
+        """(número de fila, {columna: (tipo, valor, estilo)}) de cada fila del XML"""
+        padre = None
+        numero = 0
+        for evento, e in iterparse(f, events=('start', 'end')):
+            if evento == 'start':
+                if e.tag == f'{NS}sheetData':
+                    padre = e
+                continue
+            if e.tag != f'{NS}row':
+                continue
+            celdas = {}
+            siguiente = 0
+            for c in e.iter(f'{NS}c'):
+                ref = c.get('r')
+                col = _columna(ref) if ref else siguiente
+                siguiente = col + 1
+                celdas[col] = self._valor_celda(c)
+            # `r` es opcional en la fila igual que en la celda: sin él, la que sigue a la anterior
+            ref = e.get('r')
+            numero = int(ref) if ref else numero + 1
+            yield numero, celdas
+            # Las filas ya leídas se sueltan del árbol: la memoria no crece con el libro
+            if padre is not None:
+                padre.clear()
+
+    def _celdas_fila(self, f, numero):
+        for n, celdas in self._filas(f):
+            if n >= numero:
+                return celdas if n == numero else {}
+        return {}
+
+    def _convertir(self, tipo, valor, estilo, textos):
+        if valor is None:
+            return None
+        if tipo == 's':
+            return textos.get(int(valor))
+        if tipo == 'n':
+            numero = float(valor)
+            formato = self._estilos_fecha.get(int(estilo)) if estilo is not None else None
+            if formato is None:
+                return numero
+            return fecha_excel(numero, self._epoca, duracion=formato == 'duracion')
+        if tipo == 'b':
+            return valor == '1'
+        return valor  # str (fórmula), inlineStr, e (#REF!...)
+
+    # ---------- Lectura ----------
+    def bloques(self, columnas=None, filas_por_bloque=5000):
+        """
+        DataFrames de hasta `filas_por_bloque` filas con las `columnas` pedidas
+        (todas si es None), con índice continuo entre bloques.
+        """
+        nombres = self.columnas if columnas is None else [c for c in self.columnas if c in set(columnas)]
+        posiciones = [self.columnas.index(c) for c in nombres]
+
+        with zipfile.ZipFile(self.ruta) as z:
+            # Primera pasada: extensión real de la hoja y qué textos compartidos usan las columnas pedidas
+            pedidas = set(posiciones)
+            usados, ultima = bytearray(), -1
+            with z.open(self._ruta_hoja) as f:
+                for n, celdas in self._filas(f):
+                    for p, (tipo, valor, _) in celdas.items():
+                        if valor is None:
+                            continue
+                        ultima = max(ultima, p)
+                        if n > 1 and tipo == 's' and p in pedidas:
+                            indice = int(valor)
+                            if indice >= len(usados):
+                                usados.extend(bytes(max(indice + 1 - len(usados), len(usados))))
+                            usados[indice] = 1
+            textos = TextosCompartidos(z, usados) if any(usados) else {}
+
+            # Como en pandas: las columnas finales sin encabezado ni datos no existen
+            nombres = [c for c, p in zip(nombres, posiciones) if p <= ultima]
+            posiciones = [p for p in posiciones if p <= ultima]
+
+            inicio = 0
+            filas = []
+            tipos = {}
+            try:
+                with z.open(self._ruta_hoja) as f:
+                    for n, celdas in self._filas(f):
+                        if n <= 1 or not any(v is not None for _, v, _ in celdas.values()):
+                            continue
+                        filas.append([self._convertir(*celdas[p], textos) if p in celdas else None
+                                      for p in posiciones])
+                        if len(filas) >= filas_por_bloque:
+                            yield self._bloque(filas, nombres, inicio, tipos)
+                            inicio += len(filas)
+                            filas = []
+                if filas or not inicio:
+                    yield self._bloque(filas, nombres, inicio, tipos)
+            finally:
+                if isinstance(textos, TextosCompartidos):
+                    textos.cerrar()
+
+    @staticmethod
+    def _bloque(filas, nombres, inicio, tipos):
+        """DataFrame tipado; `tipos` recuerda el tipo de cada columna entre bloques"""
+        bloque = pd.DataFrame(filas, columns=nombres, index=pd.RangeIndex(inicio, inicio + len(filas)))
+        for columna in nombres:
+            serie = bloque[columna]
+            validos = serie.dropna()
+            if validos.empty:
+                tipo = tipos.get(columna, 'numero')
+            elif all(isinstance(v, float) for v in validos):
+                tipo = 'numero'
+            elif all(isinstance(v, datetime) for v in validos):
+                tipo = 'fecha'
+            elif all(isinstance(v, timedelta) for v in validos):
+                tipo = 'duracion'
+            elif all(isinstance(v, str) for v in validos):
+                tipo = 'texto'
+            else:
+                tipo = 'mixto'
+            if tipos.get(columna) not in (None, tipo) and not validos.empty:
+                tipo = 'mixto'
+            tipos[columna] = tipo
+
+            if tipo == 'numero':
+                numeros = serie.astype('float64')
+                enteros = not serie.isna().any() and np.array_equal(numeros, np.round(numeros))
+                bloque[columna] = numeros.astype('int64') if enteros else numeros
+            elif tipo == 'fecha':
+                bloque[columna] = pd.to_datetime(serie)
+            elif tipo == 'duracion':
+                bloque[columna] = pd.to_timedelta(serie)
+            elif tipo == 'texto':
+                # Vacíos como NaN (con pandas 2, astype('str') los volvería 'None')
+                texto = serie.where(serie.notna())
+                bloque[columna] = texto.astype('str') if PANDAS_3 else texto
+            else:
+                # Columna mixta: como pandas, números enteros como int y vacíos como NaN
+                bloque[columna] = pd.Series(
+                    [np.nan if v is None else int(v) if isinstance(v, float) and v.is_integer() else v
+                     for v in serie], index=serie.index, dtype=object)
+        return bloque
+
+    def leer(self, columnas=None, filas_por_bloque=5000):
+        """Hoja completa (para columnas vacías al inicio, el tipo se corrige al unir los bloques)"""
+        return pd.concat(list(self.bloques(columnas, filas_por_bloque))).infer_objects()
@@ -0,0 +1,197 @@
+"""
+⏱️ PERFILADO - TIEMPOS POR SECCIÓN Y ACIERTOS DE CACHÉ
+Cronometra las secciones con nombre de cada página, cuenta aciertos/fallos
+de las funciones cacheadas y lo expone como tablas (panel de administración)
+o en formato de texto de Prometheus. Incluye la captura con cProfile de una
+sola ejecución del script.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Si se define, cada ejecución reescribe ahí las métricas (textfile collector de Prometheus)
+ARCHIVO_METRICAS = os.environ.get('DASHBOARD_METRICAS')
+
+
+def _etiquetas(**valores):
+    escapar = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escapar(v)}"' for k, v in valores.items()) + '}'
+
+
+class Perfilador:
+    """Acumula tiempos por (página, sección) y llamadas/fallos por caché en este proceso"""
+
+    def __init__(self):
+        self._secciones = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---------- Ejecuciones y secciones ----------
+    def iniciar(self, pagina, perfilar=False):
+        """Marca el inicio de una ejecución de `pagina` en el hilo actual"""
+        anterior = getattr(self._local, 'perfil', None)
+        if anterior is not None:
+            # Ejecución anterior interrumpida (st.stop / rerun) antes de cerrarse
+            anterior.disable()
+        self._local.pagina = pagina
+        self._local.abiertas = []
+        self._local.inicio = time.perf_counter()
+        self._local.perfil = None
+        if perfilar:
+            self._local.perfil = cProfile.Profile()
+            self._local.perfil.enable()
+
+    def finalizar(self, extra=None):
+        """Registra el tiempo total; devuelve el perfil capturado (o None)"""
+        inicio = getattr(self._local, 'inicio', None)
+        if inicio is not None:
+            self.medir(self._local.pagina, 'Total', time.perf_counter() - inicio)
+            self._local.inicio = None
+        perfil = getattr(self._local, 'perfil', None)
+        if perfil is not None:
+            perfil.disable()
+            self._local.perfil = None
+        if ARCHIVO_METRICAS:
+            self.escribir_prometheus(ARCHIVO_METRICAS, extra)
+        return perfil
+
+    def medir(self, pagina, seccion, segundos):
+        with self._lock:
+            n, total, maximo, _ = self._secciones.get((pagina, seccion), (0, 0.0, 0.0, 0.0))
+            self._secciones[(pagina, seccion)] = (n + 1, total + segundos, max(maximo, segundos), segundos)
+
+    @contextmanager
+    def seccion(self, nombre):
+        """
+        Cronometra el bloque como sección `nombre` de la página en curso. Una
+        sección dentro de otra se registra aparte como 'Padre › nombre'.
+        """
+        abiertas = getattr(self._local, 'abiertas', None)
+        if abiertas is None:
+            abiertas = self._local.abiertas = []
+        if abiertas:
+            nombre = f'{abiertas[-1]} › {nombre}'
+        abiertas.append(nombre)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            abiertas.pop()
+            pagina = getattr(self._local, 'pagina', '-')
+            self.medir(pagina, nombre, segundos)
+            log.debug("%s / %s: %.1f ms", pagina, nombre, segundos * 1000)
+
+    # ---------- Cachés ----------
+    def contar_cache(self, nombre, fallo):
+        with self._lock:
+            llamadas, fallos = self._caches.get(nombre, (0, 0))
+            self._caches[nombre] = (llamadas + (not fallo), fallos + fallo)
+
+    def cache_medido(self, cache, nombre=None):
+        """
+        Envuelve un decorador de caché (`st.cache_data`, `st.cache_resource`):
+        cada llamada cuenta, y cada ejecución real del cuerpo es un fallo.
+        """
+        def decorar(func):
+            clave = nombre or func.__name__
+
+            @functools.wraps(func)
+            def calcular(*args, **kwargs):
+                self.contar_cache(clave, fallo=True)
+                return func(*args, **kwargs)
+
+            cacheada = cache(calcular)
+
+            @functools.wraps(func)
+            def llamar(*args, **kwargs):
+                self.contar_cache(clave, fallo=False)
+                return cacheada(*args, **kwargs)
+
+            llamar.clear = cacheada.clear
+            return llamar
+        return decorar
+
+    # ---------- Reportes ----------
+    def tabla_secciones(self):
+        with self._lock:
+            filas = [
+                {'Página': p, 'Sección': s, 'Ejecuciones': n, 'Promedio (ms)': total / n * 1000,
+                 'Máximo (ms)': maximo * 1000, 'Última (ms)': ultimo * 1000, 'Total (s)': total}
+                for (p, s), (n, total, maximo, ultimo) in self._secciones.items()
+            ]
+        if not filas:
+            return pd.DataFrame(columns=['Página', 'Sección', 'Ejecuciones', 'Promedio (ms)',
+                                         'Máximo (ms)', 'Última (ms)', 'Total (s)'])
+        return pd.DataFrame(filas).sort_values(['Página', 'Total (s)'], ascending=[True, False])
+
+    def tabla_caches(self):
+        with self._lock:
+            # `llamadas` cuenta las entradas al envoltorio; los fallos se cuentan dentro
+            filas = [
+                {'Caché': c, 'Llamadas': llamadas, 'Aciertos': llamadas - fallos, 'Fallos': fallos,
+                 'Tasa de acierto': (llamadas - fallos) / llamadas if llamadas else None}
+                for c, (llamadas, fallos) in sorted(self._caches.items())
+            ]
+        return pd.DataFrame(filas, columns=['Caché', 'Llamadas', 'Aciertos', 'Fallos', 'Tasa de acierto'])
+
+    def texto_prometheus(self, extra=None):
+        """Métricas en formato de exposición de texto de Prometheus"""
+        with self._lock:
+            secciones = dict(self._secciones)
+            caches = dict(self._caches)
+
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda, muestras):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {tipo}')
+            lineas.extend(f'{nombre}{etiquetas} {valor:g}' for etiquetas, valor in muestras)
+
+        metrica('dashboard_seccion_segundos_total', 'counter', 'Tiempo acumulado por sección',
+                [(_etiquetas(pagina=p, seccion=s), v[1]) for (p, s), v in secciones.items()])
+        metrica('dashboard_seccion_ejecuciones_total', 'counter', 'Ejecuciones por sección',
+                [(_etiquetas(pagina=p, seccion=s), v[0]) for (p, s), v in secciones.items()])
+        metrica('dashboard_seccion_segundos_max', 'gauge', 'Ejecución más lenta por sección',
+                [(_etiquetas(pagina=p, seccion=s), v[2]) for (p, s), v in secciones.items()])
+        metrica('dashboard_cache_llamadas_total', 'counter', 'Llamadas a funciones cacheadas',
+                [(_etiquetas(cache=c), v[0]) for c, v in caches.items()])
+        metrica('dashboard_cache_fallos_total', 'counter', 'Llamadas que ejecutaron la función',
+                [(_etiquetas(cache=c), v[1]) for c, v in caches.items()])
+        for nombre, valor in (extra or {}).items():
+            if valor is not None:
+                metrica(f'dashboard_{nombre}', 'gauge', nombre.replace('_', ' ').capitalize(), [('', valor)])
+        return '\n'.join(lineas) + '\n'
+
+    def escribir_prometheus(self, ruta, extra=None):
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(self.texto_prometheus(extra))
+            os.replace(temporal, ruta)
+        except OSError as e:
+            log.warning("No se pudieron escribir las métricas en %s: %s", ruta, e)
+
+
+perfilador = Perfilador()
+seccion = perfilador.seccion
+cache_medido = perfilador.cache_medido
+
+
+def resumen_perfil(perfil, limite=30, orden='cumulative'):
+    """Las `limite` funciones más costosas de un perfil de cProfile, como texto"""
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).strip_dirs().sort_stats(orden).print_stats(limite)
+    return salida.getvalue()
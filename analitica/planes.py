@@ -0,0 +1,337 @@
+"""
+🗓️ PLANES - PLANES SEMANALES, CHECKLIST Y RESULTADOS PERSISTIDOS
+Un SQLite embebido en modo WAL guarda por perfil y semana el plan generado,
+el estado del checklist y qué videos se publicaron o pautaron de verdad.
+Las lecturas no esperan a las escrituras (WAL) y las escrituras no frenan
+la ejecución de la página: se encolan y un hilo por proceso las confirma en
+lotes, una transacción por lote. Mientras un cambio espera en la cola, las
+lecturas de este proceso ya lo ven. Varios procesos pueden escribir a la
+vez: SQLite los serializa con `busy_timeout`.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+RUTA_PLANES = os.environ.get('DASHBOARD_PLANES', os.path.join('planes', 'planes.db'))
+
+# Tiempo que el escritor junta cambios antes de confirmar un lote, y tamaño máximo del lote
+ESPERA_LOTE_SEG = 0.05
+MAXIMO_LOTE = 500
+
+# Reintentos de un cambio cuando la base está ocupada por otro proceso (con espera creciente)
+REINTENTOS = 3
+
+TAREAS_CHECKLIST = [
+    "Preparar clips para TikTok/FB",
+    "Seleccionar mejores para Instagram",
+    "Revisar horarios óptimos de publicación",
+    "Preparar copies/captions",
+    "Configurar pauta en Meta Ads",
+    "Definir audiencia de pauta",
+    "Revisar métricas del día anterior",
+    "Ajustar estrategia si es necesario",
+]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS planes (
+    perfil TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    generado TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    PRIMARY KEY (perfil, semana)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS videos_plan (
+    perfil TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    dia TEXT NOT NULL,
+    canal TEXT NOT NULL,
+    video INTEGER NOT NULL,
+    orden INTEGER NOT NULL,
+    publicado INTEGER NOT NULL DEFAULT 0,
+    actualizado TEXT,
+    PRIMARY KEY (perfil, semana, fecha, canal, video)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checklist (
+    perfil TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    tarea TEXT NOT NULL,
+    hecho INTEGER NOT NULL,
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (perfil, semana, tarea)
+) WITHOUT ROWID;
+"""
+
+COLUMNAS_PLAN = ['Día', 'Fecha', 'Canal', 'Video', 'Publicado']
+
+
+def inicio_semana(fecha):
+    """Lunes de la semana de `fecha`: la clave de los planes y del checklist"""
+    if isinstance(fecha, datetime):
+        fecha = fecha.date()
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def _fecha(fecha):
+    return fecha.isoformat() if isinstance(fecha, date) else str(fecha)
+
+
+def _semana(semana):
+    """Clave de semana: cualquier fecha va a su lunes; un texto ya es una clave guardada"""
+    return inicio_semana(semana).isoformat() if isinstance(semana, date) else str(semana)
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class AlmacenPlanes:
+    """Planes por (perfil, semana) en SQLite; compartido por todas las sesiones del proceso"""
+
+    def __init__(self, ruta=RUTA_PLANES):
+        self.ruta = ruta
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        conexion = self._conectar()
+        conexion.execute('PRAGMA journal_mode=WAL')
+        conexion.executescript(ESQUEMA)
+        conexion.close()
+        self._local = threading.local()
+        self._cola = queue.Queue()
+        # Cambios encolados aún sin confirmar: clave → (secuencia, valor), para leer lo propio
+        self._pendientes = {}
+        self._secuencia = 0
+        # Cambios que no se pudieron guardar ni aislados (para telemetría)
+        self.descartados = 0
+        self._lock = threading.Lock()
+        self._hilo = threading.Thread(target=self._escribir, name='planes', daemon=True)
+        self._hilo.start()
+        atexit.register(self.esperar)
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.execute('PRAGMA synchronous=NORMAL')
+        conexion.execute('PRAGMA busy_timeout=30000')
+        return conexion
+
+    def _lectura(self):
+        """Conexión de lectura del hilo actual (los hilos de Streamlit no comparten conexión)"""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = self._local.conexion = self._conectar()
+        return conexion
+
+    # ============================================
+    # ESCRITURA EN LOTES
+    # ============================================
+    def _encolar(self, sentencias, clave=None, valor=None):
+        with self._lock:
+            self._secuencia += 1
+            secuencia = self._secuencia
+            if clave is not None:
+                self._pendientes[clave] = (secuencia, valor)
+        self._cola.put((secuencia, clave, sentencias))
+
+    def _escribir(self):
+        conexion = self._conectar()
+        while True:
+            lote = [self._cola.get()]
+            try:
+                while len(lote) < MAXIMO_LOTE:
+                    lote.append(self._cola.get(timeout=ESPERA_LOTE_SEG))
+            except queue.Empty:
+                pass
+            try:
+                self._confirmar(conexion, lote)
+            except sqlite3.Error as e:
+                # Un cambio que falla no arrastra al resto: se reintenta cada uno en su propia transacción
+                log.warning("Falló un lote de %d cambios de planes (%s); se guardan uno por uno", len(lote), e)
+                for cambio in lote:
+                    self._confirmar_aislado(conexion, cambio)
+            with self._lock:
+                for secuencia, clave, _ in lote:
+                    if clave is not None and self._pendientes.get(clave, (None,))[0] == secuencia:
+                        del self._pendientes[clave]
+            for _ in lote:
+                self._cola.task_done()
+
+    @staticmethod
+    def _confirmar(conexion, lote):
+        try:
+            conexion.execute('BEGIN IMMEDIATE')
+            for _, _, sentencias in lote:
+                for sql, parametros in sentencias:
+                    conexion.execute(sql, parametros)
+            conexion.execute('COMMIT')
+        except sqlite3.Error:
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+            raise
+
+    def _confirmar_aislado(self, conexion, cambio):
+        for intento in range(REINTENTOS + 1):
+            try:
+                self._confirmar(conexion, [cambio])
+                return
+            except sqlite3.OperationalError as e:
+                # Base ocupada o bloqueada: transitorio, se reintenta
+                if intento == REINTENTOS:
+                    error = e
+                    break
+                time.sleep(ESPERA_LOTE_SEG * 2 ** intento)
+            except sqlite3.Error as e:
+                error = e
+                break
+        with self._lock:
+            self.descartados += 1
+        log.error("Se descartó un cambio de planes (%s): %s", cambio[1] or 'sin clave', error)
+
+    def esperar(self):
+        """Bloquea hasta confirmar todo lo encolado"""
+        self._cola.join()
+
+    def _pendiente(self, tipo, perfil, semana):
+        """Cambios encolados de `tipo` para la semana, por el resto de su clave"""
+        with self._lock:
+            return {clave[3:]: valor for clave, (_, valor) in self._pendientes.items()
+                    if clave[:3] == (tipo, perfil, semana)}
+
+    # ============================================
+    # PLANES
+    # ============================================
+    def guardar_plan(self, perfil, semana, plan, parametros):
+        """Reemplaza el plan de la semana (conserva lo ya marcado como publicado si el video sigue en él)"""
+        semana = _semana(semana)
+        ahora = _ahora()
+        plan = plan[['Día', 'Fecha', 'Canal', 'Video']]
+        sentencias = [
+            ("INSERT OR REPLACE INTO planes VALUES (?, ?, ?, ?)",
+             (perfil, semana, ahora, json.dumps(parametros, ensure_ascii=False, default=str))),
+            ("CREATE TEMP TABLE IF NOT EXISTS publicados (fecha TEXT, canal TEXT, video INTEGER)", ()),
+            ("DELETE FROM temp.publicados", ()),
+            ("INSERT INTO temp.publicados SELECT fecha, canal, video FROM videos_plan "
+             "WHERE perfil = ? AND semana = ? AND publicado = 1", (perfil, semana)),
+            ("DELETE FROM videos_plan WHERE perfil = ? AND semana = ?", (perfil, semana)),
+        ]
+        for orden, fila in enumerate(plan.itertuples(index=False)):
+            sentencias.append((
+                "INSERT OR IGNORE INTO videos_plan (perfil, semana, fecha, dia, canal, video, orden) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (perfil, semana, _fecha(fila.Fecha), fila.Día, fila.Canal, int(fila.Video), orden)))
+        sentencias.append((
+            "UPDATE videos_plan SET publicado = 1 WHERE perfil = ? AND semana = ? AND "
+            "(fecha, canal, video) IN (SELECT fecha, canal, video FROM temp.publicados)", (perfil, semana)))
+        # Hasta que se confirme, `plan()` ya lo devuelve: guardar no espera a la escritura
+        self._encolar(sentencias, clave=('plan', perfil, semana),
+                      valor=(datetime.fromisoformat(ahora), parametros, plan.drop_duplicates()))
+
+    def plan(self, perfil, semana):
+        """(generado, parámetros, plan con `Publicado`) de la semana, o None si no hay plan guardado"""
+        semana = _semana(semana)
+        guardado = self._plan_confirmado(perfil, semana)
+        pendiente = self._pendiente('plan', perfil, semana).get(())
+        if pendiente is not None:
+            # Plan reemplazado aún en cola: conserva lo ya publicado si el video sigue en él
+            generado, parametros, nuevo = pendiente
+            nuevo = nuevo.assign(Fecha=pd.to_datetime(nuevo['Fecha']).dt.date, Video=nuevo['Video'].astype(int))
+            publicados = guardado[2][guardado[2]['Publicado']] if guardado else nuevo.iloc[:0]
+            marcados = nuevo.merge(publicados[['Fecha', 'Canal', 'Video']], how='left', indicator=True)['_merge']
+            guardado = generado, parametros, nuevo.assign(Publicado=(marcados == 'both').to_numpy())[COLUMNAS_PLAN]
+        if guardado is None:
+            return None
+        generado, parametros, plan = guardado
+        for (fecha, canal, video), publicado in self._pendiente('video', perfil, semana).items():
+            plan.loc[(plan['Fecha'].astype(str) == fecha) & (plan['Canal'] == canal) & (plan['Video'] == video),
+                     'Publicado'] = publicado
+        return generado, parametros, plan
+
+    def _plan_confirmado(self, perfil, semana):
+        conexion = self._lectura()
+        cabecera = conexion.execute("SELECT generado, parametros FROM planes WHERE perfil = ? AND semana = ?",
+                                    (perfil, semana)).fetchone()
+        if cabecera is None:
+            return None
+        filas = conexion.execute(
+            "SELECT dia, fecha, canal, video, publicado FROM videos_plan WHERE perfil = ? AND semana = ? "
+            "ORDER BY orden",
+            (perfil, semana)).fetchall()
+        plan = pd.DataFrame(filas, columns=COLUMNAS_PLAN)
+        plan['Fecha'] = pd.to_datetime(plan['Fecha']).dt.date
+        plan['Publicado'] = plan['Publicado'].astype(bool)
+        return datetime.fromisoformat(cabecera[0]), json.loads(cabecera[1]), plan
+
+    def marcar_publicado(self, perfil, semana, fecha, canal, video, publicado=True):
+        """Registra si un video del plan se publicó (o se pautó, en el canal 'Pauta')"""
+        semana, fecha = _semana(semana), _fecha(fecha)
+        self._encolar([(
+            "UPDATE videos_plan SET publicado = ?, actualizado = ? "
+            "WHERE perfil = ? AND semana = ? AND fecha = ? AND canal = ? AND video = ?",
+            (int(publicado), _ahora(), perfil, semana, fecha, canal, int(video)))],
+            clave=('video', perfil, semana, fecha, canal, int(video)), valor=bool(publicado))
+
+    def huella(self):
+        """Cambia con cada escritura confirmada, de este o de otro proceso (solo `stat` de la base y su WAL)"""
+        firmas = []
+        for ruta in (self.ruta, f'{self.ruta}-wal'):
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            firmas.append(f'{estado.st_size}|{estado.st_mtime_ns}')
+        return ':'.join(firmas)
+
+    def videos_pautados(self, perfil):
+        """Días de pauta de todos los planes guardados del perfil (`fecha`, `video`, `publicado`)"""
+        filas = self._lectura().execute(
+            "SELECT fecha, video, publicado FROM videos_plan WHERE perfil = ? AND canal = 'Pauta' ORDER BY fecha",
+            (perfil,)).fetchall()
+        pautados = pd.DataFrame(filas, columns=['fecha', 'video', 'publicado'])
+        pautados['fecha'] = pd.to_datetime(pautados['fecha'])
+        return pautados
+
+    # ============================================
+    # CHECKLIST
+    # ============================================
+    def checklist(self, perfil, semana):
+        """Tarea → hecha, para las tareas de TAREAS_CHECKLIST"""
+        semana = _semana(semana)
+        filas = self._lectura().execute("SELECT tarea, hecho FROM checklist WHERE perfil = ? AND semana = ?",
+                                        (perfil, semana)).fetchall()
+        estado = {tarea: False for tarea in TAREAS_CHECKLIST}
+        estado.update({tarea: bool(hecho) for tarea, hecho in filas})
+        estado.update({tarea: hecho for (tarea,), hecho in self._pendiente('tarea', perfil, semana).items()})
+        return estado
+
+    def marcar_tarea(self, perfil, semana, tarea, hecho):
+        semana = _semana(semana)
+        self._encolar([("INSERT OR REPLACE INTO checklist VALUES (?, ?, ?, ?, ?)",
+                        (perfil, semana, tarea, int(hecho), _ahora()))],
+                      clave=('tarea', perfil, semana, tarea), valor=bool(hecho))
+
+    # ============================================
+    # HISTORIAL DE SEMANAS
+    # ============================================
+    def semanas(self, perfil):
+        """Semanas con plan guardado (la más reciente primero) y cuánto se cumplió de cada una"""
+        filas = self._lectura().execute("""
+            SELECT p.semana, p.generado,
+                   (SELECT COUNT(*) FROM videos_plan v WHERE v.perfil = p.perfil AND v.semana = p.semana),
+                   (SELECT COALESCE(SUM(publicado), 0) FROM videos_plan v
+                    WHERE v.perfil = p.perfil AND v.semana = p.semana),
+                   (SELECT COALESCE(SUM(hecho), 0) FROM checklist c WHERE c.perfil = p.perfil AND c.semana = p.semana)
+            FROM planes p WHERE p.perfil = ? ORDER BY p.semana DESC""", (perfil,)).fetchall()
+        semanas = pd.DataFrame(filas, columns=['Semana', 'Generado', 'Videos', 'Publicados', 'Tareas'])
+        semanas['Cumplimiento'] = semanas['Publicados'] / semanas['Videos'].where(semanas['Videos'] > 0)
+        return semanas
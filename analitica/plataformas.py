@@ -0,0 +1,122 @@
+"""
+🔗 PLATAFORMAS - VÍNCULO ENTRE INSTAGRAM, TIKTOK Y FACEBOOK
+Une cada publicación de TikTok/Facebook con su video de Instagram
+a través de las columnas `# en Ig/Tk` y `# en Ig/Fb`
+"""
+
+import numpy as np
+import pandas as pd
+
+PLATAFORMAS = ['Instagram', 'TikTok', 'Facebook']
+
+# Columna del libro que apunta al `#` de Instagram desde cada plataforma
+CLAVE_VINCULO = {
+    'TikTok': '# en Ig/Tk',
+    'Facebook': '# en Ig/Fb',
+}
+
+METRICAS_VINCULO = ['Reproducciones', 'Likes', 'Conteo Comentarios', 'Compartidos']
+
+
+def normalizar_plataforma(serie):
+    """Plataforma a partir de `Link Publicación` (el libro mezcla nombres y URLs)"""
+    texto = serie.astype('string').str.lower()
+    plataforma = np.select(
+        [texto.str.contains('tiktok', na=False),
+         texto.str.contains('facebook', na=False),
+         texto.str.contains('instagram', na=False)],
+        ['TikTok', 'Facebook', 'Instagram'],
+        default='Otra'
+    )
+    return pd.Categorical(plataforma, categories=PLATAFORMAS + ['Otra'])
+
+
+def totales_declarados(libro):
+    """Totales de videos por plataforma anotados a mano en el libro (si existen)"""
+    totales = {}
+    for col_texto, col_valor in zip(libro.columns[:-1], libro.columns[1:]):
+        if pd.api.types.is_numeric_dtype(libro[col_texto]) or pd.api.types.is_datetime64_any_dtype(libro[col_texto]):
+            continue
+        texto = libro[col_texto].astype('string').str.lower()
+        for plataforma, patron in [('TikTok', 'totales en tk'), ('Facebook', 'totales en fb')]:
+            fila = texto.str.contains(patron, na=False)
+            if fila.any():
+                valor = pd.to_numeric(libro.loc[fila, col_valor], errors='coerce').dropna()
+                if not valor.empty:
+                    totales[plataforma] = int(valor.iloc[0])
+    return totales
+
+
+def unir_plataformas(libro):
+    """
+    Vista unida: una fila por video de Instagram con las métricas de su
+    publicación en TikTok y Facebook.
+
+    El cruce usa el índice hash de `#` (`Index.get_indexer`), lineal en el
+    número de publicaciones.
+    """
+    plataforma = normalizar_plataforma(libro['Link Publicación'])
+    es_ig = (plataforma == 'Instagram') & libro['#'].notna()
+
+    ig = libro.loc[es_ig, ['#', 'Fecha'] + METRICAS_VINCULO].copy()
+    ig['#'] = ig['#'].astype('int64')
+    ig = ig.drop_duplicates('#').set_index('#')
+
+    unido = ig.rename(columns={m: f'{m}_Instagram' for m in METRICAS_VINCULO})
+    for nombre, clave in CLAVE_VINCULO.items():
+        filas = libro.loc[plataforma == nombre]
+        destino = pd.to_numeric(filas[clave], errors='coerce')
+        filas = filas[destino.notna()]
+        posiciones = ig.index.get_indexer(destino.dropna().astype('int64'))
+        validas = posiciones >= 0
+
+        # Si un video tiene varias publicaciones en la plataforma, se suman
+        bloque = filas.loc[validas, METRICAS_VINCULO].groupby(ig.index[posiciones[validas]]).sum(min_count=1)
+        unido = unido.join(bloque.rename(columns={m: f'{m}_{nombre}' for m in METRICAS_VINCULO}))
+
+    return unido
+
+
+def lift_por_plataforma(unido):
+    """Lift de Instagram frente a cada plataforma (mediana de vistas IG / vistas plataforma)"""
+    filas = []
+    for nombre in CLAVE_VINCULO:
+        views_plat = unido[f'Reproducciones_{nombre}']
+        vinculados = views_plat.notna() & (views_plat > 0)
+        ratio = unido.loc[vinculados, 'Reproducciones_Instagram'] / views_plat[vinculados]
+        filas.append({
+            'Plataforma': nombre,
+            'Videos vinculados': int(vinculados.sum()),
+            'Vistas plataforma (mediana)': views_plat[vinculados].median(),
+            'Vistas Instagram (mediana)': unido.loc[vinculados, 'Reproducciones_Instagram'].median(),
+            'Lift Instagram': ratio.median(),
+        })
+    return pd.DataFrame(filas)
+
+
+def publicaciones_por_plataforma(libro):
+    """
+    Videos publicados en TikTok/Facebook.
+
+    Se usa el total declarado en el libro cuando existe (el libro solo detalla
+    algunas publicaciones de esas plataformas).
+    """
+    plataforma = normalizar_plataforma(libro['Link Publicación'])
+    declarados = totales_declarados(libro)
+    return {p: declarados.get(p, int((plataforma == p).sum())) for p in CLAVE_VINCULO}
+
+
+def embudo(unido, publicados, videos_pauta=()):
+    """Conversión del funnel TikTok/FB → Instagram → Pauta"""
+    total_publicados = sum(publicados.values())
+    con_vinculo = unido[[f'Reproducciones_{p}' for p in CLAVE_VINCULO]].notna().any(axis=1)
+    a_instagram = int(con_vinculo.sum())
+    a_pauta = int((con_vinculo & unido.index.isin(list(videos_pauta))).sum())
+
+    return pd.DataFrame({
+        'Etapa': ['TikTok/FB', 'Instagram', 'Pauta'],
+        'Videos': [total_publicados, a_instagram, a_pauta],
+        'Conversión': [np.nan,
+                       a_instagram / total_publicados if total_publicados else np.nan,
+                       a_pauta / a_instagram if a_instagram else np.nan],
+    })
@@ -0,0 +1,137 @@
+"""
+🔮 PRONÓSTICO - VISTAS ESPERADAS PARA VIDEOS NUEVOS
+Regresión log-lineal (statsmodels) sobre rasgos conocidos antes de publicar
+(duración, días sin publicar, fin de semana). El modelo se entrena en segundo
+plano, se guarda en disco y se reutiliza mientras no cambie la versión del dataset.
+"""
+
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from analitica.datos import DIRECTORIO_CACHE
+from analitica.formatos import duracion_a_segundos
+
+# Solo rasgos previos a la publicación: los ratios por alcance se derivan de las vistas que se predicen
+FEATURES = ['Duracion_seg', 'Dias_sin_publicar', 'Fin_de_semana']
+
+# Cambia con FEATURES para no cargar modelos en disco con otras columnas
+ESQUEMA = 2
+
+_modelos = {}
+_entrenamientos = {}
+_lock = threading.Lock()
+
+
+def _features(df):
+    fechas = pd.to_datetime(df['Fecha'])
+    return pd.DataFrame({
+        'Duracion_seg': duracion_a_segundos(df['Duración (min:seg)']),
+        'Dias_sin_publicar': df['Días sin publicar'],
+        'Fin_de_semana': (fechas.dt.dayofweek >= 5).where(fechas.notna()),
+    }, index=df.index)[FEATURES].astype('float64')
+
+
+def construir_features(df, medianas):
+    """
+    Matriz de features (vectorizada) con constante para el modelo. Los
+    ausentes se imputan con las medianas del entrenamiento, no con las del
+    lote que se puntúa.
+    """
+    X = _features(df).fillna(medianas).fillna(0.0)
+    return sm.add_constant(X, has_constant='add')
+
+
+def entrenar(df):
+    """Ajusta OLS sobre log(vistas); se descartan los datos para que pese poco en disco"""
+    medianas = _features(df).median()
+    X = construir_features(df, medianas)
+    y = np.log1p(df['Reproducciones'].astype('float64'))
+    validos = y.notna() & np.isfinite(X).all(axis=1)
+    modelo = sm.OLS(y[validos], X[validos]).fit()
+    modelo.medianas = medianas
+    # Estadísticos usados en la UI: se calculan antes de soltar los datos
+    for atributo in ('rsquared', 'scale', 'nobs'):
+        getattr(modelo, atributo)
+    modelo.remove_data()
+    return modelo
+
+
+def ruta_modelo(version, directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, 'modelos', f'pronostico_v{ESQUEMA}_{version}.pkl')
+
+
+def _guardar(modelo, version, directorio):
+    ruta = ruta_modelo(version, directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        pickle.dump(modelo, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+
+    # Los modelos de versiones anteriores ya no se usan
+    carpeta = os.path.dirname(ruta)
+    for nombre in os.listdir(carpeta):
+        if nombre.startswith('pronostico_') and nombre.endswith('.pkl') and nombre != os.path.basename(ruta):
+            try:
+                os.remove(os.path.join(carpeta, nombre))
+            except OSError:
+                pass
+
+
+def _recordar(version, modelo):
+    """Solo se mantiene en memoria el modelo de la versión vigente"""
+    with _lock:
+        _modelos.clear()
+        _modelos[version] = modelo
+
+
+def _entrenar_y_guardar(df, version, directorio):
+    try:
+        modelo = entrenar(df)
+        _guardar(modelo, version, directorio)
+        _recordar(version, modelo)
+    finally:
+        with _lock:
+            _entrenamientos.pop(version, None)
+
+
+def obtener_modelo(df, version, directorio=DIRECTORIO_CACHE):
+    """
+    Modelo de la versión actual: memoria → disco → entrenamiento en segundo plano.
+
+    Devuelve None mientras el modelo se está entrenando.
+    """
+    with _lock:
+        if version in _modelos:
+            return _modelos[version]
+
+    ruta = ruta_modelo(version, directorio)
+    if os.path.exists(ruta):
+        with open(ruta, 'rb') as f:
+            modelo = pickle.load(f)
+        _recordar(version, modelo)
+        return modelo
+
+    with _lock:
+        if version not in _entrenamientos:
+            hilo = threading.Thread(target=_entrenar_y_guardar, args=(df.copy(), version, directorio),
+                                    name=f'pronostico-{version}', daemon=True)
+            _entrenamientos[version] = hilo
+            hilo.start()
+    return None
+
+
+def pronosticar(modelo, df, alpha=0.2):
+    """Vistas proyectadas con intervalo (por defecto 80%) para un lote de videos"""
+    X = construir_features(df, modelo.medianas)
+    prediccion = modelo.get_prediction(X).summary_frame(alpha=alpha)
+    return pd.DataFrame({
+        'Vistas_Proyectadas': np.expm1(prediccion['mean'].to_numpy()),
+        'Vistas_Min': np.expm1(prediccion['obs_ci_lower'].to_numpy()),
+        'Vistas_Max': np.expm1(prediccion['obs_ci_upper'].to_numpy()),
+    }, index=df.index)
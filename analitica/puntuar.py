@@ -0,0 +1,133 @@
+"""
+🧮 PUNTUAR - SCORING POR LOTES DESDE LA LÍNEA DE COMANDOS
+Calcula las métricas (Sends/Likes per Reach, Quality Score, Pauta Score) y las
+recomendaciones de cada libro con el esquema de `datos.xlsx`, en paralelo
+(un proceso por libro), y escribe resultados columnares en Parquet.
+
+Uso:
+    python -m analitica.puntuar perfiles/ --salida puntajes --procesos 8
+
+Salida:
+    puntajes/metricas/perfil=<nombre>/parte-0.parquet   una fila por video
+    puntajes/recomendaciones.parquet                    una fila por perfil
+    puntajes/bosquejos/<nombre>.json                    cuantiles fusionables (benchmarks)
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import pandas as pd
+
+from analitica.bosquejos import guardar_bosquejos
+from analitica.datos import ARCHIVO_IMPORTADO, calcular_pauta_score, cargar_instagram, nombre_perfil, version_dataset
+from analitica.formatos import recomendar_formato, rendimiento_por_grupo
+from analitica.recomendaciones import mejor_pauta, seleccion_instagram, seleccion_tiktok
+from analitica.seguidores import leer_serie, resumen_seguidores
+
+log = logging.getLogger(__name__)
+
+COLUMNAS_METRICAS = ['#', 'Fecha', 'Reproducciones', 'Likes', 'Conteo Comentarios', 'Compartidos', 'Reposteados',
+                     'Sends_per_Reach', 'Likes_per_Reach', 'Quality_Score', 'Pauta_Score']
+
+
+def libros_en(rutas):
+    """Expande directorios a sus .xlsx y perfiles importados (ignorando los temporales de Excel `~$`)"""
+    libros = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            libros.extend(sorted(glob.glob(os.path.join(ruta, '*.xlsx'))))
+            libros.extend(sorted(glob.glob(os.path.join(ruta, '*', ARCHIVO_IMPORTADO))))
+        else:
+            libros.append(ruta)
+    return [r for r in libros if not os.path.basename(r).startswith('~$')]
+
+
+def categoria_perfil(serie, perfil):
+    resumen = resumen_seguidores(serie, perfil)
+    return resumen['categoria'] if resumen else None
+
+
+def puntuar_libro(ruta, salida, clips_tiktok_fb=7, categoria=None):
+    """Se ejecuta en un proceso del pool: escribe las métricas y bosquejos y devuelve las recomendaciones"""
+    perfil = nombre_perfil(ruta)
+    df = cargar_instagram(ruta)
+    df = df.assign(Pauta_Score=calcular_pauta_score(df))
+    guardar_bosquejos(df, perfil, categoria, os.path.join(salida, 'bosquejos'))
+
+    destino = os.path.join(salida, 'metricas', f'perfil={perfil}')
+    os.makedirs(destino, exist_ok=True)
+    temporal = os.path.join(destino, f'.parte-0.{os.getpid()}.tmp')
+    df[COLUMNAS_METRICAS].to_parquet(temporal, index=False)
+    os.replace(temporal, os.path.join(destino, 'parte-0.parquet'))
+
+    video1, video2 = seleccion_instagram(df)
+    pauta = mejor_pauta(df)
+    formato = recomendar_formato(rendimiento_por_grupo(df))
+    return {
+        'perfil': perfil,
+        'version': version_dataset(ruta),
+        'fecha_puntaje': date.today().isoformat(),
+        'categoria': categoria,
+        'videos': len(df),
+        'sends_per_reach_prom': float(df['Sends_per_Reach'].mean()),
+        'likes_per_reach_prom': float(df['Likes_per_Reach'].mean()),
+        'quality_score_prom': float(df['Quality_Score'].mean()),
+        'tiktok_fb': [int(v) for v in seleccion_tiktok(df, clips_tiktok_fb)['#']],
+        'instagram_video1': int(video1['#']),
+        'instagram_video2': int(video2['#']),
+        'mejor_pauta': int(pauta['#']),
+        'formato_tipo': formato['tipo'],
+        'formato_duracion': formato['duracion'],
+    }
+
+
+def puntuar_libros(libros, salida, procesos=None, clips_tiktok_fb=7):
+    """Puntúa todos los libros en paralelo; devuelve (recomendaciones, errores)"""
+    os.makedirs(salida, exist_ok=True)
+    # Categoría de cada perfil según su último conteo de seguidores (para los benchmarks entre pares)
+    serie = leer_serie()
+    filas, errores = [], {}
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {pool.submit(puntuar_libro, ruta, salida, clips_tiktok_fb,
+                               categoria_perfil(serie, nombre_perfil(ruta))): ruta for ruta in libros}
+        for futuro in as_completed(futuros):
+            ruta = futuros[futuro]
+            try:
+                filas.append(futuro.result())
+                log.info("✅ %s", ruta)
+            except Exception as e:
+                errores[ruta] = str(e)
+                log.error("❌ %s: %s", ruta, e)
+
+    recomendaciones = pd.DataFrame(filas)
+    if not recomendaciones.empty:
+        recomendaciones = recomendaciones.sort_values('perfil')
+        recomendaciones.to_parquet(os.path.join(salida, 'recomendaciones.parquet'), index=False)
+    return recomendaciones, errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring por lotes de libros con el esquema de datos.xlsx")
+    parser.add_argument('rutas', nargs='+', help="Libros .xlsx, tablas importadas o directorios que los contienen")
+    parser.add_argument('--salida', default='puntajes')
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--clips-tiktok-fb', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    libros = libros_en(args.rutas)
+    if not libros:
+        parser.error("No se encontraron libros .xlsx ni perfiles importados")
+
+    recomendaciones, errores = puntuar_libros(libros, args.salida, args.procesos, args.clips_tiktok_fb)
+    log.info("%d perfiles puntuados, %d con error → %s", len(recomendaciones), len(errores), args.salida)
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+🎯 RECOMENDACIONES - SELECCIÓN DE CONTENIDO Y PLAN SEMANAL
+Funnel TikTok/FB → Instagram → Pauta: las mismas reglas que usa la página
+de estrategia, disponibles para exportes, CLI y API
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+
+from analitica.datos import calcular_pauta_score
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+
+def seleccion_tiktok(df, clips):
+    """Videos para TikTok/FB: los de mayor Quality Score"""
+    return df.sort_values('Quality_Score', ascending=False).head(clips)
+
+
+def seleccion_instagram(df):
+    """Los 2 videos del día para Instagram: el de más vistas y el de más likes (distinto)"""
+    video1 = df.nlargest(1, 'Reproducciones').iloc[0]
+    top_likes = df.nlargest(2, 'Likes')
+    video2 = top_likes.iloc[1] if top_likes.iloc[0]['#'] == video1['#'] else top_likes.iloc[0]
+    return video1, video2
+
+
+def ranking_pauta(df, n=5):
+    """Videos ordenados por Pauta_Score"""
+    return df.assign(Pauta_Score=calcular_pauta_score(df)).nlargest(n, 'Pauta_Score')
+
+
+def mejor_pauta(df):
+    return ranking_pauta(df, 1).iloc[0]
+
+
+def plan_semanal(df, fecha_inicio, clips_tiktok_fb, clips_instagram):
+    """
+    Plan de 7 días en formato largo (una fila por día, canal y video):
+    TikTok/FB por Quality Score, Instagram por vistas, pauta el domingo.
+    """
+    por_qs = df.nlargest(clips_tiktok_fb + len(DIAS_SEMANA), 'Quality_Score')['#'].tolist()
+    por_vistas = df.nlargest(clips_instagram + 2 * len(DIAS_SEMANA), 'Reproducciones')['#'].tolist()
+
+    filas = []
+    for i, dia in enumerate(DIAS_SEMANA):
+        fecha = fecha_inicio + timedelta(days=i)
+
+        # Ventana deslizante sobre los rankings (equivale a nlargest(n + i).tail(n))
+        videos = {
+            'TikTok/FB': por_qs[:clips_tiktok_fb + i][-clips_tiktok_fb:],
+            'Instagram': por_vistas[:clips_instagram + i * 2][-clips_instagram:],
+            'Pauta': [mejor_pauta(df)['#']] if i == 6 else [],  # Pauta el domingo
+        }
+        filas.extend({'Día': dia, 'Fecha': fecha, 'Canal': canal, 'Video': int(v)}
+                     for canal, lista in videos.items() for v in lista)
+    return pd.DataFrame(filas, columns=['Día', 'Fecha', 'Canal', 'Video'])
+
+
+def calendario_semanal(df, fecha_inicio, clips_tiktok_fb, clips_instagram):
+    """Plan de 7 días, un renglón por día (ver `plan_semanal`)"""
+    return calendario_de_plan(plan_semanal(df, fecha_inicio, clips_tiktok_fb, clips_instagram))
+
+
+def calendario_de_plan(plan):
+    """Formato de tabla del calendario: videos de cada canal como '#1, #16' y 💰 el día de pauta"""
+    calendario_data = []
+    for (dia, fecha), del_dia in plan.groupby(['Día', 'Fecha'], sort=False):
+        canales = del_dia.groupby('Canal', sort=False)['Video'].agg(list)
+        calendario_data.append({
+            'Día': dia,
+            'Fecha': fecha.strftime('%d/%m'),
+            'TikTok/FB': ", ".join(f"#{int(v)}" for v in canales.get('TikTok/FB', [])),
+            'Instagram': ", ".join(f"#{int(v)}" for v in canales.get('Instagram', [])),
+            'Pauta': '💰' if 'Pauta' in canales else ''
+        })
+    return pd.DataFrame(calendario_data)
@@ -0,0 +1,248 @@
+"""
+👥 SEGUIDORES - SERIE DIARIA POR PERFIL Y ALCANCE POR SEGUIDOR
+Los conteos diarios de seguidores (CSV/JSON exportados o anotados a mano)
+se acumulan en una sola tabla columnar (perfil, fecha, seguidores). La
+actualización es incremental: solo se leen los archivos nuevos o
+modificados. Cada video se une a la serie con un as-of join vectorizado
+(`merge_asof` por perfil) para obtener los seguidores al publicar, el alcance
+por seguidor y el crecimiento atribuido hasta el siguiente video.
+
+Uso:
+    python -m analitica.seguidores seguidores/
+
+Entrada (una carpeta por perfil, o una columna `perfil` en el archivo):
+    seguidores/<perfil>/*.csv|*.json|*.jsonl     fecha + seguidores
+
+Salida:
+    seguidores/serie.arrow     (perfil, fecha, seguidores) ordenada
+    seguidores/estado.json     tamaño y fecha de cada archivo ya leído
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from analitica.importar import EXTENSIONES, leer_estado, leer_registros, _fecha, _numero
+
+log = logging.getLogger(__name__)
+
+DIRECTORIO_SEGUIDORES = os.environ.get('DASHBOARD_SEGUIDORES', 'seguidores')
+PERFIL_PRINCIPAL = os.environ.get('DASHBOARD_PERFIL', 'miguemontes1')
+ARCHIVO_SERIE = 'serie.arrow'
+
+# Campo → nombres con que aparece en los archivos (en minúsculas)
+ALIAS_SEGUIDORES = {
+    'perfil': ['perfil', 'profile', 'username', 'usuario', 'cuenta', 'account'],
+    'fecha': ['fecha', 'date', 'día', 'dia', 'day', 'timestamp'],
+    'seguidores': ['seguidores', 'followers', 'follower count', 'followers count', 'total followers',
+                   'total de seguidores'],
+}
+
+ESQUEMA_SERIE = pa.schema([
+    ('perfil', pa.string()),
+    ('fecha', pa.timestamp('us')),
+    ('seguidores', pa.int64()),
+])
+
+# El crecimiento posterior a un video se le atribuye hasta el siguiente video, a lo sumo estos días
+VENTANA_ATRIBUCION_DIAS = 7
+
+# Categoría del perfil por seguidores (cota inferior de cada tramo)
+CORTES_CATEGORIA = [0, 1_000, 10_000, 50_000, 500_000, 1_000_000, np.inf]
+CATEGORIAS = ['Emergente', 'Nano Influencer', 'Micro Influencer', 'Mid-tier Influencer',
+              'Macro Influencer', 'Mega Influencer']
+
+
+def categoria_influencer(seguidores):
+    """'Nano Influencer', 'Micro Influencer', ... según el número de seguidores (None si no hay dato)"""
+    if seguidores is None or pd.isna(seguidores):
+        return None
+    return CATEGORIAS[np.searchsorted(CORTES_CATEGORIA, seguidores, side='right') - 1]
+
+
+# ============================================
+# ARCHIVOS → SERIE
+# ============================================
+def _campos(registro):
+    normalizado = {str(k).strip().lower(): v for k, v in registro.items()}
+    campos = {}
+    for campo, alias in ALIAS_SEGUIDORES.items():
+        valor = next((normalizado[a] for a in alias if normalizado.get(a) not in (None, '')), None)
+        if valor is not None:
+            campos[campo] = valor
+    return campos
+
+
+def leer_conteos(ruta, perfil):
+    """DataFrame (perfil, fecha, seguidores) de un archivo; `perfil` si el archivo no lo trae"""
+    filas = []
+    for registro in leer_registros(ruta):
+        campos = _campos(registro)
+        if 'fecha' not in campos or 'seguidores' not in campos:
+            continue
+        filas.append((str(campos.get('perfil', perfil)).lstrip('@'), _fecha(campos['fecha']),
+                      _numero(campos['seguidores'])))
+    conteos = pd.DataFrame(filas, columns=['perfil', 'fecha', 'seguidores'])
+    conteos['fecha'] = pd.to_datetime(conteos['fecha']).dt.normalize()
+    return conteos.dropna()
+
+
+def archivos_por_perfil(origen):
+    """Ruta relativa → (ruta, perfil) de cada archivo bajo `origen` (el perfil es la subcarpeta o el nombre)"""
+    archivos = {}
+    for raiz, _, nombres in os.walk(origen):
+        for nombre in sorted(nombres):
+            if not nombre.lower().endswith(EXTENSIONES) or nombre.startswith('.') or nombre == 'estado.json':
+                continue
+            ruta = os.path.join(raiz, nombre)
+            relativa = os.path.relpath(ruta, origen)
+            carpeta = os.path.dirname(relativa)
+            archivos[relativa] = (ruta, carpeta.split(os.sep)[0] if carpeta else os.path.splitext(nombre)[0])
+    return archivos
+
+
+def firma_archivo(ruta):
+    estado = os.stat(ruta)
+    return f'{estado.st_size}|{estado.st_mtime_ns}'
+
+
+def leer_serie(directorio=DIRECTORIO_SEGUIDORES):
+    """Serie completa (memory-map), ordenada por perfil y fecha"""
+    ruta = os.path.join(directorio, ARCHIVO_SERIE)
+    if not os.path.isfile(ruta):
+        return ESQUEMA_SERIE.empty_table().to_pandas()
+    return feather.read_table(ruta, memory_map=True).to_pandas()
+
+
+def huella_seguidores(origen=DIRECTORIO_SEGUIDORES):
+    """Cambia si se agrega o modifica algún archivo de conteos (solo `stat`, sin leerlos)"""
+    return '|'.join(f'{r}:{firma_archivo(ruta)}' for r, (ruta, _) in sorted(archivos_por_perfil(origen).items()))
+
+
+def actualizar_serie(origen=DIRECTORIO_SEGUIDORES, directorio=None):
+    """
+    Suma a la serie los archivos nuevos o modificados desde la última vez;
+    devuelve cuántos archivos leyó. Un mismo (perfil, fecha) queda con el
+    valor del archivo leído más tarde.
+    """
+    directorio = directorio or origen
+    estado = leer_estado(directorio)
+    archivos = archivos_por_perfil(origen)
+    pendientes = {r: a for r, a in archivos.items() if estado.get(r) != firma_archivo(a[0])}
+    if not pendientes:
+        return 0
+
+    nuevos = [leer_conteos(ruta, perfil) for ruta, perfil in pendientes.values()]
+    serie = pd.concat([leer_serie(directorio), *nuevos], ignore_index=True)
+    serie = (serie.drop_duplicates(['perfil', 'fecha'], keep='last')
+             .sort_values(['perfil', 'fecha'], kind='stable').reset_index(drop=True))
+    serie['seguidores'] = serie['seguidores'].astype('int64')
+
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, ARCHIVO_SERIE)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    tabla = pa.Table.from_pandas(serie, schema=ESQUEMA_SERIE, preserve_index=False)
+    feather.write_feather(tabla, temporal, compression='uncompressed')
+    os.replace(temporal, destino)
+
+    # El estado va después de la serie: si se corta antes, los archivos se vuelven a leer
+    estado.update({r: firma_archivo(ruta) for r, (ruta, _) in pendientes.items()})
+    temporal = os.path.join(directorio, f'.estado.{os.getpid()}.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, indent=0)
+    os.replace(temporal, os.path.join(directorio, 'estado.json'))
+    return len(pendientes)
+
+
+# ============================================
+# SERIE ↔ VIDEOS
+# ============================================
+def _asof(claves, serie, direction):
+    """Seguidores y fecha del conteo vigente para cada (perfil, fecha) de `claves`"""
+    izquierda = claves.reset_index(names='_fila').sort_values('fecha', kind='stable')
+    derecha = serie.assign(fecha_conteo=serie['fecha']).sort_values('fecha', kind='stable')
+    unido = pd.merge_asof(izquierda, derecha, on='fecha', by='perfil', direction=direction)
+    return unido.set_index('_fila').sort_index()[['seguidores', 'fecha_conteo']]
+
+
+def seguidores_por_video(df, serie, perfil=PERFIL_PRINCIPAL):
+    """
+    Por video: `Seguidores` al publicar, `Alcance_por_Seguidor` (vistas /
+    seguidores) y `Crecimiento` (seguidores ganados hasta el siguiente día con
+    video, a lo sumo VENTANA_ATRIBUCION_DIAS días, repartidos entre los videos
+    del día; NaN sin conteos en ese lapso).
+
+    `df` puede traer una columna `Perfil` (varios perfiles a la vez); si no,
+    todos los videos son de `perfil`. Antes del primer conteo se usa el primero.
+    """
+    perfiles = df['Perfil'] if 'Perfil' in df.columns else pd.Series(perfil, index=df.index)
+    claves = pd.DataFrame({'perfil': perfiles.astype(str).to_numpy(),
+                           'fecha': pd.to_datetime(df['Fecha']).dt.normalize().to_numpy()})
+    serie = serie.astype({'perfil': str, 'seguidores': 'float64'})
+    serie['fecha'] = serie['fecha'].astype(claves['fecha'].dtype)
+
+    al_publicar = _asof(claves, serie, 'backward')
+    al_publicar = al_publicar.fillna(_asof(claves, serie, 'forward'))
+
+    # Fin de la ventana: el siguiente día con video del mismo perfil o VENTANA_ATRIBUCION_DIAS días
+    dias = claves.drop_duplicates().sort_values(['perfil', 'fecha'], kind='stable')
+    dias['siguiente'] = dias.groupby('perfil')['fecha'].shift(-1)
+    dias['videos_del_dia'] = claves.groupby(['perfil', 'fecha']).size().reindex(
+        pd.MultiIndex.from_frame(dias[['perfil', 'fecha']])).to_numpy()
+    por_video = claves.merge(dias, on=['perfil', 'fecha'], how='left')
+    limite = claves['fecha'] + pd.Timedelta(days=VENTANA_ATRIBUCION_DIAS)
+    fin = por_video['siguiente'].where(por_video['siguiente'] < limite, limite)
+    al_cierre = _asof(claves.assign(fecha=fin), serie, 'backward')
+    # Hace falta un conteo real a cada lado de la publicación para atribuir crecimiento
+    medido = (al_publicar['fecha_conteo'] <= claves['fecha']) & (al_cierre['fecha_conteo'] > claves['fecha'])
+    # Los videos del mismo día se reparten el crecimiento en partes iguales
+    crecimiento = (al_cierre['seguidores'] - al_publicar['seguidores']).where(medido) / por_video['videos_del_dia']
+
+    seguidores = al_publicar['seguidores'].to_numpy()
+    vistas = df['Reproducciones'].to_numpy(dtype='float64')
+    return pd.DataFrame({
+        'Seguidores': seguidores,
+        'Alcance_por_Seguidor': vistas / np.where(seguidores > 0, seguidores, np.nan),
+        'Crecimiento': crecimiento.to_numpy(),
+    }, index=df.index)
+
+
+def resumen_seguidores(serie, perfil=PERFIL_PRINCIPAL, dias=30):
+    """Último conteo, variación en `dias` días y categoría del perfil (None si no hay conteos)"""
+    propia = serie[serie['perfil'] == perfil]
+    if propia.empty:
+        return None
+    ultimo = propia.iloc[-1]
+    previos = propia[propia['fecha'] <= ultimo['fecha'] - pd.Timedelta(days=dias)]
+    return {
+        'seguidores': int(ultimo['seguidores']),
+        'fecha': ultimo['fecha'],
+        'variacion': int(ultimo['seguidores'] - previos.iloc[-1]['seguidores']) if len(previos) else None,
+        'categoria': categoria_influencer(ultimo['seguidores']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actualiza la serie diaria de seguidores con los archivos nuevos")
+    parser.add_argument('origen', nargs='?', default=DIRECTORIO_SEGUIDORES,
+                        help="Carpeta con una subcarpeta (o archivo) por perfil")
+    parser.add_argument('--salida', default=None, help="Carpeta de la serie (por defecto, la misma de origen)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    leidos = actualizar_serie(args.origen, args.salida)
+    serie = leer_serie(args.salida or args.origen)
+    log.info("%d archivos nuevos o modificados; %d conteos de %d perfiles",
+             leidos, len(serie), serie['perfil'].nunique())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+🚦 SEMÁFOROS - CLASIFICACIÓN VECTORIZADA POR BENCHMARK
+Umbrales de Mosseri 2025 aplicados a columnas completas con `np.select`,
+de modo que cada video tiene su semáforo por métrica. El semáforo frente a
+pares usa en cambio el percentil del perfil dentro de su portafolio.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Umbrales de mayor a menor: (límite, emoji, estado). Lo que no supera ninguno es 🔴 Bajo
+UMBRALES = {
+    'Sends_per_Reach': {'inclusivo': False, 'niveles': [(1.0, '🚀', 'Explosivo'), (0.4, '🟢', 'Alto'),
+                                                         (0.1, '🟡', 'Promedio')]},
+    'Likes_per_Reach': {'inclusivo': False, 'niveles': [(6.0, '🚀', 'Viral'), (3.0, '🟢', 'Excelente'),
+                                                         (1.5, '🟡', 'Promedio')]},
+    'Quality_Score': {'inclusivo': True, 'niveles': [(8, '🚀', 'Excelente'), (6, '🟢', 'Bueno'),
+                                                      (4, '🟡', 'Promedio')]},
+}
+BAJO = ('🔴', 'Bajo')
+
+# Semáforo frente a pares: percentil (0-100) dentro de los videos de perfiles comparables
+UMBRALES_PERCENTIL = [(90, '🚀', 'Top 10%'), (50, '🟢', 'Sobre la mediana'), (25, '🟡', 'Promedio')]
+
+COLOR_SEMAFORO = {'🚀': '#38a169', '🟢': '#38a169', '🟡': '#d69e2e', '🔴': '#e53e3e'}
+
+# Columnas de semáforo por video
+COLUMNAS_SEMAFORO = {
+    'Sends_per_Reach': '🚦 Sends',
+    'Likes_per_Reach': '🚦 Likes',
+    'Quality_Score': '🚦 QS',
+}
+
+
+def clasificar(valores, metrica):
+    """Emoji y estado para un array de valores (vectorizado)"""
+    config = UMBRALES[metrica]
+    x = np.asarray(valores, dtype='float64')
+    condiciones = [(x >= limite) if config['inclusivo'] else (x > limite) for limite, _, _ in config['niveles']]
+    emojis = np.select(condiciones, [e for _, e, _ in config['niveles']], default=BAJO[0])
+    estados = np.select(condiciones, [s for _, _, s in config['niveles']], default=BAJO[1])
+    return emojis, estados
+
+
+def clasificar_percentil(percentiles):
+    """Emoji y estado por percentil frente a pares (vectorizado)"""
+    x = np.asarray(percentiles, dtype='float64')
+    condiciones = [x >= limite for limite, _, _ in UMBRALES_PERCENTIL]
+    emojis = np.select(condiciones, [e for _, e, _ in UMBRALES_PERCENTIL], default=BAJO[0])
+    estados = np.select(condiciones, [s for _, _, s in UMBRALES_PERCENTIL], default=BAJO[1])
+    return emojis, estados
+
+
+def _escalar(metrica):
+    def semaforo(val):
+        emojis, estados = clasificar([val], metrica)
+        return str(emojis[0]), str(estados[0])
+    return semaforo
+
+
+semaforo_sends = _escalar('Sends_per_Reach')
+semaforo_likes = _escalar('Likes_per_Reach')
+semaforo_qs = _escalar('Quality_Score')
+
+
+def color_semaforo(emoji):
+    return COLOR_SEMAFORO.get(emoji, COLOR_SEMAFORO['🔴'])
+
+
+def semaforos_por_video(df):
+    """Semáforo por video y métrica ('🟢 Alto', ...) alineado con el índice de df"""
+    columnas = {}
+    for metrica, nombre in COLUMNAS_SEMAFORO.items():
+        emojis, estados = clasificar(df[metrica].to_numpy(), metrica)
+        columnas[nombre] = np.char.add(np.char.add(emojis.astype(str), ' '), estados.astype(str))
+    return pd.DataFrame(columnas, index=df.index)
@@ -0,0 +1,121 @@
+"""
+👥 SESIONES - AISLAMIENTO Y PRESUPUESTO DE MEMORIA
+El dataset se comparte entre sesiones en modo solo lectura; cada sesión
+trabaja sobre vistas ligeras (copy-on-write) con sus columnas derivadas.
+Incluye el conteo de sesiones activas y el control de memoria del proceso.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Con copy-on-write, `assign`/`copy(deep=False)` comparten los datos del
+# dataset y solo materializan las columnas que la sesión modifica
+# (es el comportamiento por defecto a partir de pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+PRESUPUESTO_MEMORIA_MB = float(os.environ.get('DASHBOARD_MEMORIA_MB', 0)) or None
+SESION_INACTIVA_SEG = 30 * 60
+
+
+def vista_sesion(df, **columnas):
+    """Vista de la sesión sobre el dataset compartido, con columnas derivadas propias"""
+    return df.assign(**columnas) if columnas else df.copy(deep=False)
+
+
+def memoria_proceso_mb(pid=None):
+    """Memoria residente actual del proceso (MB; este u otro por `pid`), o None si no se puede medir"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if pid is not None:
+        return None
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss viene en KB en Linux y en bytes en macOS (y es el pico, no el actual)
+        return pico / 2**20 if sys.platform == 'darwin' else pico / 2**10
+    except ImportError:
+        return None
+
+
+class RegistroSesiones:
+    """Sesiones vistas recientemente en este proceso (para telemetría)"""
+
+    def __init__(self, inactiva_seg=SESION_INACTIVA_SEG):
+        self.inactiva_seg = inactiva_seg
+        self._ultima_visita = {}
+        self._pico = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, sesion_id):
+        ahora = time.monotonic()
+        with self._lock:
+            self._ultima_visita[sesion_id] = ahora
+            limite = ahora - self.inactiva_seg
+            for sid in [s for s, t in self._ultima_visita.items() if t < limite]:
+                del self._ultima_visita[sid]
+            self._pico = max(self._pico, len(self._ultima_visita))
+
+    def activas(self):
+        with self._lock:
+            return len(self._ultima_visita)
+
+    def pico(self):
+        with self._lock:
+            return self._pico
+
+
+class ControlMemoria:
+    """
+    Presupuesto de memoria por proceso: al superarlo se liberan las cachés
+    derivadas y los recursos recargables (callback `liberar`), como mucho una
+    vez por intervalo.
+    """
+
+    def __init__(self, presupuesto_mb=PRESUPUESTO_MEMORIA_MB, intervalo_seg=60):
+        self.presupuesto_mb = presupuesto_mb
+        self.intervalo_seg = intervalo_seg
+        self.liberaciones = 0
+        self._ultima_liberacion = 0.0
+        self._lock = threading.Lock()
+
+    def verificar(self, liberar):
+        """Devuelve la memoria actual (MB); libera cachés si se supera el presupuesto"""
+        memoria = memoria_proceso_mb()
+        if self.presupuesto_mb is None or memoria is None or memoria <= self.presupuesto_mb:
+            return memoria
+        with self._lock:
+            if time.monotonic() - self._ultima_liberacion < self.intervalo_seg:
+                return memoria
+            self._ultima_liberacion = time.monotonic()
+            self.liberaciones += 1
+        log.warning("Memoria %.0f MB supera el presupuesto de %.0f MB: liberando cachés",
+                    memoria, self.presupuesto_mb)
+        liberar()
+        return memoria_proceso_mb()
+
+
+registro_sesiones = RegistroSesiones()
+control_memoria = ControlMemoria()
+
+
+def telemetria():
+    """Resumen de sesiones y memoria del proceso"""
+    return {
+        'sesiones_activas': registro_sesiones.activas(),
+        'pico_sesiones': registro_sesiones.pico(),
+        'memoria_mb': memoria_proceso_mb(),
+        'presupuesto_mb': control_memoria.presupuesto_mb,
+        'liberaciones': control_memoria.liberaciones,
+    }
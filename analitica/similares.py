@@ -0,0 +1,159 @@
+"""
+🧬 SIMILARES - ÍNDICE DE VECINOS CERCANOS ENTRE VIDEOS
+Cada video es un vector (métricas normalizadas, categoría, formato, duración
+y rasgos del caption) de norma 1, así la similitud es un producto punto. El
+índice es un IVF: k-means reparte los videos en listas y una consulta solo
+recorre las listas de los centroides más cercanos, con lo que el costo crece
+con √n y no con n. Con pocos videos se recorre todo (resultado exacto).
+"""
+
+import numpy as np
+import pandas as pd
+
+from analitica.formatos import preparar_dimensiones, duracion_a_segundos
+
+METRICAS = ['Reproducciones', 'Sends_per_Reach', 'Likes_per_Reach', 'Quality_Score']
+RASGOS_CAPTION = ['Longitud', 'Hashtags', 'Menciones', 'Emojis', 'Pregunta', 'CTA']
+
+# Peso de cada bloque del vector (cada bloque pesa lo mismo sin importar cuántas columnas tenga)
+PESOS = {'metricas': 1.0, 'contenido': 1.0, 'duracion': 0.7, 'caption': 0.7}
+
+MIN_VIDEOS_IVF = 2000
+
+
+def _estandarizar(matriz):
+    media = np.nanmean(matriz, axis=0)
+    desvio = np.nanstd(matriz, axis=0)
+    z = (matriz - media) / np.where(desvio > 0, desvio, 1)
+    return np.nan_to_num(z)
+
+
+def _bloque(matriz, peso):
+    """Bloque de columnas con norma esperada `peso` por fila"""
+    return matriz * (peso / np.sqrt(max(matriz.shape[1], 1)))
+
+
+def _one_hot(serie):
+    codigos = serie.cat.codes.to_numpy()
+    matriz = np.zeros((len(serie), len(serie.cat.categories)), dtype=np.float32)
+    validos = codigos >= 0
+    matriz[np.flatnonzero(validos), codigos[validos]] = 1
+    return matriz
+
+
+def vectores_video(df, rasgos=None):
+    """Matriz float32 (videos × dimensiones) de filas con norma 1"""
+    metricas = df[METRICAS].to_numpy(dtype='float64').copy()
+    metricas[:, 0] = np.log1p(metricas[:, 0])  # vistas en escala log: un viral no aplasta al resto
+    dims = preparar_dimensiones(df)
+    segundos = duracion_a_segundos(df['Duración (min:seg)']).to_numpy(dtype='float64')[:, None]
+
+    bloques = [
+        _bloque(_estandarizar(metricas), PESOS['metricas']),
+        _bloque(np.hstack([_one_hot(dims['Categoría']), _one_hot(dims['Formato'])]), PESOS['contenido']),
+        _bloque(np.hstack([_estandarizar(segundos), _one_hot(dims['Duración'])]), PESOS['duracion']),
+    ]
+    if rasgos is not None:
+        caption = rasgos.loc[df.index, RASGOS_CAPTION].to_numpy(dtype='float64')
+        caption[:, :4] = np.log1p(caption[:, :4])
+        bloques.append(_bloque(_estandarizar(caption), PESOS['caption']))
+
+    vectores = np.hstack(bloques).astype(np.float32)
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    return vectores / np.where(normas > 0, normas, 1)
+
+
+def _kmeans(vectores, k, iteraciones=10, semilla=0):
+    """k-means esférico (centroides de norma 1), vectorizado; devuelve (centroides, asignación)"""
+    rng = np.random.default_rng(semilla)
+    centroides = vectores[rng.choice(len(vectores), size=k, replace=False)].copy()
+    for _ in range(iteraciones):
+        asignacion = np.argmax(vectores @ centroides.T, axis=1)
+        sumas = np.zeros_like(centroides)
+        np.add.at(sumas, asignacion, vectores)
+        normas = np.linalg.norm(sumas, axis=1, keepdims=True)
+        vacios = normas[:, 0] == 0
+        centroides = np.where(vacios[:, None], centroides, sumas / np.where(normas > 0, normas, 1))
+    return centroides, np.argmax(vectores @ centroides.T, axis=1)
+
+
+class IndiceSimilares:
+    """Vecinos más cercanos por similitud coseno (IVF aproximado desde MIN_VIDEOS_IVF videos)"""
+
+    def __init__(self, vectores, etiquetas, sondas=8):
+        self.vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+        self.etiquetas = pd.Index(etiquetas)
+        self.sondas = sondas
+        n = len(self.vectores)
+        if n >= MIN_VIDEOS_IVF:
+            listas = int(np.sqrt(n))
+            self.centroides, asignacion = _kmeans(self.vectores, listas)
+            # Listas como CSR: posiciones de los videos ordenadas por lista
+            self._orden = np.argsort(asignacion, kind='stable')
+            self._inicios = np.concatenate([[0], np.cumsum(np.bincount(asignacion, minlength=listas))])
+            # Cada lista contigua en memoria: una consulta es un producto matriz-vector por lista
+            self.vectores = self.vectores[self._orden]
+            self.etiquetas = self.etiquetas[self._orden]
+        else:
+            self.centroides = None
+        self._posiciones = pd.Series(np.arange(n), index=self.etiquetas)
+
+    @classmethod
+    def construir(cls, df, rasgos=None, sondas=8):
+        return cls(vectores_video(df, rasgos), df.index, sondas)
+
+    def _candidatos(self, vector):
+        """Bloques contiguos de posiciones a recorrer para la consulta"""
+        if self.centroides is None:
+            return [(0, len(self.vectores))]
+        cercanos = np.argsort(-(self.centroides @ vector))[:self.sondas]
+        return [(self._inicios[c], self._inicios[c + 1]) for c in cercanos]
+
+    def buscar(self, vector, k=10, excluir=()):
+        """Las `k` etiquetas más similares al vector, con su similitud (Series ordenada)"""
+        vector = np.asarray(vector, dtype=np.float32)
+        norma = np.linalg.norm(vector)
+        vector = vector / norma if norma > 0 else vector
+        posiciones = np.concatenate([np.arange(i, f) for i, f in self._candidatos(vector)])
+        similitud = self.vectores[posiciones] @ vector
+        if len(excluir):
+            fuera = self._posiciones.reindex(excluir).dropna().to_numpy(dtype=np.int64)
+            similitud[np.isin(posiciones, fuera)] = -np.inf
+        k = min(k, int(np.isfinite(similitud).sum()))
+        mejores = np.argpartition(-similitud, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        mejores = mejores[np.argsort(-similitud[mejores])]
+        return pd.Series(similitud[mejores], index=self.etiquetas[posiciones[mejores]], name='Similitud')
+
+    def vector(self, etiqueta):
+        return self.vectores[self._posiciones[etiqueta]]
+
+    def similares_a(self, etiqueta, k=10):
+        return self.buscar(self.vector(etiqueta), k, excluir=[etiqueta])
+
+    def mas_como(self, etiquetas, k=10):
+        """Videos parecidos al conjunto (centroide de sus vectores), sin incluirlos"""
+        centro = self.vectores[self._posiciones[list(etiquetas)].to_numpy()].mean(axis=0)
+        return self.buscar(centro, k, excluir=list(etiquetas))
+
+
+def seleccion_diversa(df, indice, clips, diversidad=0.3, candidatos=None):
+    """
+    Selección por Maximal Marginal Relevance: cada clip sumado maximiza
+    (1 - diversidad) · QS normalizado - diversidad · similitud con los ya elegidos.
+    Con diversidad=0 equivale a ordenar por Quality Score.
+    """
+    candidatos = df.nlargest(candidatos or max(clips * 5, 20), 'Quality_Score')
+    qs = candidatos['Quality_Score'].to_numpy(dtype='float64')
+    relevancia = (qs - qs.min()) / (np.ptp(qs) or 1)
+    vectores = indice.vectores[indice._posiciones[candidatos.index].to_numpy()]
+    similitud = vectores @ vectores.T
+
+    elegidos = []
+    maxima = np.full(len(candidatos), -np.inf)  # similitud con el más parecido ya elegido
+    for _ in range(min(clips, len(candidatos))):
+        puntaje = (1 - diversidad) * relevancia - diversidad * (maxima if elegidos else 0)
+        puntaje[elegidos] = -np.inf
+        elegido = int(np.argmax(puntaje))
+        elegidos.append(elegido)
+        maxima = np.maximum(maxima, similitud[elegido])
+    return candidatos.iloc[elegidos]
@@ -0,0 +1,75 @@
+"""
+🃏 TARJETAS - PLANTILLAS HTML DE LAS TARJETAS KPI
+Plantillas compiladas una sola vez (`string.Template`) y compartidas por las páginas
+"""
+
+from string import Template
+
+from analitica.semaforos import color_semaforo
+
+GRADIENTES = {
+    'morado': '#667eea 0%, #764ba2 100%',
+    'rosa': '#f093fb 0%, #f5576c 100%',
+    'azul': '#4facfe 0%, #00f2fe 100%',
+    'verde': '#43e97b 0%, #38f9d7 100%',
+    'instagram': '#833AB4 0%, #FD1D1D 100%',
+    'instagram_alt': '#FCAF45 0%, #833AB4 100%',
+}
+
+PLANTILLA_PROMEDIO = Template("""
+    <div style="background: linear-gradient(135deg, $gradiente); padding: 1rem; border-radius: 0.5rem; text-align: center; color: white;">
+        <p style="margin: 0; font-size: 0.9rem; opacity: 0.9;">$etiqueta</p>
+        <h3 style="margin: 0.3rem 0 0 0;">$valor</h3>
+    </div>
+""")
+
+PLANTILLA_SEMAFORO = Template("""
+    <div style="background: #f7fafc; padding: 1.5rem; border-radius: 1rem; text-align: center; border-left: 5px solid $color;">
+        <h1 style="margin: 0;">$emoji</h1>
+        <h3 style="margin: 0.5rem 0; color: #1a365d; font-weight: 700;">$titulo</h3>
+        <h2 style="margin: 0; color: #2d3748;">$valor</h2>
+        <p style="margin: 0.5rem 0 0 0; color: #4a5568; font-weight: 600;">$estado</p>
+        <p style="margin: 0.5rem 0 0 0; color: #718096; font-size: 0.8rem;">$formula</p>
+    </div>
+""")
+
+PLANTILLA_VIDEO = Template("""
+    <div style="background: linear-gradient(135deg, $gradiente);
+                color: white; padding: 1.5rem; border-radius: 1rem; text-align: center;">
+        <h3>$titulo</h3>
+        <h1>#$numero</h1>
+        <p>👁️ $vistas vistas</p>
+        <p>❤️ $likes likes</p>
+    </div>
+""")
+
+PLANTILLA_PAUTA = Template("""
+    <div class="pauta-box">
+        <h2>🏆 VIDEO RECOMENDADO PARA PAUTA</h2>
+        <h1 style="font-size: 4rem;">Video #$numero</h1>
+        <p style="font-size: 1.2rem;">
+            👁️ $vistas vistas orgánicas |
+            ❤️ $likes likes |
+            ⭐ QS: $qs
+        </p>
+    </div>
+""")
+
+
+def tarjeta_promedio(etiqueta, valor, gradiente='morado'):
+    return PLANTILLA_PROMEDIO.substitute(etiqueta=etiqueta, valor=valor, gradiente=GRADIENTES[gradiente])
+
+
+def tarjeta_semaforo(emoji, estado, titulo, valor, formula):
+    return PLANTILLA_SEMAFORO.substitute(emoji=emoji, estado=estado, titulo=titulo, valor=valor,
+                                         formula=formula, color=color_semaforo(emoji))
+
+
+def tarjeta_video(titulo, video, gradiente='instagram'):
+    return PLANTILLA_VIDEO.substitute(titulo=titulo, numero=int(video['#']), gradiente=GRADIENTES[gradiente],
+                                      vistas=f"{video['Reproducciones']:,.0f}", likes=f"{video['Likes']:,.0f}")
+
+
+def tarjeta_pauta(video):
+    return PLANTILLA_PAUTA.substitute(numero=int(video['#']), vistas=f"{video['Reproducciones']:,.0f}",
+                                      likes=f"{video['Likes']:,.0f}", qs=f"{video['Quality_Score']:.1f}")
@@ -0,0 +1,170 @@
+"""
+📝 TEXTOS - ALMACÉN LATERAL DE CAPTIONS Y COMENTARIOS
+Los textos largos (`Descripción/Caption`, `Raw Data: Comentarios`) salen del
+DataFrame principal y se guardan en disco por versión del dataset: un blob
+UTF-8 por columna más un arreglo de offsets, ambos leídos con memory-map
+solo cuando una página los necesita. Al ingerir en streaming se escriben
+bloque a bloque, sin llegar a tener todos los textos en memoria.
+"""
+
+import mmap
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analitica.busqueda import IndexadorBusqueda, indexado
+from analitica.datos import COLUMNAS_TEXTO, DIRECTORIO_CACHE, HOJA, compactar
+from analitica.lector import LectorHoja
+from analitica.validacion import validar_esquema
+
+
+def _archivo(columna):
+    return ''.join(c if c.isalnum() else '_' for c in columna.lower())
+
+
+def directorio_textos(version, directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, 'textos', version)
+
+
+class EscritorTextos:
+    """
+    Escribe el almacén de una versión bloque a bloque (el blob crece en disco,
+    en memoria solo quedan offsets y nulos) y lo publica de forma atómica.
+    """
+
+    def __init__(self, version, columnas=COLUMNAS_TEXTO, directorio=DIRECTORIO_CACHE):
+        self.version = version
+        self.columnas = columnas
+        self.destino = directorio_textos(version, directorio)
+        self.temporal = f'{self.destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+        self._indice = []
+        self._blobs = {}
+        self._offsets = {c: [np.zeros(1, dtype=np.int64)] for c in columnas}
+        self._nulos = {c: [] for c in columnas}
+        os.makedirs(self.temporal, exist_ok=True)
+
+    def agregar(self, df):
+        self._indice.append(df.index.to_numpy())
+        for columna in self.columnas:
+            if columna not in df.columns:
+                continue
+            if columna not in self._blobs:
+                self._blobs[columna] = open(os.path.join(self.temporal, f'{_archivo(columna)}.bin'), 'wb')
+            nulos = df[columna].isna().to_numpy()
+            codificados = [b'' if nulo else str(v).encode('utf-8') for v, nulo in zip(df[columna], nulos)]
+            self._blobs[columna].write(b''.join(codificados))
+            ultimo = self._offsets[columna][-1][-1]
+            self._offsets[columna].append(ultimo + np.cumsum([len(b) for b in codificados], dtype=np.int64))
+            self._nulos[columna].append(nulos)
+
+    def cerrar(self):
+        """Publica el almacén y borra las versiones anteriores; devuelve su ruta"""
+        np.save(os.path.join(self.temporal, 'indice.npy'),
+                np.concatenate(self._indice) if self._indice else np.array([], dtype=np.int64))
+        for columna, blob in self._blobs.items():
+            blob.close()
+            nombre = _archivo(columna)
+            np.save(os.path.join(self.temporal, f'{nombre}.off.npy'), np.concatenate(self._offsets[columna]))
+            np.save(os.path.join(self.temporal, f'{nombre}.nul.npy'), np.concatenate(self._nulos[columna]))
+
+        try:
+            os.replace(self.temporal, self.destino)
+        except OSError:
+            # Otro proceso publicó la misma versión primero
+            shutil.rmtree(self.temporal, ignore_errors=True)
+
+        # Las versiones anteriores ya no se usan (en Windows pueden seguir abiertas)
+        carpeta = os.path.dirname(self.destino)
+        for nombre in os.listdir(carpeta):
+            if nombre != self.version and not nombre.endswith('.tmp'):
+                shutil.rmtree(os.path.join(carpeta, nombre), ignore_errors=True)
+        return self.destino
+
+    def descartar(self):
+        for blob in self._blobs.values():
+            blob.close()
+        shutil.rmtree(self.temporal, ignore_errors=True)
+
+
+def guardar_textos(df, version, columnas=COLUMNAS_TEXTO, directorio=DIRECTORIO_CACHE):
+    """Escribe las columnas de texto al almacén (una vez por versión) y devuelve su ruta"""
+    destino = directorio_textos(version, directorio)
+    if os.path.isdir(destino):
+        return destino
+    escritor = EscritorTextos(version, columnas, directorio)
+    escritor.agregar(df)
+    return escritor.cerrar()
+
+
+def ingerir_libro(ruta, version, columnas=COLUMNAS_TEXTO, directorio=DIRECTORIO_CACHE, filas_por_bloque=5000):
+    """
+    Lee el libro en streaming: los textos van bloque a bloque al almacén y al
+    índice de búsqueda, y el resto de columnas se compacta antes de unir los
+    bloques, así la memoria pico no depende del volumen de captions/comentarios.
+    """
+    lector = LectorHoja(ruta, HOJA)
+    validar_esquema(lector.columnas)
+    guardar = not os.path.isdir(directorio_textos(version, directorio))
+    escritor = EscritorTextos(version, columnas, directorio) if guardar else None
+    # El índice de búsqueda se arma en la misma pasada (solo tokeniza videos nuevos)
+    indexador = IndexadorBusqueda(version, directorio) if not indexado(version, directorio) else None
+    partes = []
+    try:
+        for bloque in lector.bloques(filas_por_bloque=filas_por_bloque):
+            if escritor:
+                escritor.agregar(bloque)
+            if indexador:
+                indexador.agregar(bloque)
+            partes.append(compactar(bloque.drop(columns=columnas, errors='ignore')))
+    except BaseException:
+        if escritor:
+            escritor.descartar()
+        raise
+    if escritor:
+        escritor.cerrar()
+    if indexador:
+        indexador.cerrar()
+    # Categorías distintas entre bloques quedan como object al unir: se recompacta
+    return compactar(pd.concat(partes).infer_objects())
+
+
+class TextosLaterales:
+    """Acceso perezoso por etiqueta de índice a los textos de una versión"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._indice = None
+        self._columnas = {}
+        self._lock = threading.Lock()
+
+    @property
+    def indice(self):
+        if self._indice is None:
+            self._indice = pd.Index(np.load(os.path.join(self.ruta, 'indice.npy'), allow_pickle=True))
+        return self._indice
+
+    def _columna(self, columna):
+        with self._lock:
+            if columna not in self._columnas:
+                nombre = _archivo(columna)
+                ruta_bin = os.path.join(self.ruta, f'{nombre}.bin')
+                offsets = np.load(os.path.join(self.ruta, f'{nombre}.off.npy'), mmap_mode='r')
+                nulos = np.load(os.path.join(self.ruta, f'{nombre}.nul.npy'), mmap_mode='r')
+                with open(ruta_bin, 'rb') as f:
+                    blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(ruta_bin) else b''
+                self._columnas[columna] = (blob, offsets, nulos)
+            return self._columnas[columna]
+
+    def serie(self, columna, etiquetas=None):
+        """Textos de `columna` para las etiquetas pedidas (todas si es None)"""
+        blob, offsets, nulos = self._columna(columna)
+        etiquetas = self.indice if etiquetas is None else pd.Index(etiquetas)
+        posiciones = self.indice.get_indexer(etiquetas)
+        valores = [
+            None if p < 0 or nulos[p] else blob[offsets[p]:offsets[p + 1]].decode('utf-8')
+            for p in posiciones
+        ]
+        return pd.Series(valores, index=etiquetas, name=columna, dtype='object')
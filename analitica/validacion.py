@@ -0,0 +1,101 @@
+"""
+🛡️ VALIDACIÓN - ESQUEMA DE `Tabla_1` Y CUARENTENA DE FILAS
+Chequeos vectorizados (una pasada por columna, sin recorrer filas) para que
+la validación corra siempre: si faltan columnas el libro se rechaza de
+inmediato; las filas inválidas se apartan con su motivo en vez de
+envenenar la normalización y los gráficos.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas de `Tabla_1` (A:Q de la hoja `instagram`) y su tipo esperado
+ESQUEMA_TABLA_1 = {
+    '#': 'numero',
+    'Link Publicación': 'texto',
+    'Fecha': 'fecha',
+    'Días sin publicar': 'numero',
+    'Tema/Categoría': None,
+    'Formato': 'texto',
+    'Duración (min:seg)': None,
+    'Descripción/Caption': 'texto',
+    'Raw Data: Comentarios': 'texto',
+    'Reproducciones': 'numero',
+    'Likes': 'numero',
+    'Conteo Comentarios': 'numero',
+    'Reposteados': 'numero',
+    'Compartidos': 'numero',
+    'Guardados TikTok': 'numero',
+    '# en Ig/Tk': 'numero',
+    '# en Ig/Fb': None,  # mezcla números y '-'
+}
+
+# Entradas de Sends/Likes per Reach: sin ellas la fila no tiene métricas
+METRICAS_REQUERIDAS = ['Likes', 'Compartidos', 'Reposteados']
+CONTEOS = ['Likes', 'Conteo Comentarios', 'Reposteados', 'Compartidos']
+
+
+class ErrorEsquema(ValueError):
+    """El libro no tiene las columnas de `Tabla_1`: no se puede cargar"""
+
+
+def validar_esquema(columnas, esquema=ESQUEMA_TABLA_1):
+    """Revisa los encabezados antes de leer las filas"""
+    faltantes = [c for c in esquema if c not in set(columnas)]
+    if faltantes:
+        raise ErrorEsquema(f"Faltan columnas de Tabla_1: {', '.join(faltantes)}")
+
+
+def _tipar(df, esquema):
+    """Convierte las columnas al tipo esperado; devuelve (df, máscaras de valores no convertibles)"""
+    df = df.copy()
+    invalidos = {}
+    for columna, tipo in esquema.items():
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if tipo == 'numero' and not pd.api.types.is_numeric_dtype(serie):
+            convertida = pd.to_numeric(serie, errors='coerce')
+        elif tipo == 'fecha' and not pd.api.types.is_datetime64_any_dtype(serie):
+            convertida = pd.to_datetime(serie, errors='coerce')
+        else:
+            continue
+        invalidos[columna] = (convertida.isna() & serie.notna()).to_numpy()
+        df[columna] = convertida
+    return df, invalidos
+
+
+def validar_instagram(ig_df, esquema=ESQUEMA_TABLA_1):
+    """
+    Separa las publicaciones válidas de las que irían a cuarentena.
+
+    Devuelve (validos, cuarentena); `cuarentena` tiene `#`, `Fecha`,
+    `Reproducciones` y `Motivos` (separados por "; ") con el índice original.
+    """
+    df, invalidos = _tipar(ig_df, esquema)
+    numero = df['#']
+    vistas = df['Reproducciones']
+
+    reglas = {
+        'Fecha vacía o inválida': df['Fecha'].isna().to_numpy(),
+        '# vacío': numero.isna().to_numpy(),
+        '# duplicado': (numero.duplicated(keep=False) & numero.notna()).to_numpy(),
+        'Reproducciones vacías o en cero': (vistas.isna() | (vistas <= 0)).to_numpy(),
+    }
+    for columna in METRICAS_REQUERIDAS:
+        reglas[f'{columna} vacío'] = ig_df[columna].isna().to_numpy()
+    for columna in CONTEOS:
+        reglas[f'{columna} negativo'] = (df[columna] < 0).to_numpy()
+    for columna, mascara in invalidos.items():
+        reglas[f'{columna} con valor no {"numérico" if esquema[columna] == "numero" else "de fecha"}'] = mascara
+
+    nombres = np.array(list(reglas))
+    matriz = np.column_stack(list(reglas.values()))
+    malas = matriz.any(axis=1)
+    if not malas.any():
+        return df, pd.DataFrame(columns=['#', 'Fecha', 'Reproducciones', 'Motivos'])
+
+    # Solo las filas en cuarentena (pocas) pasan a texto
+    motivos = ['; '.join(nombres[fila]) for fila in matriz[malas]]
+    cuarentena = ig_df.loc[malas, ['#', 'Fecha', 'Reproducciones']].assign(Motivos=motivos)
+    return df[~malas], cuarentena
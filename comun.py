@@ -0,0 +1,205 @@
+"""
+🧩 COMÚN - CARGA Y SESIÓN COMPARTIDAS ENTRE PÁGINAS
+El dataset se carga una sola vez por proceso y se comparte en solo lectura;
+cada página trabaja sobre una vista de sesión.
+"""
+
+import gc
+import logging
+import os
+import time
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from analitica.datos import DIRECTORIO_CACHE, RUTA_DATOS, leer_libro, preparar_instagram
+from analitica.textos import COLUMNAS_TEXTO, TextosLaterales, directorio_textos, guardar_textos, ingerir_libro
+from analitica.sesiones import registro_sesiones, control_memoria, telemetria
+from analitica.perfilado import perfilador, cache_medido, resumen_perfil
+from analitica.artefactos import en_disco
+from analitica.compartido import compartir
+from analitica.historial import registrar_snapshot, leer_indice, leer_snapshot
+from analitica.busqueda import IndiceBusqueda, indexado, indexar
+from analitica.seguidores import actualizar_serie, huella_seguidores, leer_serie
+from analitica.planes import AlmacenPlanes
+from analitica.campanas import actualizar_campanas, huella_campanas, leer_campanas
+
+log = logging.getLogger(__name__)
+
+
+# Funciones cacheadas pesadas (dataset y tablas por video): las únicas que se limpian al superar el presupuesto
+_LIBERABLES = {}
+
+
+def liberable(funcion):
+    """Marca una función cacheada como pesada; las baratas (búsquedas, resúmenes) sobreviven a la liberación"""
+    # Por nombre: las páginas vuelven a decorar sus funciones en cada ejecución
+    _LIBERABLES[f'{funcion.__module__}.{funcion.__qualname__}'] = funcion
+    return funcion
+
+
+@en_disco('libro')
+def _leer_libro(version):
+    return ingerir_libro(RUTA_DATOS, version)
+
+
+@en_disco('instagram')
+def _preparar_instagram(version):
+    """(publicaciones válidas con métricas, filas en cuarentena)"""
+    return preparar_instagram(cargar_libro(version))
+
+
+def _calcular_datos(version):
+    return _preparar_instagram(version)[0]
+
+
+@liberable
+@cache_medido(st.cache_resource)
+def cargar_libro(version):
+    """
+    Lee la hoja completa del Excel (todas las plataformas). Compartido: no modificar.
+
+    Captions y comentarios se pasan al almacén lateral de textos y el resto
+    de columnas queda con tipos compactos. En modo multi-worker
+    (DASHBOARD_COMPARTIDO=1) se adjunta a la copia publicada en disco.
+    """
+    return compartir('libro', version, _leer_libro)
+
+
+@liberable
+@cache_medido(st.cache_resource)
+def cargar_datos(version):
+    """Carga y procesa los datos del Excel. Compartido: no modificar"""
+    df = compartir('metricas', version, _calcular_datos)
+    try:
+        # Una ingesta = una versión nueva; la fecha es la del último guardado del libro
+        registrar_snapshot(df, version, datetime.fromtimestamp(os.path.getmtime(RUTA_DATOS)))
+    except OSError as e:
+        log.warning("No se pudo registrar el snapshot %s: %s", version, e)
+    return df
+
+
+@cache_medido(st.cache_data)
+def cargar_historial(version):
+    """Índice de snapshots con sus agregados (se relee al cambiar la versión)"""
+    return leer_indice()
+
+
+@liberable
+@cache_medido(st.cache_data)
+def cargar_snapshot(archivo):
+    return leer_snapshot(archivo)
+
+
+@cache_medido(st.cache_data)
+def cargar_cuarentena(version):
+    """Filas de Instagram descartadas por la validación, con sus motivos"""
+    return _preparar_instagram(version)[1]
+
+
+def mostrar_cuarentena(version):
+    cuarentena = cargar_cuarentena(version)
+    if cuarentena.empty:
+        return
+    with st.expander(f"⚠️ {len(cuarentena)} publicaciones excluidas por datos inválidos"):
+        st.dataframe(cuarentena, use_container_width=True, hide_index=True)
+
+
+@liberable
+@cache_medido(st.cache_resource)
+def cargar_textos(version):
+    """Captions y comentarios (memory-map, se leen solo al consultarlos)"""
+    ruta = directorio_textos(version)
+    if not os.path.isdir(ruta):
+        # El libro pudo venir del caché en disco sin pasar por el almacén: solo se releen los textos
+        guardar_textos(leer_libro(columnas=COLUMNAS_TEXTO), version)
+    return TextosLaterales(ruta)
+
+
+@liberable
+@cache_medido(st.cache_resource)
+def cargar_busqueda(version):
+    """Índice de texto completo de captions y comentarios"""
+    if not indexado(version):
+        # El libro pudo venir del caché en disco sin pasar por la ingesta
+        indexar(cargar_textos(version), version)
+    return IndiceBusqueda(version)
+
+
+@liberable
+@cache_medido(st.cache_data)
+def _serie_seguidores(huella):
+    try:
+        actualizar_serie()
+    except (OSError, ValueError) as e:
+        log.warning("No se pudo actualizar la serie de seguidores: %s", e)
+    return leer_serie()
+
+
+def cargar_seguidores():
+    """Serie diaria de seguidores; solo relee los archivos si alguno cambió"""
+    return _serie_seguidores(huella_seguidores())
+
+
+@liberable
+@cache_medido(st.cache_data)
+def _resultados_campanas(huella):
+    try:
+        actualizar_campanas()
+    except (OSError, ValueError) as e:
+        log.warning("No se pudieron actualizar los resultados de campañas: %s", e)
+    return leer_campanas()
+
+
+def cargar_campanas():
+    """Resultados importados de Meta Ads; solo relee las exportaciones si alguna cambió"""
+    return _resultados_campanas(huella_campanas())
+
+
+@cache_medido(st.cache_resource)
+def obtener_planes():
+    """Planes semanales y checklist persistidos (SQLite, uno por proceso)"""
+    return AlmacenPlanes()
+
+
+def _liberar_cache():
+    """
+    Presupuesto superado: solo las funciones marcadas con `liberable` (se
+    recargan del caché en disco). Los resultados baratos de las demás
+    sesiones y el almacén de planes, con su cola de escrituras, quedan.
+    """
+    for funcion in list(_LIBERABLES.values()):
+        funcion.clear()
+    gc.collect()
+
+
+def iniciar_sesion(pagina):
+    """
+    Registra la sesión actual, aplica el presupuesto de memoria del proceso y
+    empieza a cronometrar la ejecución. Con `?perfilar=1` en la URL la
+    ejecución se captura con cProfile (solo esa: el parámetro se consume).
+    """
+    perfilar = st.query_params.get('perfilar') == '1'
+    if perfilar:
+        del st.query_params['perfilar']
+    perfilador.iniciar(pagina, perfilar)
+
+    ctx = get_script_run_ctx()
+    registro_sesiones.registrar(ctx.session_id if ctx else 'local')
+    control_memoria.verificar(_liberar_cache)
+
+
+def finalizar_sesion():
+    """Cierra la ejecución: registra el tiempo total y muestra el perfil si se pidió"""
+    perfil = perfilador.finalizar(telemetria())
+    if perfil is None:
+        return
+
+    directorio = os.path.join(DIRECTORIO_CACHE, 'perfiles')
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    perfil.dump_stats(ruta)
+    with st.expander("🔬 Perfil de esta ejecución (cProfile)", expanded=True):
+        st.caption(f"Guardado en `{ruta}` (abrir con snakeviz o pstats)")
+        st.code(resumen_perfil(perfil), language=None)
@@ -11,6 +11,22 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
+from analitica.datos import version_dataset
+from analitica.sesiones import vista_sesion
+from analitica.validacion import ErrorEsquema
+from analitica.perfilado import seccion, cache_medido
+from analitica.artefactos import en_disco
+from comun import (liberable, cargar_datos, cargar_historial, cargar_snapshot, cargar_busqueda, cargar_textos,
+                   cargar_seguidores, iniciar_sesion, finalizar_sesion, mostrar_cuarentena)
+from analitica.busqueda import comentarios_que_mencionan
+from analitica.historial import comparar_periodo, deltas_por_video
+from analitica.seguidores import PERFIL_PRINCIPAL, huella_seguidores, resumen_seguidores, seguidores_por_video
+from analitica.anomalias import DetectorAnomalias, VIRAL, BAJO
+from analitica.semaforos import semaforo_sends, semaforo_likes, semaforo_qs, semaforos_por_video, clasificar_percentil
+from analitica.bosquejos import huella_bosquejos, leer_bosquejos, posicion_entre_pares
+from analitica.tarjetas import tarjeta_promedio, tarjeta_semaforo
+from analitica.correlaciones import correlaciones_vistas
+
 # ============================================
 # CONFIGURACIÓN DE PÁGINA
 # ============================================
@@ -71,78 +87,136 @@ st.markdown("""
 # ============================================
 # FUNCIONES DE CARGA Y PROCESAMIENTO
 # ============================================
-@st.cache_data
-def cargar_datos():
-    """Carga y procesa los datos del Excel"""
-    df = pd.read_excel('datos.xlsx', sheet_name='instagram', header=0)
-    ig_df = df[df['Link Publicación'] == 'Instagram'].copy()
-    
-    # Calcular métricas
-    ig_df['Sends_per_Reach'] = ((ig_df['Compartidos'] + ig_df['Reposteados']) / ig_df['Reproducciones']) * 100
-    ig_df['Likes_per_Reach'] = (ig_df['Likes'] / ig_df['Reproducciones']) * 100
-    
-    # Normalizar para Quality Score
-    def normalize_to_10(series):
-        min_val = series.min()
-        max_val = series.max()
-        if max_val == min_val:
-            return pd.Series([5.0] * len(series))
-        return 1 + 9 * (series - min_val) / (max_val - min_val)
-    
-    ig_df['Sends_Score'] = normalize_to_10(ig_df['Sends_per_Reach'])
-    ig_df['Likes_Score'] = normalize_to_10(ig_df['Likes_per_Reach'])
-    ig_df['Quality_Score'] = (ig_df['Sends_Score'] * 0.6) + (ig_df['Likes_Score'] * 0.4)
-    
-    return ig_df
-
-def semaforo_sends(val):
-    if val > 1.0: return "🚀", "Explosivo"
-    elif val > 0.4: return "🟢", "Alto"
-    elif val > 0.1: return "🟡", "Promedio"
-    else: return "🔴", "Bajo"
-
-def semaforo_likes(val):
-    if val > 6.0: return "🚀", "Viral"
-    elif val > 3.0: return "🟢", "Excelente"
-    elif val > 1.5: return "🟡", "Promedio"
-    else: return "🔴", "Bajo"
-
-def semaforo_qs(val):
-    if val >= 8: return "🚀", "Excelente"
-    elif val >= 6: return "🟢", "Bueno"
-    elif val >= 4: return "🟡", "Promedio"
-    else: return "🔴", "Bajo"
+@cache_medido(st.cache_resource)
+def obtener_detector(perfil):
+    """Detector de anomalías en streaming del perfil; entre versiones del dataset reprocesa desde la primera fila que cambió"""
+    return DetectorAnomalias()
+
+@liberable
+@cache_medido(st.cache_data)
+@en_disco()
+def calcular_semaforos(version, _df):
+    """Semáforo por video y métrica (una vez por versión del dataset)"""
+    return semaforos_por_video(_df)
+
+@cache_medido(st.cache_data)
+@en_disco()
+def calcular_correlaciones(version, _df):
+    """Correlaciones de engagement vs vistas (una vez por versión del dataset)"""
+    return correlaciones_vistas(_df)
+
+@liberable
+@cache_medido(st.cache_data)
+@en_disco()
+def generar_tarjetas(version, _df):
+    """HTML de las tarjetas de promedios y semáforos globales"""
+    sends_avg = _df['Sends_per_Reach'].mean()
+    likes_avg = _df['Likes_per_Reach'].mean()
+    qs_avg = _df['Quality_Score'].mean()
+    return {
+        'promedios': [
+            tarjeta_promedio("👁️ Prom. Views", f"{_df['Reproducciones'].mean():,.0f}", 'morado'),
+            tarjeta_promedio("❤️ Prom. Likes", f"{_df['Likes'].mean():,.0f}", 'rosa'),
+            tarjeta_promedio("💬 Prom. Comentarios", f"{_df['Conteo Comentarios'].mean():,.0f}", 'azul'),
+            tarjeta_promedio("🔄 Prom. Compartidos", f"{_df['Compartidos'].mean():,.0f}", 'verde'),
+        ],
+        'semaforos': [
+            tarjeta_semaforo(*semaforo_sends(sends_avg), "📤 Sends per Reach", f"{sends_avg:.2f}%",
+                             "(Compartidos + Reposteados) / Vistas"),
+            tarjeta_semaforo(*semaforo_likes(likes_avg), "❤️ Likes per Reach", f"{likes_avg:.2f}%",
+                             "Likes / Vistas"),
+            tarjeta_semaforo(*semaforo_qs(qs_avg), "⭐ Quality Score", f"{qs_avg:.1f}/10",
+                             "Índice combinado de engagement"),
+        ],
+    }
+
+@liberable
+@cache_medido(st.cache_data)
+def calcular_seguidores(version, _serie, huella, _df):
+    """Seguidores al publicar, alcance por seguidor y crecimiento atribuido a cada video"""
+    return seguidores_por_video(_df, _serie)
+
+@cache_medido(st.cache_data)
+def calcular_posicion_pares(version, huella, categoria, _df):
+    """Percentil del perfil frente a los demás perfiles puntuados (fusionando sus bosquejos)"""
+    bosquejos = leer_bosquejos()
+    if bosquejos.empty:
+        return None
+    return posicion_entre_pares(_df, bosquejos, PERFIL_PRINCIPAL, categoria)
+
+# Críticas recurrentes: consulta al índice de búsqueda por cada una
+MENCIONES_CRITICAS = {
+    'Referencias a William Montes': 'william montes',
+    'Menciones del Pacto de Ralito': 'ralito',
+}
+
+@cache_medido(st.cache_data)
+def buscar_videos(version, consulta, campos, _df):
+    """Videos de Instagram que mencionan la consulta, con los comentarios que coinciden"""
+    puntaje = cargar_busqueda(version).buscar(consulta, campos)
+    puntaje = puntaje[puntaje.index.isin(_df.index)]
+    comentarios = cargar_textos(version).serie('Raw Data: Comentarios', puntaje.index)
+    coinciden = [comentarios_que_mencionan(texto, consulta) if 'comentarios' in campos else [] for texto in comentarios]
+    resultados = _df.loc[puntaje.index, ['#', 'Fecha', 'Reproducciones']].assign(
+        Comentarios=[len(c) for c in coinciden],
+        Extracto=[c[0][:160] if c else '' for c in coinciden],
+        Relevancia=puntaje.round(2),
+    )
+    resultados['Fecha'] = pd.to_datetime(resultados['Fecha']).dt.strftime('%Y-%m-%d')
+    return resultados
 
 # ============================================
 # CARGAR DATOS
 # ============================================
-try:
-    df = cargar_datos()
-except Exception as e:
-    st.error(f"Error al cargar datos: {e}")
-    st.stop()
+iniciar_sesion('Análisis')
+
+with seccion('Carga de datos'):
+    try:
+        version = version_dataset()
+        df = vista_sesion(cargar_datos(version))
+    except FileNotFoundError:
+        st.error("No se encontró `datos.xlsx` junto a la aplicación")
+        st.stop()
+    except ErrorEsquema as e:
+        st.error(f"El libro no tiene el formato esperado. {e}")
+        st.stop()
+    except Exception as e:
+        st.error(f"Error al cargar datos: {e}")
+        st.stop()
 
 # ============================================
 # HEADER PRINCIPAL
 # ============================================
 st.markdown('<h1 class="main-header">📊 Dashboard de Análisis</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Análisis histórico de rendimiento en redes sociales</p>', unsafe_allow_html=True)
+mostrar_cuarentena(version)
 
 # ============================================
 # SIDEBAR - INFORMACIÓN DEL PERFIL
 # ============================================
-with st.sidebar:
+with st.sidebar, seccion('Sidebar'):
     st.markdown("### 👤 Perfil Analizado")
     st.markdown("**@miguemontes1**")
     st.markdown("Miguel A. Montes Curi")
     st.divider()
     st.markdown("### 📈 Datos del Perfil")
-    st.metric("Seguidores", "5,244")
-    st.metric("Categoría", "Nano Influencer")
+    serie_seguidores = cargar_seguidores()
+    perfil_seguidores = resumen_seguidores(serie_seguidores)
+    if perfil_seguidores is None:
+        st.metric("Seguidores", "—")
+        st.caption("*Sin conteos: agrega un CSV con fecha y seguidores en `seguidores/<perfil>/`*")
+    else:
+        variacion = perfil_seguidores['variacion']
+        st.metric("Seguidores", f"{perfil_seguidores['seguidores']:,}",
+                  delta=f"{variacion:+,} en 30 días" if variacion is not None else None,
+                  help=f"Último conteo: {perfil_seguidores['fecha']:%d/%m/%Y}")
+        st.metric("Categoría", perfil_seguidores['categoria'])
     st.metric("Videos Analizados", len(df))
     st.divider()
     st.markdown("### 📅 Período")
     st.markdown("Agosto 2025 - Enero 2026")
+    periodos = {7: "hace 7 días", 30: "hace 30 días", 90: "hace 90 días"}
+    dias_comparacion = st.selectbox("Comparar con", list(periodos), index=1, format_func=periodos.get)
     st.divider()
     st.markdown("### ℹ️ Fuente")
     st.markdown("Algoritmo Instagram 2025")
@@ -151,129 +225,100 @@ with st.sidebar:
 # ============================================
 # MÉTRICAS PRINCIPALES (KPIs)
 # ============================================
-st.markdown("## 🎯 Métricas Globales")
+with seccion('KPIs'):
+    st.markdown("## 🎯 Métricas Globales")
 
-col1, col2, col3, col4, col5 = st.columns(5)
+    # Comparación contra el snapshot vigente al inicio del período (solo el índice de agregados)
+    actual, anterior = comparar_periodo(cargar_historial(version), version, dias_comparacion)
 
-with col1:
-    st.metric(
-        label="👁️ Total Vistas",
-        value=f"{df['Reproducciones'].sum():,.0f}",
-        delta=f"Prom: {df['Reproducciones'].mean():,.0f}/video"
-    )
+    def delta_kpi(agregado, columna):
+        if anterior is None:
+            return f"Prom: {df[columna].mean():,.0f}/video"
+        return f"{actual[agregado] - anterior[agregado]:+,.0f} vs {anterior['fecha']:%d/%m/%Y}"
 
-with col2:
-    st.metric(
-        label="❤️ Total Likes",
-        value=f"{df['Likes'].sum():,.0f}",
-        delta=f"Prom: {df['Likes'].mean():,.0f}/video"
-    )
+    if anterior is None:
+        st.caption(f"Sin snapshot de {periodos[dias_comparacion]} para comparar: se muestran promedios por video")
 
-with col3:
-    st.metric(
-        label="💬 Total Comentarios",
-        value=f"{df['Conteo Comentarios'].sum():,.0f}",
-        delta=f"Prom: {df['Conteo Comentarios'].mean():,.0f}/video"
-    )
+    col1, col2, col3, col4, col5 = st.columns(5)
 
-with col4:
-    st.metric(
-        label="🔄 Total Compartidos",
-        value=f"{df['Compartidos'].sum():,.0f}",
-        delta=f"Prom: {df['Compartidos'].mean():,.0f}/video"
-    )
+    with col1:
+        st.metric(
+            label="👁️ Total Vistas",
+            value=f"{df['Reproducciones'].sum():,.0f}",
+            delta=delta_kpi('total_vistas', 'Reproducciones'),
+            help=f"Prom: {df['Reproducciones'].mean():,.0f}/video"
+        )
 
-with col5:
-    st.metric(
-        label="📤 Total Reposteados",
-        value=f"{df['Reposteados'].sum():,.0f}",
-        delta=f"Prom: {df['Reposteados'].mean():,.0f}/video"
-    )
+    with col2:
+        st.metric(
+            label="❤️ Total Likes",
+            value=f"{df['Likes'].sum():,.0f}",
+            delta=delta_kpi('total_likes', 'Likes'),
+            help=f"Prom: {df['Likes'].mean():,.0f}/video"
+        )
 
-# Sección de Promedios por Video
-st.markdown("### 📊 Promedios por Video")
-col_p1, col_p2, col_p3, col_p4 = st.columns(4)
-
-with col_p1:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1rem; border-radius: 0.5rem; text-align: center; color: white;">
-        <p style="margin: 0; font-size: 0.9rem; opacity: 0.9;">👁️ Prom. Views</p>
-        <h3 style="margin: 0.3rem 0 0 0;">{df['Reproducciones'].mean():,.0f}</h3>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col_p2:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1rem; border-radius: 0.5rem; text-align: center; color: white;">
-        <p style="margin: 0; font-size: 0.9rem; opacity: 0.9;">❤️ Prom. Likes</p>
-        <h3 style="margin: 0.3rem 0 0 0;">{df['Likes'].mean():,.0f}</h3>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col_p3:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); padding: 1rem; border-radius: 0.5rem; text-align: center; color: white;">
-        <p style="margin: 0; font-size: 0.9rem; opacity: 0.9;">💬 Prom. Comentarios</p>
-        <h3 style="margin: 0.3rem 0 0 0;">{df['Conteo Comentarios'].mean():,.0f}</h3>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col_p4:
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%); padding: 1rem; border-radius: 0.5rem; text-align: center; color: white;">
-        <p style="margin: 0; font-size: 0.9rem; opacity: 0.9;">🔄 Prom. Compartidos</p>
-        <h3 style="margin: 0.3rem 0 0 0;">{df['Compartidos'].mean():,.0f}</h3>
-    </div>
-    """, unsafe_allow_html=True)
+    with col3:
+        st.metric(
+            label="💬 Total Comentarios",
+            value=f"{df['Conteo Comentarios'].sum():,.0f}",
+            delta=delta_kpi('total_comentarios', 'Conteo Comentarios'),
+            help=f"Prom: {df['Conteo Comentarios'].mean():,.0f}/video"
+        )
 
-st.divider()
+    with col4:
+        st.metric(
+            label="🔄 Total Compartidos",
+            value=f"{df['Compartidos'].sum():,.0f}",
+            delta=delta_kpi('total_compartidos', 'Compartidos'),
+            help=f"Prom: {df['Compartidos'].mean():,.0f}/video"
+        )
+
+    with col5:
+        st.metric(
+            label="📤 Total Reposteados",
+            value=f"{df['Reposteados'].sum():,.0f}",
+            delta=delta_kpi('total_reposteados', 'Reposteados'),
+            help=f"Prom: {df['Reposteados'].mean():,.0f}/video"
+        )
+
+    # Sección de Promedios por Video
+    st.markdown("### 📊 Promedios por Video")
+    col_p1, col_p2, col_p3, col_p4 = st.columns(4)
+    tarjetas = generar_tarjetas(version, df)
+
+    for col, html in zip([col_p1, col_p2, col_p3, col_p4], tarjetas['promedios']):
+        with col:
+            st.markdown(html, unsafe_allow_html=True)
+
+    st.divider()
 
 # ============================================
 # SEMÁFOROS DE RENDIMIENTO
 # ============================================
-st.markdown("## 🚦 Evaluación según Benchmarks (Mosseri 2025)")
-
-col1, col2, col3 = st.columns(3)
-
-sends_avg = df['Sends_per_Reach'].mean()
-likes_avg = df['Likes_per_Reach'].mean()
-qs_avg = df['Quality_Score'].mean()
-
-with col1:
-    emoji, estado = semaforo_sends(sends_avg)
-    st.markdown(f"""
-    <div style="background: #f7fafc; padding: 1.5rem; border-radius: 1rem; text-align: center; border-left: 5px solid {'#38a169' if emoji in ['🟢','🚀'] else '#d69e2e' if emoji == '🟡' else '#e53e3e'};">
-        <h1 style="margin: 0;">{emoji}</h1>
-        <h3 style="margin: 0.5rem 0; color: #1a365d; font-weight: 700;">📤 Sends per Reach</h3>
-        <h2 style="margin: 0; color: #2d3748;">{sends_avg:.2f}%</h2>
-        <p style="margin: 0.5rem 0 0 0; color: #4a5568; font-weight: 600;">{estado}</p>
-        <p style="margin: 0.5rem 0 0 0; color: #718096; font-size: 0.8rem;">(Compartidos + Reposteados) / Vistas</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col2:
-    emoji, estado = semaforo_likes(likes_avg)
-    st.markdown(f"""
-    <div style="background: #f7fafc; padding: 1.5rem; border-radius: 1rem; text-align: center; border-left: 5px solid {'#38a169' if emoji in ['🟢','🚀'] else '#d69e2e' if emoji == '🟡' else '#e53e3e'};">
-        <h1 style="margin: 0;">{emoji}</h1>
-        <h3 style="margin: 0.5rem 0; color: #1a365d; font-weight: 700;">❤️ Likes per Reach</h3>
-        <h2 style="margin: 0; color: #2d3748;">{likes_avg:.2f}%</h2>
-        <p style="margin: 0.5rem 0 0 0; color: #4a5568; font-weight: 600;">{estado}</p>
-        <p style="margin: 0.5rem 0 0 0; color: #718096; font-size: 0.8rem;">Likes / Vistas</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col3:
-    emoji, estado = semaforo_qs(qs_avg)
-    st.markdown(f"""
-    <div style="background: #f7fafc; padding: 1.5rem; border-radius: 1rem; text-align: center; border-left: 5px solid {'#38a169' if emoji in ['🟢','🚀'] else '#d69e2e' if emoji == '🟡' else '#e53e3e'};">
-        <h1 style="margin: 0;">{emoji}</h1>
-        <h3 style="margin: 0.5rem 0; color: #1a365d; font-weight: 700;">⭐ Quality Score</h3>
-        <h2 style="margin: 0; color: #2d3748;">{qs_avg:.1f}/10</h2>
-        <p style="margin: 0.5rem 0 0 0; color: #4a5568; font-weight: 600;">{estado}</p>
-        <p style="margin: 0.5rem 0 0 0; color: #718096; font-size: 0.8rem;">Índice combinado de engagement</p>
-    </div>
-    """, unsafe_allow_html=True)
+with seccion('Semáforos'):
+    st.markdown("## 🚦 Evaluación según Benchmarks (Mosseri 2025)")
+
+    col1, col2, col3 = st.columns(3)
+
+    for col, html in zip([col1, col2, col3], tarjetas['semaforos']):
+        with col:
+            st.markdown(html, unsafe_allow_html=True)
+
+    # Mismas métricas frente a los perfiles del portafolio (bosquejos de `analitica.puntuar`)
+    categoria = perfil_seguidores['categoria'] if perfil_seguidores else None
+    posicion = calcular_posicion_pares(version, huella_bosquejos(), categoria, df)
+    pares = [(m, p, n) for m, (p, n) in (posicion or {}).items() if n and not np.isnan(p)]
+    if pares:
+        st.markdown("#### 👥 Frente a Perfiles Pares")
+        titulos = {'Sends_per_Reach': "📤 Sends per Reach", 'Likes_per_Reach': "❤️ Likes per Reach",
+                   'Reproducciones': "👁️ Vistas"}
+        emojis, estados = clasificar_percentil([p for _, p, _ in pares])
+        for col, (metrica, percentil, n), emoji, estado in zip(st.columns(len(pares)), pares, emojis, estados):
+            with col:
+                st.markdown(tarjeta_semaforo(str(emoji), str(estado), titulos[metrica], f"P{percentil:.0f}",
+                                             f"Mediana por video vs {n} perfiles"), unsafe_allow_html=True)
+    else:
+        st.caption("*Sin perfiles pares puntuados: `python -m analitica.puntuar perfiles/` habilita la comparación*")
 
 st.divider()
 
@@ -291,7 +336,7 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 # ============================================
 # TAB 1: RANKINGS
 # ============================================
-with tab1:
+with tab1, seccion('Rankings'):
     st.markdown("### 🏆 TOP 10 Videos por Métrica")
     
     metrica_seleccionada = st.selectbox(
@@ -306,6 +351,8 @@ with tab1:
         }.get(x, x)
     )
     
+    semaforos_df = calcular_semaforos(version, df)
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -315,7 +362,9 @@ with tab1:
         top_df['Sends_per_Reach'] = top_df['Sends_per_Reach'].apply(lambda x: f"{x:.2f}%")
         top_df['Likes_per_Reach'] = top_df['Likes_per_Reach'].apply(lambda x: f"{x:.2f}%")
         top_df['Quality_Score'] = top_df['Quality_Score'].fillna(0).apply(lambda x: f"{x:.1f}")
-        st.dataframe(top_df, use_container_width=True, hide_index=True)
+        top_df = top_df.join(semaforos_df[['🚦 QS']])
+        with seccion('Tabla'):
+            st.dataframe(top_df, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("#### 📉 TOP 10 - Peores")
@@ -324,61 +373,47 @@ with tab1:
         bottom_df['Sends_per_Reach'] = bottom_df['Sends_per_Reach'].apply(lambda x: f"{x:.2f}%")
         bottom_df['Likes_per_Reach'] = bottom_df['Likes_per_Reach'].apply(lambda x: f"{x:.2f}%")
         bottom_df['Quality_Score'] = bottom_df['Quality_Score'].fillna(0).apply(lambda x: f"{x:.1f}")
-        st.dataframe(bottom_df, use_container_width=True, hide_index=True)
+        bottom_df = bottom_df.join(semaforos_df[['🚦 QS']])
+        with seccion('Tabla'):
+            st.dataframe(bottom_df, use_container_width=True, hide_index=True)
     
     # Gráfico de barras
     st.markdown("#### 📊 Visualización TOP 10")
     top_chart = df.nlargest(10, metrica_seleccionada)
-    fig = px.bar(
-        top_chart, 
-        x='#', 
-        y=metrica_seleccionada,
-        color='Quality_Score',
-        color_continuous_scale='RdYlGn',
-        title=f'TOP 10 Videos por {metrica_seleccionada}',
-        labels={'#': 'Video #', metrica_seleccionada: metrica_seleccionada}
-    )
-    fig.update_layout(xaxis_type='category')
-    st.plotly_chart(fig, use_container_width=True)
+    with seccion('Figura'):
+        fig = px.bar(
+            top_chart, 
+            x='#', 
+            y=metrica_seleccionada,
+            color='Quality_Score',
+            color_continuous_scale='RdYlGn',
+            title=f'TOP 10 Videos por {metrica_seleccionada}',
+            labels={'#': 'Video #', metrica_seleccionada: metrica_seleccionada}
+        )
+        fig.update_layout(xaxis_type='category')
+        st.plotly_chart(fig, use_container_width=True)
 
 # ============================================
 # TAB 2: CORRELACIONES
 # ============================================
-with tab2:
+with tab2, seccion('Correlaciones'):
     st.markdown("### 🔗 Análisis de Correlaciones")
     st.markdown("*¿Qué métricas predicen la viralidad (vistas)?*")
     
     # Calcular correlaciones
-    from scipy import stats
-    
-    correlaciones = {
-        'Compartidos': stats.pearsonr(df['Compartidos'], df['Reproducciones']),
-        'Likes': stats.pearsonr(df['Likes'], df['Reproducciones']),
-        'Comentarios': stats.pearsonr(df['Conteo Comentarios'], df['Reproducciones']),
-    }
+    correlaciones = calcular_correlaciones(version, df)
     
     # Mostrar tabla de correlaciones
     col1, col2 = st.columns([1, 2])
     
     with col1:
         st.markdown("#### 📋 Tabla de Correlaciones")
-        corr_data = []
-        for metrica, (corr, pval) in correlaciones.items():
-            r2 = corr**2 * 100
-            if abs(corr) < 0.3:
-                fuerza = "🔴 Débil"
-            elif abs(corr) < 0.7:
-                fuerza = "🟡 Moderada"
-            else:
-                fuerza = "🟢 Fuerte"
-            corr_data.append({
-                'Métrica': metrica,
-                'Correlación': f"{corr:.3f}",
-                'R²': f"{r2:.1f}%",
-                'Fuerza': fuerza
-            })
+        corr_data = correlaciones[['Métrica', 'Correlación', 'R²', 'Fuerza']].copy()
+        corr_data['Correlación'] = corr_data['Correlación'].apply(lambda x: f"{x:.3f}")
+        corr_data['R²'] = corr_data['R²'].apply(lambda x: f"{x:.1f}%")
         
-        st.dataframe(pd.DataFrame(corr_data), use_container_width=True, hide_index=True)
+        with seccion('Tabla'):
+            st.dataframe(corr_data, use_container_width=True, hide_index=True)
         
         st.markdown("""
         **Interpretación:**
@@ -393,16 +428,17 @@ with tab2:
             ["Likes", "Compartidos", "Conteo Comentarios"]
         )
         
-        fig = px.scatter(
-            df,
-            x=scatter_metrica,
-            y='Reproducciones',
-            color='Quality_Score',
-            color_continuous_scale='RdYlGn',
-            hover_data=['#', 'Fecha'],
-            title=f'{scatter_metrica} vs Vistas'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with seccion('Figura'):
+            fig = px.scatter(
+                df,
+                x=scatter_metrica,
+                y='Reproducciones',
+                color='Quality_Score',
+                color_continuous_scale='RdYlGn',
+                hover_data=['#', 'Fecha'],
+                title=f'{scatter_metrica} vs Vistas'
+            )
+            st.plotly_chart(fig, use_container_width=True)
     
     # Conclusión importante
     st.info("""
@@ -414,7 +450,7 @@ with tab2:
 # ============================================
 # TAB 3: SENTIMIENTO
 # ============================================
-with tab3:
+with tab3, seccion('Sentimiento'):
     st.markdown("### 🎭 Análisis de Sentimiento")
     
     col1, col2 = st.columns(2)
@@ -428,20 +464,21 @@ with tab3:
         }
         sent_df = pd.DataFrame(sentimiento_data)
         
-        fig = px.pie(
-            sent_df, 
-            values='Cantidad', 
-            names='Categoría',
-            color='Categoría',
-            color_discrete_map={
-                'Positivos': '#38a169',
-                'Neutrales': '#718096',
-                'Negativos': '#e53e3e'
-            },
-            title='Distribución de 1,644 Comentarios'
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig, use_container_width=True)
+        with seccion('Figura'):
+            fig = px.pie(
+                sent_df, 
+                values='Cantidad', 
+                names='Categoría',
+                color='Categoría',
+                color_discrete_map={
+                    'Positivos': '#38a169',
+                    'Neutrales': '#718096',
+                    'Negativos': '#e53e3e'
+                },
+                title='Distribución de 1,644 Comentarios'
+            )
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.markdown("#### 😀 Emojis Más Usados")
@@ -451,28 +488,33 @@ with tab3:
         }
         emoji_df = pd.DataFrame(emoji_data)
         
-        fig = px.bar(
-            emoji_df, 
-            x='Cantidad', 
-            y='Emoji',
-            orientation='h',
-            color='Cantidad',
-            color_continuous_scale='Oranges',
-            title='TOP 5 Emojis en Comentarios'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with seccion('Figura'):
+            fig = px.bar(
+                emoji_df, 
+                x='Cantidad', 
+                y='Emoji',
+                orientation='h',
+                color='Cantidad',
+                color_continuous_scale='Oranges',
+                title='TOP 5 Emojis en Comentarios'
+            )
+            st.plotly_chart(fig, use_container_width=True)
     
     # Alertas de críticas
     st.markdown("#### ⚠️ Alertas Identificadas")
     col1, col2 = st.columns(2)
     
     with col1:
-        st.warning("""
-        **21 críticas reales identificadas:**
-        - Referencias a William Montes
-        - Menciones del Pacto de Ralito
-        - Videos afectados: #5, #9, #17, #23
-        """)
+        lineas = []
+        criticas = 0
+        for tema, consulta in MENCIONES_CRITICAS.items():
+            encontrados = buscar_videos(version, consulta, ('comentarios',), df)
+            videos = ', '.join(f"#{n:.0f}" for n in encontrados['#']) or 'sin menciones'
+            total = int(encontrados['Comentarios'].sum())
+            criticas += total
+            lineas.append(f"- {tema}: {videos} ({total} comentario{'s' if total != 1 else ''})")
+        st.warning(f"**{criticas} crítica{'s' if criticas != 1 else ''} identificada{'s' if criticas != 1 else ''}:**\n"
+                   + '\n'.join(lineas))
     
     with col2:
         st.error("""
@@ -482,10 +524,27 @@ with tab3:
         - Videos: #20, #22, #23, #24, #26, #27, #29, #31
         """)
 
+    # Búsqueda de texto completo (índice invertido, no recorre los comentarios)
+    st.markdown("#### 🔎 Buscar en Captions y Comentarios")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        consulta = st.text_input("Buscar", placeholder="ej. ralito, william montes, critic*",
+                                 label_visibility="collapsed")
+    with col2:
+        alcance = st.selectbox("Buscar en", ["Comentarios y captions", "Solo comentarios", "Solo captions"],
+                               label_visibility="collapsed")
+    if consulta.strip():
+        campos = {"Solo comentarios": ('comentarios',), "Solo captions": ('caption',)}.get(
+            alcance, ('caption', 'comentarios'))
+        resultados = buscar_videos(version, consulta, campos, df)
+        st.markdown(f"**{len(resultados)} video{'s' if len(resultados) != 1 else ''} con “{consulta}”**")
+        with seccion('Tabla'):
+            st.dataframe(resultados, use_container_width=True, hide_index=True)
+
 # ============================================
 # TAB 4: TENDENCIAS
 # ============================================
-with tab4:
+with tab4, seccion('Tendencias'):
     st.markdown("### 📉 Tendencias Temporales")
     
     # Preparar datos temporales
@@ -493,49 +552,106 @@ with tab4:
     df_temp['Fecha'] = pd.to_datetime(df_temp['Fecha'])
     df_temp = df_temp.sort_values('Fecha')
     
+    # Anomalías: cada video se compara con la mediana/MAD de los anteriores
+    anotaciones = obtener_detector(PERFIL_PRINCIPAL).procesar(PERFIL_PRINCIPAL, df, version=version)
+    df_temp['Anomalía'] = df_temp['#'].map(anotaciones['Anomalía']).fillna('')
+    df_temp['Métricas Anómalas'] = df_temp['#'].map(anotaciones['Métricas']).fillna('')
+    
     # Gráfico de línea - Vistas en el tiempo
     st.markdown("#### 👁️ Evolución de Vistas")
-    fig = px.line(
-        df_temp, 
-        x='Fecha', 
-        y='Reproducciones',
-        markers=True,
-        title='Reproducciones por Video (Cronológico)'
-    )
-    fig.add_hline(y=df['Reproducciones'].mean(), line_dash="dash", line_color="red", 
-                  annotation_text=f"Promedio: {df['Reproducciones'].mean():,.0f}")
-    st.plotly_chart(fig, use_container_width=True)
+    with seccion('Figura'):
+        fig = px.line(
+            df_temp, 
+            x='Fecha', 
+            y='Reproducciones',
+            markers=True,
+            title='Reproducciones por Video (Cronológico)'
+        )
+        fig.add_hline(y=df['Reproducciones'].mean(), line_dash="dash", line_color="red", 
+                      annotation_text=f"Promedio: {df['Reproducciones'].mean():,.0f}")
+        for tipo, color in [(VIRAL, '#805ad5'), (BAJO, '#e53e3e')]:
+            marcados = df_temp[df_temp['Anomalía'] == tipo]
+            fig.add_trace(go.Scatter(
+                x=marcados['Fecha'], y=marcados['Reproducciones'],
+                mode='markers', name=tipo,
+                marker=dict(size=14, color=color, symbol='diamond'),
+                customdata=marcados[['#', 'Métricas Anómalas']],
+                hovertemplate='Video #%{customdata[0]}<br>%{y:,.0f} vistas<br>%{customdata[1]}<extra></extra>'
+            ))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    anomalos = df_temp[df_temp['Anomalía'] != ''][['#', 'Fecha', 'Anomalía', 'Métricas Anómalas', 'Reproducciones', 'Likes']].copy()
+    if not anomalos.empty:
+        with st.expander(f"🚨 {len(anomalos)} videos fuera de lo normal"):
+            anomalos['Fecha'] = anomalos['Fecha'].dt.strftime('%Y-%m-%d')
+            with seccion('Tabla'):
+                st.dataframe(anomalos.sort_values('Fecha', ascending=False), use_container_width=True, hide_index=True)
+            st.caption("*Comparado con la mediana y el MAD de los 30 videos previos (escala log)*")
     
     # Gráfico de Quality Score en el tiempo
     st.markdown("#### ⭐ Evolución de Quality Score")
-    fig = px.line(
-        df_temp, 
-        x='Fecha', 
-        y='Quality_Score',
-        markers=True,
-        color_discrete_sequence=['#805ad5'],
-        title='Quality Score por Video (Cronológico)'
-    )
-    fig.add_hline(y=df['Quality_Score'].mean(), line_dash="dash", line_color="orange",
-                  annotation_text=f"Promedio: {df['Quality_Score'].mean():.1f}")
-    st.plotly_chart(fig, use_container_width=True)
+    with seccion('Figura'):
+        fig = px.line(
+            df_temp, 
+            x='Fecha', 
+            y='Quality_Score',
+            markers=True,
+            color_discrete_sequence=['#805ad5'],
+            title='Quality Score por Video (Cronológico)'
+        )
+        fig.add_hline(y=df['Quality_Score'].mean(), line_dash="dash", line_color="orange",
+                      annotation_text=f"Promedio: {df['Quality_Score'].mean():.1f}")
+        st.plotly_chart(fig, use_container_width=True)
     
     # Días sin publicar
     st.markdown("#### 📅 Frecuencia de Publicación")
     if 'Días sin publicar' in df.columns:
-        fig = px.histogram(
-            df, 
-            x='Días sin publicar',
-            nbins=20,
-            title='Distribución de Días entre Publicaciones',
-            color_discrete_sequence=['#667eea']
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with seccion('Figura'):
+            fig = px.histogram(
+                df, 
+                x='Días sin publicar',
+                nbins=20,
+                title='Distribución de Días entre Publicaciones',
+                color_discrete_sequence=['#667eea']
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+    # Seguidores: conteo al publicar (as-of) y crecimiento atribuido a cada video
+    st.markdown("#### 👥 Seguidores y Alcance por Seguidor")
+    if perfil_seguidores is None:
+        st.caption("*Sin serie de seguidores para este perfil*")
+    else:
+        por_video = calcular_seguidores(version, serie_seguidores, huella_seguidores(), df)
+        df_seg = df_temp[['#', 'Fecha', 'Reproducciones']].join(por_video)
+        with seccion('Figura'):
+            fig = px.bar(
+                df_seg,
+                x='Fecha',
+                y='Alcance_por_Seguidor',
+                hover_data=['#', 'Reproducciones', 'Seguidores', 'Crecimiento'],
+                color_discrete_sequence=['#38a169'],
+                title='Vistas por Seguidor al Publicar'
+            )
+            fig.add_hline(y=1, line_dash="dash", line_color="gray", annotation_text="Vistas = seguidores")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        atribuidos = df_seg.dropna(subset=['Crecimiento']).nlargest(10, 'Crecimiento')
+        if atribuidos.empty:
+            st.caption("*Aún no hay conteos posteriores a los videos para atribuir crecimiento*")
+        else:
+            with st.expander("📈 Videos con más seguidores ganados"):
+                atribuidos = atribuidos.assign(Fecha=atribuidos['Fecha'].dt.strftime('%Y-%m-%d'))
+                atribuidos['Alcance_por_Seguidor'] = atribuidos['Alcance_por_Seguidor'].apply(lambda x: f"{x:.2f}x")
+                atribuidos['Crecimiento'] = atribuidos['Crecimiento'].apply(lambda x: f"{x:+,.0f}")
+                with seccion('Tabla'):
+                    st.dataframe(atribuidos, use_container_width=True, hide_index=True)
+                st.caption("*Seguidores ganados hasta el siguiente día con video (máx. 7 días), "
+                           "repartidos entre los videos del mismo día*")
 
 # ============================================
 # TAB 5: DETALLE VIDEOS
 # ============================================
-with tab5:
+with tab5, seccion('Detalle videos'):
     st.markdown("### 🔍 Explorador de Videos")
     
     # Filtros
@@ -567,8 +683,14 @@ with tab5:
     df_mostrar['Sends_per_Reach'] = df_mostrar['Sends_per_Reach'].apply(lambda x: f"{x:.2f}%")
     df_mostrar['Likes_per_Reach'] = df_mostrar['Likes_per_Reach'].apply(lambda x: f"{x:.2f}%")
     df_mostrar['Quality_Score'] = df_mostrar['Quality_Score'].fillna(0).apply(lambda x: f"{x:.1f}")
+    df_mostrar = df_mostrar.join(calcular_semaforos(version, df))
+    if anterior is not None:
+        # Mismos videos en el snapshot del inicio del período
+        cambios = deltas_por_video(df_filtrado, cargar_snapshot(anterior['archivo']), ['Reproducciones'])
+        df_mostrar[f"Δ Vistas (vs {anterior['fecha']:%d/%m})"] = cambios['Reproducciones']
     
-    st.dataframe(df_mostrar, use_container_width=True, hide_index=True)
+    with seccion('Tabla'):
+        st.dataframe(df_mostrar, use_container_width=True, hide_index=True)
 
 # ============================================
 # FOOTER
@@ -577,7 +699,7 @@ st.divider()
 
 # Cargar logo como base64 para incrustar en HTML
 import base64
-with open("logo_ryan.png", "rb") as img_file:
+with seccion('Logo base64'), open("logo_ryan.png", "rb") as img_file:
     logo_base64 = base64.b64encode(img_file.read()).decode()
 
 st.markdown(f"""
@@ -589,3 +711,5 @@ st.markdown(f"""
     <p style="margin: 1rem 0 0 0; color: #a0aec0; font-size: 0.8rem;">© 2026 - Desarrollado con Streamlit + Plotly</p>
 </div>
 """, unsafe_allow_html=True)
+
+finalizar_sesion()
@@ -8,9 +8,27 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 
+from analitica.datos import version_dataset, calcular_pauta_score
+from analitica.sesiones import vista_sesion
+from analitica.validacion import ErrorEsquema
+from analitica.perfilado import seccion, cache_medido
+from analitica.artefactos import en_disco
+from comun import (liberable, cargar_libro, cargar_datos, cargar_textos, cargar_campanas, obtener_planes, iniciar_sesion, finalizar_sesion,
+                   mostrar_cuarentena)
+from analitica.formatos import rendimiento_por_grupo, recomendar_formato
+from analitica.captions import extraer_rasgos, lift_rasgos, lift_hashtags, resumen_caption
+from analitica.similares import IndiceSimilares, seleccion_diversa
+from analitica.recomendaciones import seleccion_tiktok, seleccion_instagram, plan_semanal, calendario_de_plan
+from analitica.planes import TAREAS_CHECKLIST, inicio_semana
+from analitica.seguidores import PERFIL_PRINCIPAL
+from analitica.campanas import TASA_COP_USD, huella_campanas, vincular_campanas, roi_campanas, priores_pauta
+from analitica.tarjetas import tarjeta_video, tarjeta_pauta
+from analitica.pronostico import obtener_modelo, pronosticar
+from analitica.plataformas import unir_plataformas, lift_por_plataforma, publicaciones_por_plataforma, embudo
+
 # ============================================
 # CONFIGURACIÓN DE PÁGINA
 # ============================================
@@ -84,46 +102,46 @@ st.markdown("""
 # ============================================
 # FUNCIONES
 # ============================================
-@st.cache_data
-def cargar_datos():
-    """Carga y procesa los datos del Excel"""
-    df = pd.read_excel('datos.xlsx', sheet_name='instagram', header=0)
-    ig_df = df[df['Link Publicación'] == 'Instagram'].copy()
-    
-    # Calcular métricas
-    ig_df['Sends_per_Reach'] = ((ig_df['Compartidos'] + ig_df['Reposteados']) / ig_df['Reproducciones']) * 100
-    ig_df['Likes_per_Reach'] = (ig_df['Likes'] / ig_df['Reproducciones']) * 100
-    
-    def normalize_to_10(series):
-        min_val = series.min()
-        max_val = series.max()
-        if max_val == min_val:
-            return pd.Series([5.0] * len(series))
-        return 1 + 9 * (series - min_val) / (max_val - min_val)
-    
-    ig_df['Sends_Score'] = normalize_to_10(ig_df['Sends_per_Reach'])
-    ig_df['Likes_Score'] = normalize_to_10(ig_df['Likes_per_Reach'])
-    ig_df['Quality_Score'] = (ig_df['Sends_Score'] * 0.6) + (ig_df['Likes_Score'] * 0.4)
-    
-    return ig_df
+@cache_medido(st.cache_data)
+@en_disco()
+def calcular_rendimiento_formatos(version, _df):
+    """Rendimiento por categoría/formato/duración (un cálculo por versión del dataset)"""
+    return rendimiento_por_grupo(_df)
 
-def obtener_mejor_formato():
-    """Retorna el formato de video que mejor funciona"""
-    return {
-        'tipo': 'Preguntas en la Calle',
-        'duracion': '0:30 - 1:00',
-        'elementos': [
-            '✅ Rostro visible hablando a cámara',
-            '✅ Interacción con personas reales',
-            '✅ Preguntas de interés general',
-            '✅ Locación reconocible (Cartagena)'
-        ],
-        'evitar': [
-            '❌ Contenido político tradicional',
-            '❌ Videos muy editados',
-            '❌ Contenido solo para círculo cercano'
-        ]
-    }
+@liberable
+@cache_medido(st.cache_data)
+@en_disco()
+def calcular_rasgos_caption(version, _df):
+    """Rasgos de los captions y su lift en vistas/Quality Score (una vez por versión del dataset)"""
+    rasgos = extraer_rasgos(cargar_textos(version).serie('Descripción/Caption', _df.index))
+    return rasgos, lift_rasgos(_df, rasgos), lift_hashtags(_df, rasgos)
+
+@liberable
+@cache_medido(st.cache_resource)
+def obtener_similares(version, _df):
+    """Índice de videos similares (uno por versión del dataset, compartido entre sesiones)"""
+    return IndiceSimilares.construir(_df, calcular_rasgos_caption(version, _df)[0])
+
+@liberable
+@cache_medido(st.cache_data)
+@en_disco()
+def cargar_plataformas(version):
+    """Vista unida Instagram ↔ TikTok/Facebook, lift y publicaciones por plataforma"""
+    libro = cargar_libro(version)
+    unido = unir_plataformas(libro)
+    return unido, lift_por_plataforma(unido), publicaciones_por_plataforma(libro)
+
+@cache_medido(st.cache_data)
+def calcular_roi_pauta(huella, huella_planes, version, _df):
+    """ROI por campaña con cada anuncio ligado a su video (solo si cambian las exportaciones, los planes o el dataset)"""
+    resultados = cargar_campanas()
+    resultados = vincular_campanas(resultados[resultados['perfil'] == PERFIL_PRINCIPAL], _df,
+                                   obtener_planes().videos_pautados(PERFIL_PRINCIPAL))
+    return roi_campanas(resultados, _df)
+
+def obtener_mejor_formato(resumen):
+    """Retorna el formato de video que mejor funciona según los datos"""
+    return recomendar_formato(resumen)
 
 def calcular_presupuesto_pauta(views_objetivo, cpm=5):
     """Calcula presupuesto sugerido para pauta"""
@@ -132,26 +150,40 @@ def calcular_presupuesto_pauta(views_objetivo, cpm=5):
 # ============================================
 # CARGAR DATOS
 # ============================================
-try:
-    df = cargar_datos()
-except Exception as e:
-    st.error(f"Error al cargar datos: {e}")
-    st.stop()
+iniciar_sesion('Estrategia')
+
+with seccion('Carga de datos'):
+    try:
+        version = version_dataset()
+        df = vista_sesion(cargar_datos(version))
+    except FileNotFoundError:
+        st.error("No se encontró `datos.xlsx` junto a la aplicación")
+        st.stop()
+    except ErrorEsquema as e:
+        st.error(f"El libro no tiene el formato esperado. {e}")
+        st.stop()
+    except Exception as e:
+        st.error(f"Error al cargar datos: {e}")
+        st.stop()
 
 # ============================================
 # HEADER
 # ============================================
 st.markdown('<h1 class="main-header">🎯 Estrategia de Contenido</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Herramienta operativa para publicación en redes sociales</p>', unsafe_allow_html=True)
+mostrar_cuarentena(version)
 
 # ============================================
 # SIDEBAR - CONFIGURACIÓN
 # ============================================
-with st.sidebar:
+with st.sidebar, seccion('Sidebar'):
     st.markdown("### ⚙️ Configuración")
     
     st.markdown("#### 📅 Semana Actual")
     fecha_inicio = st.date_input("Fecha inicio semana", datetime.now())
+    # Planes y checklist se guardan por semana (de lunes a domingo)
+    semana = inicio_semana(fecha_inicio)
+    st.caption(f"Semana del lunes {semana:%d/%m/%Y}")
     
     st.divider()
     
@@ -162,10 +194,16 @@ with st.sidebar:
     st.divider()
     
     st.markdown("#### 💰 Pauta Semanal")
+    # Resultados reales de campañas pasadas: corrigen el CPM y la retención de las proyecciones
+    roi_pauta = calcular_roi_pauta(huella_campanas(), obtener_planes().huella(), version, df)
+    priores = priores_pauta(roi_pauta)
+    
     presupuesto_semanal = st.number_input("Presupuesto (COP)", min_value=0, value=100000, step=10000)
-    cpm_estimado = st.number_input("CPM estimado ($)", min_value=1.0, value=5.0, step=0.5)
+    cpm_estimado = st.number_input("CPM estimado ($)", min_value=1.0, value=round(max(priores['cpm_usd'], 1.0), 2),
+                                   step=0.5, help=f"Corregido con {priores['campanas']} campañas reales"
+                                   if priores['campanas'] else "Sin campañas importadas: valor de referencia")
     
-    views_estimados = int((presupuesto_semanal / cpm_estimado) * 1000 / 4500)  # Convertir COP a USD aprox
+    views_estimados = int((presupuesto_semanal / cpm_estimado) * 1000 / TASA_COP_USD)  # Convertir COP a USD
     st.metric("Views Estimados", f"{views_estimados:,}")
 
 # ============================================
@@ -220,12 +258,13 @@ tab1, tab2, tab3, tab4 = st.tabs([
 # ============================================
 # TAB 1: SELECTOR TIKTOK/FB
 # ============================================
-with tab1:
+with tab1, seccion('Selector TikTok/FB'):
     st.markdown("### 📱 Videos para TikTok y Facebook")
     st.markdown("*Selecciona 5-10 clips diarios basados en el formato que mejor funciona*")
     
     # Mostrar formato recomendado
-    formato = obtener_mejor_formato()
+    resumen_formatos = calcular_rendimiento_formatos(version, df)
+    formato = obtener_mejor_formato(resumen_formatos)
     
     col1, col2 = st.columns(2)
     
@@ -247,6 +286,37 @@ with tab1:
         for elem in formato['evitar']:
             st.markdown(f"- {elem}")
     
+    # Rendimiento por dimensión (base de la recomendación)
+    with st.expander("📊 Rendimiento por Categoría, Formato y Duración"):
+        dimension = st.radio("Agrupar por", ["Duración", "Categoría", "Formato"], horizontal=True)
+        tabla_dim = resumen_formatos[resumen_formatos['Dimensión'] == dimension].drop(columns='Dimensión').copy()
+        tabla_dim['Mediana_Vistas'] = tabla_dim['Mediana_Vistas'].apply(lambda x: f"{x:,.0f}")
+        tabla_dim['Sends_per_Reach'] = tabla_dim.apply(
+            lambda r: f"{r['Sends_per_Reach']:.2f}% ({r['Sends_per_Reach_IC_inf']:.2f} - {r['Sends_per_Reach_IC_sup']:.2f})", axis=1)
+        tabla_dim['Quality_Score'] = tabla_dim.apply(
+            lambda r: f"⭐ {r['Quality_Score']:.1f} ({r['Quality_Score_IC_inf']:.1f} - {r['Quality_Score_IC_sup']:.1f})", axis=1)
+        tabla_dim = tabla_dim[['Grupo', 'Videos', 'Mediana_Vistas', 'Sends_per_Reach', 'Quality_Score']]
+        with seccion('Tabla'):
+            st.dataframe(tabla_dim, use_container_width=True, hide_index=True)
+        if not formato['basado_en_datos']:
+            st.caption("*Sin grupos con suficientes videos: se muestra la guía editorial*")
+        else:
+            st.caption("*Intervalos de confianza al 95%. Recomendación por mayor cota inferior de Quality Score*")
+    
+    # Qué patrones del caption acompañan a más alcance
+    rasgos_caption, lift_caption, lift_hashtag = calcular_rasgos_caption(version, df)
+    with st.expander("✍️ Rendimiento por Rasgos del Caption"):
+        vista_lift = st.radio("Ver", ["Rasgos", "Hashtags"], horizontal=True)
+        tabla_lift = (lift_caption if vista_lift == "Rasgos" else lift_hashtag).copy()
+        tabla_lift['Mediana_Vistas'] = tabla_lift['Mediana_Vistas'].apply(lambda x: f"{x:,.0f}")
+        tabla_lift['Lift_Vistas'] = tabla_lift['Lift_Vistas'].apply(lambda x: f"{x:+.0f}%")
+        tabla_lift['Quality_Score'] = tabla_lift['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
+        tabla_lift['Lift_QS'] = tabla_lift['Lift_QS'].apply(lambda x: f"{x:+.1f}")
+        with seccion('Tabla'):
+            st.dataframe(tabla_lift, use_container_width=True, hide_index=True)
+        st.caption("*Lift frente a las publicaciones sin el rasgo: vistas por media geométrica, "
+                   "Quality Score en puntos. Solo grupos con 3+ videos*")
+    
     st.divider()
     
     # Videos disponibles ordenados por potencial viral
@@ -256,31 +326,67 @@ with tab1:
     df_tiktok = df.sort_values('Quality_Score', ascending=False)
     
     # Mostrar tabla de selección
-    df_seleccion = df_tiktok[['#', 'Fecha', 'Reproducciones', 'Likes', 'Quality_Score', 'Descripción/Caption']].head(20).copy()
+    df_seleccion = df_tiktok[['#', 'Fecha', 'Reproducciones', 'Likes', 'Quality_Score']].head(20).copy()
+    df_seleccion['Descripción/Caption'] = cargar_textos(version).serie('Descripción/Caption', df_seleccion.index)
     df_seleccion['Fecha'] = pd.to_datetime(df_seleccion['Fecha']).dt.strftime('%Y-%m-%d')
     df_seleccion['Quality_Score'] = df_seleccion['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
-    df_seleccion['Descripción/Caption'] = df_seleccion['Descripción/Caption'].apply(
-        lambda x: str(x)[:50] + "..." if pd.notna(x) and len(str(x)) > 50 else x
-    )
     
-    st.dataframe(df_seleccion, use_container_width=True, hide_index=True)
+    # Proyección de vistas (modelo entrenado en segundo plano por versión del dataset)
+    modelo_vistas = obtener_modelo(df, version)
+    if modelo_vistas is not None:
+        proyeccion = pronosticar(modelo_vistas, df_tiktok.head(20))
+        df_seleccion.insert(3, '🔮 Proyección', proyeccion.apply(
+            lambda r: f"{r['Vistas_Proyectadas']:,.0f} ({r['Vistas_Min']:,.0f} - {r['Vistas_Max']:,.0f})", axis=1))
+    df_seleccion['Rasgos'] = resumen_caption(rasgos_caption.loc[df_seleccion.index])
+    
+    # Caption completo: la celda lo recorta y lo muestra entero al pasar el cursor
+    with seccion('Tabla'):
+        st.dataframe(df_seleccion, use_container_width=True, hide_index=True,
+                     column_config={'Descripción/Caption': st.column_config.TextColumn(width='large')})
+    if modelo_vistas is None:
+        st.caption("*🔮 Entrenando modelo de proyección de vistas... se mostrará en la próxima actualización*")
+    else:
+        st.caption(f"*🔮 Proyección: vistas esperadas según duración, días sin publicar y día de la semana (intervalo 80%, R² = {modelo_vistas.rsquared:.2f})*")
+    
+    # Más videos parecidos a los que mejor funcionaron
+    similares = obtener_similares(version, df)
+    st.markdown("#### 🧬 Más como los mejores")
+    opciones = df_tiktok['#'].astype(int).tolist()
+    semillas = st.multiselect("Videos de referencia", opciones, default=opciones[:3],
+                              format_func=lambda v: f"Video #{v}")
+    if semillas:
+        etiquetas = df_tiktok.index[df_tiktok['#'].isin(semillas)]
+        parecidos = similares.mas_como(etiquetas, k=10)
+        tabla_parecidos = df.loc[parecidos.index, ['#', 'Fecha', 'Reproducciones', 'Quality_Score']].copy()
+        tabla_parecidos['Fecha'] = pd.to_datetime(tabla_parecidos['Fecha']).dt.strftime('%Y-%m-%d')
+        tabla_parecidos['Reproducciones'] = tabla_parecidos['Reproducciones'].apply(lambda x: f"{x:,.0f}")
+        tabla_parecidos['Quality_Score'] = tabla_parecidos['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
+        tabla_parecidos['Similitud'] = parecidos.apply(lambda x: f"{x:.0%}")
+        with seccion('Tabla'):
+            st.dataframe(tabla_parecidos, use_container_width=True, hide_index=True)
+        st.caption("*Similitud coseno entre métricas, categoría, formato, duración y rasgos del caption*")
     
     # Sugerencia automática
     st.markdown("#### 🤖 Sugerencia Automática para Hoy")
-    top_videos = df_tiktok.head(clips_tiktok_fb)
+    diversificar = st.toggle("Diversificar", value=False,
+                             help="Evita sugerir varios clips casi iguales: cambia algo de Quality Score por variedad")
+    if diversificar:
+        top_videos = seleccion_diversa(df, similares, clips_tiktok_fb)
+    else:
+        top_videos = seleccion_tiktok(df, clips_tiktok_fb)
     
     st.info(f"""
     **Videos sugeridos para publicar hoy en TikTok/FB:**
     
     {', '.join([f"Video #{int(v)}" for v in top_videos['#'].tolist()])}
     
-    *Basado en Quality Score + Sends per Reach*
+    *Basado en Quality Score + Sends per Reach{' (diversificado por similitud)' if diversificar else ''}*
     """)
 
 # ============================================
 # TAB 2: SELECTOR INSTAGRAM
 # ============================================
-with tab2:
+with tab2, seccion('Selector Instagram'):
     st.markdown("### 📸 Videos para Instagram")
     st.markdown("*Selecciona los 2 mejores videos del día basados en rendimiento*")
     
@@ -293,7 +399,8 @@ with tab2:
         
         top_views = df.nlargest(5, 'Reproducciones')[['#', 'Reproducciones', 'Likes', 'Quality_Score']]
         top_views['Quality_Score'] = top_views['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
-        st.dataframe(top_views, use_container_width=True, hide_index=True)
+        with seccion('Tabla'):
+            st.dataframe(top_views, use_container_width=True, hide_index=True)
         
         mejor_views = df.nlargest(1, 'Reproducciones').iloc[0]
         st.success(f"""
@@ -309,7 +416,8 @@ with tab2:
         
         top_likes = df.nlargest(5, 'Likes')[['#', 'Reproducciones', 'Likes', 'Quality_Score']]
         top_likes['Quality_Score'] = top_likes['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
-        st.dataframe(top_likes, use_container_width=True, hide_index=True)
+        with seccion('Tabla'):
+            st.dataframe(top_likes, use_container_width=True, hide_index=True)
         
         mejor_likes = df.nlargest(1, 'Likes').iloc[0]
         st.success(f"""
@@ -324,60 +432,29 @@ with tab2:
     st.markdown("#### 🎯 Recomendación Final para Instagram Hoy")
     
     # Combinar mejores por vistas y por likes
-    video1 = df.nlargest(1, 'Reproducciones').iloc[0]
-    video2 = df.nlargest(2, 'Likes').iloc[1] if df.nlargest(1, 'Likes').iloc[0]['#'] == video1['#'] else df.nlargest(1, 'Likes').iloc[0]
+    video1, video2 = seleccion_instagram(df)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #833AB4 0%, #FD1D1D 100%); 
-                    color: white; padding: 1.5rem; border-radius: 1rem; text-align: center;">
-            <h3>📸 Video #1</h3>
-            <h1>#{int(video1['#'])}</h1>
-            <p>👁️ {video1['Reproducciones']:,.0f} vistas</p>
-            <p>❤️ {video1['Likes']:,.0f} likes</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(tarjeta_video("📸 Video #1", video1, 'instagram'), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #FCAF45 0%, #833AB4 100%); 
-                    color: white; padding: 1.5rem; border-radius: 1rem; text-align: center;">
-            <h3>📸 Video #2</h3>
-            <h1>#{int(video2['#'])}</h1>
-            <p>👁️ {video2['Reproducciones']:,.0f} vistas</p>
-            <p>❤️ {video2['Likes']:,.0f} likes</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(tarjeta_video("📸 Video #2", video2, 'instagram_alt'), unsafe_allow_html=True)
 
 # ============================================
 # TAB 3: RECOMENDACIÓN PAUTA
 # ============================================
-with tab3:
+with tab3, seccion('Pauta'):
     st.markdown("### 💰 Recomendación de Pauta Semanal")
     st.markdown("*Selección automática del mejor video para invertir*")
     
-    # Calcular el mejor video para pauta (combinación de métricas)
-    df['Pauta_Score'] = (
-        df['Quality_Score'] * 0.3 +
-        (df['Reproducciones'] / df['Reproducciones'].max()) * 10 * 0.4 +
-        (df['Likes'] / df['Likes'].max()) * 10 * 0.3
-    )
-    
-    mejor_pauta = df.nlargest(1, 'Pauta_Score').iloc[0]
-    
-    st.markdown(f"""
-    <div class="pauta-box">
-        <h2>🏆 VIDEO RECOMENDADO PARA PAUTA</h2>
-        <h1 style="font-size: 4rem;">Video #{int(mejor_pauta['#'])}</h1>
-        <p style="font-size: 1.2rem;">
-            👁️ {mejor_pauta['Reproducciones']:,.0f} vistas orgánicas | 
-            ❤️ {mejor_pauta['Likes']:,.0f} likes |
-            ⭐ QS: {mejor_pauta['Quality_Score']:.1f}
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    # Calcular el mejor video para pauta (combinación de métricas), en la vista de la sesión
+    df_pauta = vista_sesion(df, Pauta_Score=calcular_pauta_score(df))
+    
+    mejor_pauta = df_pauta.nlargest(1, 'Pauta_Score').iloc[0]
+    
+    st.markdown(tarjeta_pauta(mejor_pauta), unsafe_allow_html=True)
     
     st.divider()
     
@@ -393,7 +470,8 @@ with tab3:
         views_total = views_organicas + views_pauta
         
         er_actual = (mejor_pauta['Likes'] / mejor_pauta['Reproducciones']) * 100
-        likes_proyectados = int(views_pauta * (er_actual / 100) * 0.7)  # 70% de retención en pauta
+        # Retención del engagement en pauta: la obtenida en campañas reales (o 70% sin datos)
+        likes_proyectados = int(views_pauta * (er_actual / 100) * priores['retencion'])
         
         st.metric("Views Orgánicos", f"{views_organicas:,.0f}")
         st.metric("Views Estimados (Pauta)", f"{views_pauta:,}")
@@ -411,50 +489,128 @@ with tab3:
         costo_por_like = presupuesto_semanal / likes_proyectados if likes_proyectados > 0 else 0
         st.metric("Costo por Like", f"${costo_por_like:.0f} COP")
     
+    # Resultados reales
+    st.divider()
+    st.markdown("#### 📈 Resultados Reales de Pauta")
+    
+    if roi_pauta.empty:
+        st.info("Sin resultados de Meta Ads: exporta las campañas a `campanas/<perfil>/` para medir el ROI real.")
+    else:
+        roi_mostrar = roi_pauta[['Inicio', 'Campaña', 'Video', 'Vínculo', 'Gasto_COP', 'Impresiones', 'Likes',
+                                 'CPM_COP', 'Costo_por_Like', 'Retencion', 'Error_Likes']].copy()
+        roi_mostrar['Inicio'] = roi_mostrar['Inicio'].dt.date
+        with seccion('Tabla'):
+            st.dataframe(roi_mostrar, use_container_width=True, hide_index=True, column_config={
+                'Video': st.column_config.NumberColumn(format="%d"),
+                'Gasto_COP': st.column_config.NumberColumn("Gasto (COP)", format="$%.0f"),
+                'Impresiones': st.column_config.NumberColumn(format="%.0f"),
+                'Likes': st.column_config.NumberColumn(format="%.0f"),
+                'CPM_COP': st.column_config.NumberColumn("CPM real (COP)", format="$%.0f"),
+                'Costo_por_Like': st.column_config.NumberColumn("Costo por Like (COP)", format="$%.0f"),
+                'Retencion': st.column_config.NumberColumn("Retención", format="%.2f"),
+                'Error_Likes': st.column_config.NumberColumn("Error proyección likes", format="percent"),
+            })
+        st.caption(f"*Priores corregidos con {priores['campanas']} campañas: CPM ${priores['cpm_usd']:.2f} USD, "
+                   f"retención {priores['retencion']:.0%}. Error positivo = la proyección se pasó.*")
+    
     # Alternativas
     st.divider()
     st.markdown("#### 🔄 Videos Alternativos para Pauta")
     
-    top_pauta = df.nlargest(5, 'Pauta_Score')[['#', 'Reproducciones', 'Likes', 'Quality_Score', 'Pauta_Score']]
+    top_pauta = df_pauta.nlargest(5, 'Pauta_Score')[['#', 'Reproducciones', 'Likes', 'Quality_Score', 'Pauta_Score']]
     top_pauta['Quality_Score'] = top_pauta['Quality_Score'].apply(lambda x: f"⭐ {x:.1f}")
     top_pauta['Pauta_Score'] = top_pauta['Pauta_Score'].apply(lambda x: f"💰 {x:.1f}")
     
-    st.dataframe(top_pauta, use_container_width=True, hide_index=True)
+    with seccion('Tabla'):
+        st.dataframe(top_pauta, use_container_width=True, hide_index=True)
+    
+    # Funnel real entre plataformas
+    st.divider()
+    st.markdown("#### 🔗 Funnel Real: TikTok/FB → Instagram → Pauta")
+    
+    unido, lift_plataformas, publicados = cargar_plataformas(version)
+    funnel_df = embudo(unido, publicados, [int(mejor_pauta['#'])])
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        with seccion('Figura'):
+            fig = go.Figure(go.Funnel(
+                y=funnel_df['Etapa'],
+                x=funnel_df['Videos'],
+                textinfo="value+percent previous",
+                marker={"color": ["#25F4EE", "#833AB4", "#667eea"]}
+            ))
+            fig.update_layout(title='Videos por Etapa del Funnel')
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        lift_mostrar = lift_plataformas.copy()
+        lift_mostrar['Vistas plataforma (mediana)'] = lift_mostrar['Vistas plataforma (mediana)'].apply(
+            lambda x: f"{x:,.0f}" if pd.notna(x) else "-")
+        lift_mostrar['Vistas Instagram (mediana)'] = lift_mostrar['Vistas Instagram (mediana)'].apply(
+            lambda x: f"{x:,.0f}" if pd.notna(x) else "-")
+        lift_mostrar['Lift Instagram'] = lift_mostrar['Lift Instagram'].apply(
+            lambda x: f"x{x:.1f}" if pd.notna(x) else "-")
+        with seccion('Tabla'):
+            st.dataframe(lift_mostrar, use_container_width=True, hide_index=True)
+        st.caption("*Lift = vistas en Instagram / vistas del mismo video en la plataforma*")
 
 # ============================================
 # TAB 4: CALENDARIO
 # ============================================
-with tab4:
+with tab4, seccion('Calendario'):
     st.markdown("### 📅 Calendario de Publicación")
     
-    # Generar calendario semanal
-    dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    
     st.markdown("#### 📆 Plan Semanal")
     
-    # Crear tabla de calendario
-    calendario_data = []
-    
-    for i, dia in enumerate(dias):
-        fecha = fecha_inicio + timedelta(days=i)
-        
-        # Sugerir videos basados en QS
-        videos_dia = df.nlargest(clips_tiktok_fb + i, 'Quality_Score').tail(clips_tiktok_fb)
-        videos_tiktok = ", ".join([f"#{int(v)}" for v in videos_dia['#'].head(clips_tiktok_fb).tolist()])
+    # El plan guardado de la semana manda; si no hay, se muestra el generado con los parámetros actuales
+    planes = obtener_planes()
+    plan_generado = plan_semanal(df, semana, clips_tiktok_fb, clips_instagram)
+    guardado = planes.plan(PERFIL_PRINCIPAL, semana)
+    parametros_plan = {'clips_tiktok_fb': clips_tiktok_fb, 'clips_instagram': clips_instagram,
+                       'presupuesto': presupuesto_semanal, 'version': version}
+    
+    if guardado is None:
+        with seccion('Tabla'):
+            st.dataframe(calendario_de_plan(plan_generado), use_container_width=True, hide_index=True)
+        st.caption("*Plan sin guardar: se recalcula con los parámetros de la barra lateral*")
+        if st.button("💾 Guardar plan de la semana"):
+            # Se encola; el plan ya se ve guardado en la próxima ejecución sin esperar la escritura
+            planes.guardar_plan(PERFIL_PRINCIPAL, semana, plan_generado, parametros_plan)
+            st.rerun()
+    else:
+        generado, parametros, plan_guardado = guardado
+        with seccion('Tabla'):
+            st.dataframe(calendario_de_plan(plan_guardado), use_container_width=True, hide_index=True)
+        st.caption(f"*Plan guardado el {generado:%d/%m/%Y %H:%M} "
+                   f"({parametros['clips_tiktok_fb']} clips TikTok/FB, {parametros['clips_instagram']} Instagram)*")
+        if st.button("🔄 Reemplazar con el plan actual"):
+            planes.guardar_plan(PERFIL_PRINCIPAL, semana, plan_generado, parametros_plan)
+            st.rerun()
         
-        videos_ig = df.nlargest(clips_instagram + i*2, 'Reproducciones').tail(clips_instagram)
-        videos_instagram = ", ".join([f"#{int(v)}" for v in videos_ig['#'].tolist()])
-        
-        calendario_data.append({
-            'Día': dia,
-            'Fecha': fecha.strftime('%d/%m'),
-            'TikTok/FB': videos_tiktok,
-            'Instagram': videos_instagram,
-            'Pauta': '💰' if i == 6 else ''  # Pauta el domingo
-        })
-    
-    calendario_df = pd.DataFrame(calendario_data)
-    st.dataframe(calendario_df, use_container_width=True, hide_index=True)
+        # Lo que de verdad se publicó/pautó (se guarda al marcar, sin esperar la escritura)
+        with st.expander(f"📌 Publicados: {plan_guardado['Publicado'].sum()} de {len(plan_guardado)}"):
+            editado = st.data_editor(plan_guardado, use_container_width=True, hide_index=True,
+                                     disabled=['Día', 'Fecha', 'Canal', 'Video'], key=f"publicados_{semana}")
+            for fila in editado[editado['Publicado'] != plan_guardado['Publicado']].itertuples():
+                planes.marcar_publicado(PERFIL_PRINCIPAL, semana, fila.Fecha, fila.Canal, fila.Video,
+                                        fila.Publicado)
+            st.caption("*En el canal Pauta, marcado = video pautado*")
+    
+    semanas_guardadas = planes.semanas(PERFIL_PRINCIPAL)
+    if not semanas_guardadas.empty:
+        with st.expander(f"🗂️ Planes guardados ({len(semanas_guardadas)})"):
+            tabla_semanas = semanas_guardadas.copy()
+            tabla_semanas['Cumplimiento'] = tabla_semanas['Cumplimiento'].apply(
+                lambda x: f"{x:.0%}" if pd.notna(x) else "—")
+            tabla_semanas['Tareas'] = tabla_semanas['Tareas'].apply(lambda x: f"{x}/{len(TAREAS_CHECKLIST)}")
+            with seccion('Tabla'):
+                st.dataframe(tabla_semanas.drop(columns='Generado'), use_container_width=True, hide_index=True)
+            semana_vista = st.selectbox("Ver plan", tabla_semanas['Semana'].tolist())
+            _, _, plan_pasado = planes.plan(PERFIL_PRINCIPAL, semana_vista)
+            with seccion('Tabla'):
+                st.dataframe(calendario_de_plan(plan_pasado), use_container_width=True, hide_index=True)
     
     st.divider()
     
@@ -478,19 +634,20 @@ with tab4:
     # Checklist
     st.markdown("#### ✅ Checklist Semanal")
     
-    col1, col2 = st.columns(2)
+    # Estado por semana y perfil, persistido al marcar
+    estado_checklist = planes.checklist(PERFIL_PRINCIPAL, semana)
     
-    with col1:
-        st.checkbox("Preparar clips para TikTok/FB")
-        st.checkbox("Seleccionar mejores para Instagram")
-        st.checkbox("Revisar horarios óptimos de publicación")
-        st.checkbox("Preparar copies/captions")
+    def marcar_tarea(tarea, clave):
+        planes.marcar_tarea(PERFIL_PRINCIPAL, semana, tarea, st.session_state[clave])
     
-    with col2:
-        st.checkbox("Configurar pauta en Meta Ads")
-        st.checkbox("Definir audiencia de pauta")
-        st.checkbox("Revisar métricas del día anterior")
-        st.checkbox("Ajustar estrategia si es necesario")
+    col1, col2 = st.columns(2)
+    
+    for col, tareas in zip([col1, col2], [TAREAS_CHECKLIST[:4], TAREAS_CHECKLIST[4:]]):
+        with col:
+            for tarea in tareas:
+                clave = f"tarea_{semana}_{tarea}"
+                st.checkbox(tarea, value=estado_checklist[tarea], key=clave,
+                            on_change=marcar_tarea, args=(tarea, clave))
 
 # ============================================
 # FOOTER
@@ -503,3 +660,5 @@ st.markdown("""
     <p>Desarrollado con Streamlit + Plotly</p>
 </div>
 """, unsafe_allow_html=True)
+
+finalizar_sesion()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from analitica.anomalias import VIRAL, DetectorAnomalias, EstadoSerie
+
+
+def _serie(n=80, pico=60):
+    rng = np.random.default_rng(0)
+    vistas = np.exp(np.linspace(7, 11, n) + rng.normal(0, 0.1, n))
+    vistas[pico] *= 30
+    return pd.DataFrame({'#': range(n), 'Fecha': pd.date_range('2026-01-01', periods=n),
+                         'Reproducciones': vistas, 'Likes': vistas / 10, 'Sends_per_Reach': 0.01})
+
+
+def test_marca_el_pico_pero_no_la_tendencia():
+    anotaciones = DetectorAnomalias().procesar('p', _serie())
+    marcados = anotaciones[anotaciones['Anomalía'] != '']
+    assert list(marcados.index) == [60]
+    assert marcados.loc[60, 'Anomalía'] == VIRAL
+
+
+def test_versiones_sucesivas_solo_procesan_filas_nuevas():
+    df = _serie()
+    completo = DetectorAnomalias().procesar('p', df)
+
+    detector = DetectorAnomalias()
+    detector.procesar('p', df.iloc[:40])
+    procesadas = []
+    original = detector.actualizar
+    detector.actualizar = lambda perfil, fila: procesadas.append(fila) or original(perfil, fila)
+    incremental = detector.procesar('p', df.sample(frac=1, random_state=1))
+
+    assert len(procesadas) == 40
+    pd.testing.assert_frame_equal(incremental.loc[completo.index], completo)
+
+
+def test_estado_no_crece_con_la_serie():
+    estado = EstadoSerie()
+    for x in np.linspace(0, 10, 500):
+        estado.incorporar(x)
+    assert estado.arranque == []
+    assert estado.n == 500 and estado.mad > 0
+
+
+def test_filas_cambiadas_o_borradas_se_reprocesan():
+    df = _serie()
+    detector = DetectorAnomalias()
+    detector.procesar('p', df, version='v1')
+
+    # El pico se "normaliza" en la versión siguiente y se borra un video anterior
+    v2 = df.drop(index=10).copy()
+    v2.loc[60, ['Reproducciones', 'Likes']] /= 30
+    anotaciones = detector.procesar('p', v2, version='v2')
+    pd.testing.assert_frame_equal(anotaciones, DetectorAnomalias().procesar('p', v2))
+    assert (anotaciones['Anomalía'] == '').all()
+    assert 10 not in detector._resultados['p']
+
+
+def test_misma_version_no_vuelve_a_procesar():
+    detector = DetectorAnomalias()
+    primera = detector.procesar('p', _serie(), version='v1')
+    detector.actualizar = None  # cualquier proceso fallaría
+    pd.testing.assert_frame_equal(detector.procesar('p', _serie(), version='v1'), primera)
@@ -0,0 +1,47 @@
+from datetime import date
+
+import pytest
+
+from analitica.api import CacheRespuestas, clave_respuesta, resolver_parametros
+from analitica.planes import inicio_semana
+
+
+def test_calendario_sin_fecha_usa_la_semana_de_hoy_en_la_clave():
+    lunes = inicio_semana(date.today())
+    params = resolver_parametros('calendario', {})
+    assert params == {'fecha_inicio': lunes, 'clips_tiktok_fb': 7, 'clips_instagram': 2}
+    assert f'fecha_inicio={lunes.isoformat()}' in clave_respuesta('perfil', 'calendario', params, 'v1')
+
+
+def test_fecha_inicio_se_lleva_al_lunes_como_en_la_pagina():
+    assert resolver_parametros('calendario', {'fecha_inicio': '2026-10-21'})['fecha_inicio'] == date(2026, 10, 19)
+
+
+def test_clave_distingue_fecha_y_version():
+    ayer = resolver_parametros('calendario', {'fecha_inicio': '2026-10-18'})
+    hoy = resolver_parametros('calendario', {'fecha_inicio': '2026-10-19'})
+    assert clave_respuesta('p', 'calendario', ayer, 'v1') != clave_respuesta('p', 'calendario', hoy, 'v1')
+    assert clave_respuesta('p', 'calendario', hoy, 'v1') != clave_respuesta('p', 'calendario', hoy, 'v2')
+
+
+def test_clave_no_depende_del_orden_ni_de_parametros_ajenos():
+    a = resolver_parametros('calendario', {'clips_instagram': '3', 'fecha_inicio': '2026-10-19', 'x': '1'})
+    b = resolver_parametros('calendario', {'fecha_inicio': '2026-10-19', 'clips_instagram': '3'})
+    assert clave_respuesta('p', 'calendario', a, 'v') == clave_respuesta('p', 'calendario', b, 'v')
+
+
+@pytest.mark.parametrize('consulta', [{'clips_tiktok_fb': '-3'}, {'clips_tiktok_fb': '0'},
+                                      {'clips_instagram': 'dos'}, {'fecha_inicio': '19/10/2026'}])
+def test_parametros_invalidos(consulta):
+    with pytest.raises(ValueError):
+        resolver_parametros('calendario', consulta)
+
+
+def test_cache_lru():
+    cache = CacheRespuestas(maximo=2)
+    cache.guardar('a', b'1')
+    cache.guardar('b', b'2')
+    assert cache.obtener('a') == b'1'
+    cache.guardar('c', b'3')
+    assert cache.obtener('b') is None
+    assert (cache.aciertos, cache.fallos) == (1, 1)
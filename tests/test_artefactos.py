@@ -0,0 +1,78 @@
+import os
+import pickle
+import threading
+
+import pytest
+
+from analitica.artefactos import CacheDisco, en_disco
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheDisco(directorio=str(tmp_path / 'artefactos'), limite_mb=1)
+
+
+def _temporales(cache):
+    return [n for n in os.listdir(cache.directorio) if n.endswith('.tmp')]
+
+
+def test_escritura_fallida_conserva_el_artefacto_anterior(cache, monkeypatch):
+    ruta = cache.ruta('tabla', 'k')
+    cache.escribir(ruta, 'viejo')
+
+    def disco_lleno(valor, f, protocol=None):
+        f.write(b'basura')
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(pickle, 'dump', disco_lleno)
+    cache.escribir(ruta, 'nuevo')
+    assert cache.leer(ruta) == ('viejo', True)
+    assert _temporales(cache) == []
+
+
+def test_valor_no_serializable_no_deja_temporales(cache):
+    ruta = cache.ruta('tabla', 'k')
+    cache.escribir(ruta, threading.Lock())
+    assert cache.leer(ruta) == (None, False)
+    assert _temporales(cache) == []
+
+
+def test_artefacto_truncado_se_recalcula(cache):
+    ruta = cache.ruta('tabla', 'k')
+    cache.escribir(ruta, list(range(1000)))
+    with open(ruta, 'r+b') as f:
+        f.truncate(10)
+    assert cache.obtener('tabla', lambda: 'recalculado', 'x') == 'recalculado'
+    assert cache.leer(ruta) == (None, False)
+
+
+def test_desaloja_los_menos_usados(cache):
+    bloque = b'x' * 400_000
+    rutas = [cache.ruta(f'a{i}', 'k') for i in range(3)]
+    for i, ruta in enumerate(rutas[:2]):
+        cache.escribir(ruta, bloque)
+        os.utime(ruta, (1000 + i, 1000 + i))
+    # Leer a0 lo marca como usado recién: el menos usado pasa a ser a1
+    assert cache.leer(rutas[0])[1]
+
+    cache.escribir(rutas[2], bloque)
+    assert os.path.exists(rutas[0])
+    assert not os.path.exists(rutas[1])
+    assert os.path.exists(rutas[2])
+    assert cache.tamano() <= cache.limite_bytes
+
+
+def test_en_disco_ignora_parametros_con_guion_bajo(cache):
+    llamadas = []
+
+    @en_disco(cache=cache)
+    def calcular(version, _df, factor=2):
+        llamadas.append(version)
+        return len(_df) * factor
+
+    assert calcular('v1', [1, 2, 3]) == 6
+    assert calcular('v1', [9, 9, 9, 9]) == 6
+    assert calcular('v1', [1], factor=3) == 3
+    assert calcular('v2', [1]) == 2
+    assert llamadas == ['v1', 'v1', 'v2']
+    assert (cache.aciertos, cache.fallos) == (1, 3)
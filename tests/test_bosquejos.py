@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from analitica.bosquejos import (ALFA, BosquejoCuantiles, guardar_bosquejos, huella_bosquejos, leer_bosquejos,
+                                 posicion_entre_pares)
+
+
+def test_cuantiles_dentro_del_error_relativo():
+    valores = np.random.default_rng(0).lognormal(8, 1.5, 5000)
+    bosquejo = BosquejoCuantiles.de_valores(valores)
+    qs = np.array([0.1, 0.5, 0.9])
+    exactos = np.quantile(valores, qs, method='lower')
+    np.testing.assert_allclose(bosquejo.cuantiles(qs), exactos, rtol=2 * ALFA)
+
+
+def test_fusion_igual_a_bosquejo_de_todo_y_resta():
+    a, b = np.arange(0, 50, dtype=float), np.arange(25, 300, dtype=float)
+    fusion = BosquejoCuantiles.fusion([BosquejoCuantiles.de_valores(a), BosquejoCuantiles.de_valores(b)])
+    todo = BosquejoCuantiles.de_valores(np.concatenate([a, b]))
+    np.testing.assert_array_equal(fusion.conteos, todo.conteos)
+    assert fusion.ceros == todo.ceros == 1
+    assert (fusion - BosquejoCuantiles.de_valores(b)).total == len(a)
+
+
+def test_ida_y_vuelta_por_disco_y_posicion_entre_pares(tmp_path):
+    directorio = str(tmp_path)
+    assert huella_bosquejos(directorio) == '0|0'
+    base = pd.DataFrame({'Sends_per_Reach': [0.1, 0.2], 'Likes_per_Reach': [1.0, 2.0], 'Reproducciones': [100, 200]})
+    guardar_bosquejos(base, 'bajo', 'Humor', directorio)
+    guardar_bosquejos(base * 10, 'alto', 'Humor', directorio)
+    guardar_bosquejos(base * 100, 'otro', None, directorio)
+
+    bosquejos = leer_bosquejos(directorio)
+    assert bosquejos.set_index('perfil')['categoria'].to_dict() == {'alto': 'Humor', 'bajo': 'Humor', 'otro': 'Sin categoría'}
+    assert huella_bosquejos(directorio).startswith('3|')
+
+    posicion = posicion_entre_pares(base * 5, bosquejos, 'yo', 'Humor')
+    percentil, pares = posicion['Reproducciones']
+    assert pares == 2 and percentil == 50.0
+    percentil, pares = posicion_entre_pares(base * 5, bosquejos, 'yo', 'Sin pares')['Reproducciones']
+    assert pares == 3 and 0 < percentil < 50
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from analitica.busqueda import (IndexadorBusqueda, IndiceBusqueda, comentarios, comentarios_que_mencionan,
+                                segmentos, terminos_consulta, tokens)
+
+COMENTARIOS = "Qué buen video 🔥\n2 sem 3 Me gusta Responder\nEl pacto de Ralito otra vez\nResponder"
+
+
+def _indexar(version, directorio, libro):
+    indexador = IndexadorBusqueda(version, directorio)
+    indexador.agregar(libro)
+    indexador.cerrar()
+    return indexador.nuevos
+
+
+def _libro():
+    return pd.DataFrame({
+        'Descripción/Caption': ['El Pacto de Ralito explicado', 'Receta de arepas', None],
+        'Raw Data: Comentarios': [COMENTARIOS, 'Me encantan las arepas', 'Ralito ralito ralito'],
+    }, index=[10, 11, 12])
+
+
+def test_tokens_y_consultas():
+    assert tokens('Pacto de Ralito 🔥') == ['pacto', 'ralito']
+    assert comentarios(COMENTARIOS) == ['Qué buen video 🔥', 'El pacto de Ralito otra vez']
+    assert terminos_consulta('pacto ral*') == [('pacto', False), ('ral', True)]
+    assert comentarios_que_mencionan(COMENTARIOS, 'ral*') == ['El pacto de Ralito otra vez']
+
+
+def test_buscar_por_campo_y_prefijo(tmp_path):
+    directorio = str(tmp_path)
+    assert _indexar('v1', directorio, _libro()) == 3
+    indice = IndiceBusqueda('v1', directorio)
+    assert set(indice.buscar('ralito').index) == {10, 12}
+    assert list(indice.buscar('ralito', campos=('caption',)).index) == [10]
+    assert list(indice.buscar('arep*').index) == [11]
+    assert indice.buscar('pacto arepas').empty
+
+
+def test_version_nueva_solo_indexa_videos_cambiados(tmp_path):
+    directorio = str(tmp_path)
+    _indexar('v1', directorio, _libro())
+    libro = _libro()
+    libro.loc[11, 'Raw Data: Comentarios'] += '\nSin sal por favor'
+    assert _indexar('v2', directorio, libro) == 1
+    assert len(segmentos(directorio)) == 2
+    assert list(IndiceBusqueda('v2', directorio).buscar('sal').index) == [11]
+    assert IndiceBusqueda('v1', directorio).buscar('sal').empty
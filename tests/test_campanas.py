@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from analitica.campanas import vincular_campanas
+
+
+def _anuncios(**columnas):
+    n = len(columnas['anuncio'])
+    base = {'perfil': 'p', 'campana': None, 'inicio': pd.Timestamp('2026-10-20'),
+            'enlace': None, 'video': np.nan, 'gasto': 1000.0}
+    return pd.DataFrame({**{k: [v] * n for k, v in base.items()}, **columnas})
+
+
+def test_vinculo_por_columna_nombre_y_plan():
+    df = pd.DataFrame({'#': [3, 7, 14], 'Link Publicación': 'Instagram'})
+    anuncios = _anuncios(anuncio=['A', 'Pauta #14', 'C', 'D'], video=[3.0, np.nan, np.nan, 99.0],
+                         enlace=[None, None, 'https://www.instagram.com/reel/abc/', None])
+    pautas = pd.DataFrame({'fecha': [pd.Timestamp('2026-10-19')], 'video': [7]})
+    vinculados = vincular_campanas(anuncios, df, pautas)
+    assert vinculados['Vínculo'].tolist()[:3] == ['Columna #', 'Nombre', 'Plan semanal']
+    assert vinculados['video'].tolist()[:3] == [3.0, 14.0, 7.0]
+    assert vinculados.iloc[3][['video', 'Vínculo']].isna().all()
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.captions import _lift, extraer_rasgos, lift_hashtags, lift_rasgos, resumen_caption
+
+
+def _rasgos(*captions):
+    return extraer_rasgos(pd.Series(list(captions)))
+
+
+def test_llamado_a_la_accion_sin_tildes_ni_mayusculas():
+    rasgos = _rasgos('¡Coméntanos qué opinas!', 'Déjame tu opinión', 'LINK EN LA BIO', 'Sígueme para más',
+                     'comentario del día', 'La guardia de la noche', None)
+    # 'comentario' empieza con "coment" pero no es un llamado; 'guardia' tampoco
+    assert rasgos['CTA'].tolist() == [True, True, True, True, True, False, False]
+    assert rasgos['Pregunta'].tolist() == [False] * 7
+
+
+def test_emojis_con_tono_de_piel_y_banderas():
+    rasgos = _rasgos('Hola 👋🏽 ❤️ desde 🇨🇴', 'sin emojis: ¿seguro? ©', '🔥🔥🔥')
+    # El tono de piel no suma; una bandera son dos indicadores regionales
+    assert rasgos['Emojis'].tolist() == [4, 0, 3]
+    assert rasgos['Pregunta'].tolist() == [False, True, False]
+
+
+def test_hashtags_normalizados_y_sin_repetir():
+    rasgos = _rasgos('#Cartagena #cartagena #Bolívar @alcaldia y @otra.cuenta', 'sin nada', '#Año2025 #año2025')
+    assert rasgos['Hashtags'].tolist() == [3, 0, 2]
+    assert rasgos['Menciones'].tolist() == [2, 0, 0]
+    assert rasgos['Lista_Hashtags'].tolist() == [['bolivar', 'cartagena'], [], ['ano2025']]
+    assert resumen_caption(rasgos).tolist() == ['#3 @2', '', '#2']
+
+
+def test_tramo_de_longitud():
+    rasgos = _rasgos('x' * 99, 'x' * 100, 'x' * 600, '')
+    assert rasgos['Tramo_Longitud'].astype(str).tolist() == ['Corto (<100)', 'Medio (100-300)',
+                                                             'Muy largo (600+)', 'Corto (<100)']
+
+
+@pytest.fixture
+def videos():
+    return pd.DataFrame({'Reproducciones': [99, 999, 9, 9], 'Quality_Score': [8.0, 6.0, 4.0, 2.0]},
+                        index=[10, 11, 12, 13])
+
+
+def test_lift_calculado_a_mano(videos):
+    largo = pd.DataFrame({'etiqueta': [10, 11, 10, 11, 12, 13], 'Grupo': ['A', 'A', 'B', 'B', 'B', 'B']})
+    lift = _lift(largo, videos, min_videos=1).set_index('Grupo')
+
+    # A: media geométrica de (100, 1000) frente a la de (10, 10) sobre log1p
+    assert lift.loc['A', 'Videos'] == 2
+    assert lift.loc['A', 'Lift_Vistas'] == pytest.approx((math.sqrt(100 * 1000) / 10 - 1) * 100)
+    assert lift.loc['A', 'Mediana_Vistas'] == pytest.approx(math.sqrt(100 * 1000) - 1)
+    assert lift.loc['A', 'Quality_Score'] == pytest.approx(7.0)
+    assert lift.loc['A', 'Lift_QS'] == pytest.approx(7.0 - 3.0)
+    # Un grupo con todas las publicaciones no tiene "resto" contra el que comparar
+    assert np.isnan(lift.loc['B', 'Lift_Vistas'])
+    assert np.isnan(lift.loc['B', 'Lift_QS'])
+
+    assert list(_lift(largo, videos, min_videos=3)['Grupo']) == ['B']
+
+
+def test_lift_de_rasgos_y_hashtags(videos):
+    rasgos = extraer_rasgos(pd.Series(['#playa ¿vienes?', '#Playa comenta', 'hola', 'hola'], index=videos.index))
+    por_rasgo = lift_rasgos(videos, rasgos, min_videos=2).set_index('Grupo')
+    assert por_rasgo.loc['Con hashtags', 'Lift_QS'] == pytest.approx(4.0)
+    assert 'Con pregunta' not in por_rasgo.index
+    assert por_rasgo.loc['Corto (<100)', 'Videos'] == 4
+
+    por_hashtag = lift_hashtags(videos, rasgos, min_videos=2)
+    assert por_hashtag['Grupo'].tolist() == ['#playa']
+    assert por_hashtag['Lift_Vistas'].iloc[0] == pytest.approx(por_rasgo.loc['Con hashtags', 'Lift_Vistas'])
+
+    sin_hashtags = lift_hashtags(videos, extraer_rasgos(pd.Series(['a'] * 4, index=videos.index)))
+    assert sin_hashtags.empty
@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+
+from analitica.compartido import adjuntar, directorio_compartido, limpiar_versiones, marcar_version, publicar
+
+
+def _publicar(version, marca, directorio):
+    marcar_version(version, marca, directorio)
+    publicar(pd.DataFrame({'a': [1, 2]}), 'metricas', version, directorio)
+
+
+def _versiones(directorio):
+    return sorted(os.listdir(os.path.dirname(directorio_compartido('x', directorio))))
+
+
+def test_worker_atrasado_no_borra_la_version_nueva(tmp_path):
+    directorio = str(tmp_path)
+    _publicar('v1', 100, directorio)
+    _publicar('v2', 200, directorio)
+    limpiar_versiones('v1', directorio)
+    assert _versiones(directorio) == ['v1', 'v2']
+
+    limpiar_versiones('v2', directorio)
+    assert _versiones(directorio) == ['v2']
+    assert adjuntar('metricas', 'v2', directorio)['a'].tolist() == [1, 2]
+
+
+def test_la_primera_marca_manda_y_las_carpetas_sin_marca_son_viejas(tmp_path):
+    directorio = str(tmp_path)
+    publicar(pd.DataFrame({'a': [1]}), 'libro', 'v0', directorio)
+    _publicar('v1', 100, directorio)
+    marcar_version('v1', 300, directorio)
+    _publicar('v2', 200, directorio)
+    limpiar_versiones('v1', directorio)
+    assert _versiones(directorio) == ['v1', 'v2']
@@ -0,0 +1,48 @@
+import json
+import os
+from datetime import date
+
+import plotly.graph_objects as go
+
+from analitica.datos import cargar_instagram
+from analitica.exportar import VERSIONES_RETENIDAS, MotorExportes, contenido_reporte
+from analitica.importar import importar_perfil
+
+
+def _json(semana):
+    return go.Figure(go.Table(cells={'values': [[semana]]})).to_json()
+
+
+def test_imagen_se_indexa_por_contenido_de_la_figura(tmp_path):
+    with MotorExportes(procesos=1, directorio_cache=str(tmp_path)) as motor:
+        lunes = motor.ruta_imagen('v1', 'calendario', _json('2026-10-12'))
+        siguiente = motor.ruta_imagen('v1', 'calendario', _json('2026-10-19'))
+        assert lunes != siguiente
+        assert lunes == motor.ruta_imagen('v1', 'calendario', _json('2026-10-12'))
+
+
+def test_calendario_del_reporte_arranca_en_lunes(tmp_path):
+    carpeta = tmp_path / 'perfil' / 'instagram'
+    carpeta.mkdir(parents=True)
+    registros = [{'id': str(i), 'timestamp': 1700000000 + i * 86400, 'caption': f'video {i}', 'plays': 1000 + 37 * i,
+                  'like_count': 50 + i, 'comments_count': 3 + i % 4, 'shares': 4 + i} for i in range(12)]
+    (carpeta / 'media.json').write_text(json.dumps(registros))
+    importar_perfil(str(tmp_path / 'perfil'), str(tmp_path / 'salida'))
+    df = cargar_instagram(str(tmp_path / 'salida' / 'perfil' / 'tabla.arrow'))
+
+    calendario = contenido_reporte(df, date(2026, 10, 21))['Calendario']
+    assert calendario['Día'].iloc[0] == 'Lunes'
+    assert calendario['Fecha'].iloc[0] == '19/10'
+
+
+def test_se_podan_las_imagenes_de_versiones_viejas(tmp_path):
+    carpeta = tmp_path / 'reportes'
+    for i, version in enumerate(['v1', 'v2', 'v3', 'v4']):
+        (carpeta / version).mkdir(parents=True)
+        os.utime(carpeta / version, (i, i))
+
+    with MotorExportes(procesos=1, directorio_cache=str(tmp_path)) as motor:
+        motor.enviar('v1', {})
+
+    # v1 se usó en la corrida; de las demás quedan las VERSIONES_RETENIDAS - 1 más recientes
+    assert sorted(os.listdir(carpeta)) == sorted(['v1', *['v4', 'v3'][:VERSIONES_RETENIDAS - 1]])
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from analitica.formatos import FORMATO_BASE, SIN_DATO, recomendar_formato, rendimiento_por_grupo
+
+
+def _videos(filas):
+    return pd.DataFrame(filas, columns=['Tema/Categoría', 'Formato', 'Duración (min:seg)', 'Reproducciones',
+                                        'Sends_per_Reach', 'Quality_Score'])
+
+
+@pytest.fixture
+def videos():
+    return _videos([
+        # "Calle": QS alto en promedio pero muy disperso
+        ('Calle', 'Vertical', '0:20', 1000, 1.0, 9.5),
+        ('Calle', 'Vertical', '0:25', 1200, 1.2, 2.0),
+        ('Calle', 'Vertical', '0:28', 900, 0.8, 9.8),
+        # "Entrevista": QS algo menor pero estable
+        ('Entrevista', ' VERTICAL', '0:45', 800, 2.0, 6.8),
+        ('Entrevista', 'vertical', '0:50', 700, 2.2, 7.0),
+        ('Entrevista', 'vertical', '0:55', 750, 2.1, 7.2),
+        # Un solo video: sin intervalo y sin votos para recomendar
+        ('Humor', 'horizontal', '2:30', 5000, 5.0, 10.0),
+    ])
+
+
+def test_intervalo_t_igual_a_scipy(videos):
+    resumen = rendimiento_por_grupo(videos)
+    fila = resumen[(resumen['Dimensión'] == 'Categoría') & (resumen['Grupo'] == 'Entrevista')].iloc[0]
+    qs = videos.loc[videos['Tema/Categoría'] == 'Entrevista', 'Quality_Score']
+    inf, sup = stats.t.interval(0.95, len(qs) - 1, loc=qs.mean(), scale=stats.sem(qs))
+    assert fila['Videos'] == 3
+    assert fila['Quality_Score_IC_inf'] == pytest.approx(inf)
+    assert fila['Quality_Score_IC_sup'] == pytest.approx(sup)
+
+
+def test_grupo_de_un_video_no_tiene_intervalo(videos):
+    resumen = rendimiento_por_grupo(videos)
+    fila = resumen[(resumen['Dimensión'] == 'Categoría') & (resumen['Grupo'] == 'Humor')].iloc[0]
+    assert np.isnan(fila['Quality_Score_IC_inf'])
+    assert np.isnan(fila['Sends_per_Reach_IC_sup'])
+
+
+def test_recomienda_por_cota_inferior_y_no_por_media(videos):
+    formato = recomendar_formato(rendimiento_por_grupo(videos))
+    assert formato['basado_en_datos']
+    assert formato['tipo'] == 'Entrevista'
+    assert formato['duracion'] == '0:30 - 1:00'
+    # 'Vertical' y ' VERTICAL' se agrupan juntos
+    assert formato['formato'] == 'vertical'
+    assert formato['elementos'] == FORMATO_BASE['elementos']
+
+
+def test_sin_grupos_suficientes_queda_la_guia_editorial():
+    videos = _videos([(None, None, None, 100, 1.0, 5.0), ('Calle', 'vertical', '0:40', 200, 1.0, 6.0)])
+    formato = recomendar_formato(rendimiento_por_grupo(videos))
+    assert not formato['basado_en_datos']
+    assert formato['tipo'] == FORMATO_BASE['tipo']
+    assert formato['duracion'] == FORMATO_BASE['duracion']
+    assert 'formato' not in formato
+    # La guía base no se modifica al completar el formato
+    formato['elementos'].append('otro')
+    assert 'otro' not in FORMATO_BASE['elementos']
+    assert SIN_DATO in set(rendimiento_por_grupo(videos)['Grupo'].astype(str))
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.historial import (comparar_periodo, deltas_por_video, leer_indice, leer_snapshot, registrar_snapshot,
+                                 snapshot_anterior)
+
+
+def _videos(vistas, numeros=None):
+    numeros = numeros or list(range(1, len(vistas) + 1))
+    n = len(vistas)
+    return pd.DataFrame({
+        '#': numeros, 'Fecha': pd.Timestamp('2025-03-01'), 'Reproducciones': vistas, 'Likes': [10] * n,
+        'Conteo Comentarios': [1] * n, 'Compartidos': [2] * n, 'Reposteados': [0] * n,
+        'Sends_per_Reach': [0.5] * n, 'Likes_per_Reach': [3.0] * n, 'Quality_Score': [6.0] * n,
+    }, index=[100 + i for i in range(n)])
+
+
+@pytest.fixture
+def indice(tmp_path):
+    for version, dia, vistas in [('v1', 1, [100, 200]), ('v2', 8, [150, 260]), ('v3', 31, [400, 300, 50])]:
+        registrar_snapshot(_videos(vistas), version, datetime(2026, 1, dia, 12), str(tmp_path))
+    return leer_indice(str(tmp_path))
+
+
+def test_snapshot_anterior_incluye_la_fecha_exacta(indice):
+    assert snapshot_anterior(indice, datetime(2026, 1, 8, 12))['version'] == 'v2'
+    assert snapshot_anterior(indice, datetime(2026, 1, 8, 11, 59, 59))['version'] == 'v1'
+    assert snapshot_anterior(indice, datetime(2026, 1, 1, 11)) is None
+    assert snapshot_anterior(indice.iloc[:0], datetime(2026, 1, 1)) is None
+
+
+def test_comparar_periodo_en_los_bordes(indice):
+    actual, anterior = comparar_periodo(indice, 'v2', 7)
+    assert actual['version'] == 'v2'
+    assert anterior['version'] == 'v1'
+    assert actual['total_vistas'] - anterior['total_vistas'] == 110
+
+    # Hace 23 días desde v3 es justo la ingesta de v2; un día más atrás todavía rige v1
+    assert comparar_periodo(indice, 'v3', 23)[1]['version'] == 'v2'
+    assert comparar_periodo(indice, 'v3', 24)[1]['version'] == 'v1'
+
+    # Antes del primer snapshot, o si el vigente es el mismo, no hay con qué comparar
+    assert comparar_periodo(indice, 'v1', 7)[1] is None
+    assert comparar_periodo(indice, 'v2', 0)[1] is None
+    assert comparar_periodo(indice, 'desconocida', 7) == (None, None)
+
+
+def test_misma_version_no_se_registra_dos_veces(tmp_path):
+    assert registrar_snapshot(_videos([1]), 'v1', datetime(2026, 1, 1), str(tmp_path))
+    assert not registrar_snapshot(_videos([2]), 'v1', datetime(2026, 1, 2), str(tmp_path))
+    assert len(leer_indice(str(tmp_path))) == 1
+
+
+def test_deltas_con_videos_nuevos_y_borrados(indice, tmp_path):
+    anterior = leer_snapshot(indice.loc[indice['version'] == 'v2', 'archivo'].iloc[0], str(tmp_path))
+    # El video 1 ya no está; el 3 y el 4 son nuevos
+    df = _videos([300, 500, 70], numeros=[2, 3, 4])
+    deltas = deltas_por_video(df, anterior)
+    assert list(deltas.index) == list(df.index)
+    assert deltas['Reproducciones'].iloc[0] == 40
+    assert deltas['Reproducciones'].iloc[1:].isna().all()
+    assert (deltas['Likes'].iloc[0], deltas['Quality_Score'].iloc[0]) == (0, 0)
+    assert np.isnan(deltas['Likes'].iloc[2])
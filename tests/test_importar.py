@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from analitica.datos import cargar_instagram
+from analitica.importar import _fecha, _numero, importar_perfil, mapear, plataforma_de
+
+
+def _fila(registro, plataforma='Instagram'):
+    return next(mapear([registro], plataforma))
+
+
+def test_alias_de_la_graph_api():
+    fila = _fila({'id': '1', 'timestamp': '2025-03-01T15:00:00+0000', 'plays': 1200, 'like_count': 80,
+                  'comments_count': 7, 'media_type': 'REELS'})
+    assert fila['Reproducciones'] == 1200
+    assert fila['Likes'] == 80
+    assert fila['Conteo Comentarios'] == 7
+    assert fila['Formato'] == 'vertical'
+    assert fila['Fecha'] == pd.Timestamp('2025-03-01')
+
+
+def test_conteo_no_exportado_es_cero_y_vacio_es_nan():
+    fila = _fila({'id': '1', 'views': 100, 'likes': 5, 'shares': ''})
+    assert fila['Reposteados'] == 0
+    assert np.isnan(fila['Compartidos'])
+
+
+def test_sin_reproducciones_no_es_video():
+    assert list(mapear([{'id': '1', 'likes': 5}], 'Instagram')) == []
+
+
+def test_epoch_en_utc():
+    assert _fecha(1700000000) == pd.Timestamp('2023-11-14 22:13:20')
+    assert _fecha('1700000000') == pd.Timestamp('2023-11-14 22:13:20')
+
+
+def test_numeros_con_separadores():
+    assert _numero('1,234') == 1234
+    assert _numero([1, 2, 3]) == 3
+    assert np.isnan(_numero('-'))
+
+
+def test_plataforma_por_ruta():
+    assert plataforma_de('exportaciones/perfil/tiktok/videos.json') == 'TikTok'
+
+
+def test_importacion_sin_reposteados_no_va_a_cuarentena(tmp_path):
+    carpeta = tmp_path / 'perfil' / 'instagram'
+    carpeta.mkdir(parents=True)
+    registros = [{'id': str(i), 'timestamp': 1700000000 + i * 86400, 'caption': f'video {i}', 'plays': 1000 + i,
+                  'like_count': 50, 'comments_count': 3, 'shares': 4} for i in range(4)]
+    (carpeta / 'media.json').write_text(json.dumps(registros))
+    importar_perfil(str(tmp_path / 'perfil'), str(tmp_path / 'salida'))
+    df = cargar_instagram(str(tmp_path / 'salida' / 'perfil' / 'tabla.arrow'))
+    assert len(df) == 4
+    assert (df['Reposteados'] == 0).all()
@@ -0,0 +1,93 @@
+import re
+import zipfile
+from datetime import datetime, time, timedelta
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from analitica.formatos import duracion_a_segundos
+from analitica.lector import LectorHoja, fecha_excel
+
+
+@pytest.fixture
+def libro(tmp_path):
+    ruta = tmp_path / 'libro.xlsx'
+    wb = openpyxl.Workbook()
+    hoja = wb.active
+    hoja.title = 'Tabla_1'
+    hoja.append(['#', 'Fecha', 'Duración', 'Tiempo total', 'Reproducciones', 'Plataforma', 'Notas', None, 'Mixta'])
+    hoja.append([1, datetime(2025, 1, 2, 10, 30), time(0, 0, 39), timedelta(hours=30), 1500.5, 'Instagram', 'hola',
+                 None, 3])
+    hoja.append([2, datetime(2025, 1, 3), '0:45', timedelta(minutes=5), None, 'TikTok', None, None, 'x'])
+    hoja.append([3, datetime(2025, 2, 1), time(0, 1, 2), timedelta(seconds=7), 20, 'Instagram', 'chau', None, 4.5])
+    for fila in range(2, 5):
+        hoja.cell(fila, 4).number_format = '[h]:mm:ss'
+    wb.save(ruta)
+    return ruta
+
+
+def test_igual_que_read_excel(libro):
+    esperado = pd.read_excel(libro, sheet_name='Tabla_1')
+    leido = LectorHoja(libro, 'Tabla_1').leer()
+    pd.testing.assert_frame_equal(leido, esperado)
+
+
+def test_bloques_pequenos_igual_que_read_excel(libro):
+    esperado = pd.read_excel(libro, sheet_name='Tabla_1')
+    leido = LectorHoja(libro, 'Tabla_1').leer(filas_por_bloque=1)
+    pd.testing.assert_frame_equal(leido, esperado)
+
+
+def test_filas_y_celdas_sin_referencia(libro, tmp_path):
+    # `r` es opcional en <row> y en <c>: sin él cuentan en orden
+    sin_ref = tmp_path / 'sin_ref.xlsx'
+    with zipfile.ZipFile(libro) as origen, zipfile.ZipFile(sin_ref, 'w') as destino:
+        for item in origen.infolist():
+            datos = origen.read(item)
+            if item.filename.startswith('xl/worksheets/'):
+                datos = re.sub(rb'(<(?:row|c)\b[^>]*?) r="[A-Z]*\d+"', rb'\1', datos)
+            destino.writestr(item, datos)
+    esperado = pd.read_excel(sin_ref, sheet_name='Tabla_1')
+    assert esperado.shape == (3, 8)
+    pd.testing.assert_frame_equal(LectorHoja(sin_ref, 'Tabla_1').leer(), esperado)
+
+
+def test_duracion_con_formato_de_hora(libro):
+    """Regresión: una celda de hora (h:mm:ss) llegaba como 1899-12-30 00:00:39"""
+    leido = LectorHoja(libro, 'Tabla_1').leer(['Duración'])
+    assert leido['Duración'].iloc[0] == time(0, 0, 39)
+    assert duracion_a_segundos(leido['Duración']).tolist() == [39, 45, 62]
+
+
+def test_solo_columnas_pedidas(libro):
+    leido = LectorHoja(libro, 'Tabla_1').leer(['Plataforma', '#'])
+    assert list(leido.columns) == ['#', 'Plataforma']
+    assert leido['Plataforma'].tolist() == ['Instagram', 'TikTok', 'Instagram']
+
+
+def test_texto_vacio_es_nan(libro):
+    notas = LectorHoja(libro, 'Tabla_1').leer(['Notas'])['Notas']
+    assert notas.isna().tolist() == [False, True, False]
+    assert 'None' not in notas.dropna().tolist()
+
+
+@pytest.mark.parametrize('serial, esperado', [
+    (0.5, time(12)),
+    (45000.25, datetime(2023, 3, 15, 6)),
+    (1.0, datetime(1900, 1, 1)),
+    (59.0, datetime(1900, 2, 28)),
+    (61.0, datetime(1900, 3, 1)),
+])
+def test_fecha_excel_como_openpyxl(serial, esperado):
+    assert fecha_excel(serial) == esperado
+    assert fecha_excel(serial) == openpyxl.utils.datetime.from_excel(serial)
+
+
+def test_fecha_excel_duracion():
+    assert fecha_excel(1.25, duracion=True) == timedelta(hours=30)
+
+
+def test_hoja_inexistente(libro):
+    with pytest.raises(KeyError):
+        LectorHoja(libro, 'Otra')
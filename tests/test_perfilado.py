@@ -0,0 +1,16 @@
+from analitica.perfilado import Perfilador
+
+
+def test_secciones_anidadas_se_registran_aparte():
+    perfilador = Perfilador()
+    perfilador.iniciar('pagina')
+    with perfilador.seccion('Correlaciones'):
+        for _ in range(3):
+            with perfilador.seccion('Figura'):
+                pass
+    with perfilador.seccion('Figura'):
+        pass
+    perfilador.finalizar()
+
+    ejecuciones = perfilador.tabla_secciones().set_index('Sección')['Ejecuciones']
+    assert ejecuciones.to_dict() == {'Correlaciones': 1, 'Correlaciones › Figura': 3, 'Figura': 1, 'Total': 1}
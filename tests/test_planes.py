@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from analitica.planes import TAREAS_CHECKLIST, AlmacenPlanes, inicio_semana
+
+LUNES = date(2026, 10, 19)
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenPlanes(str(tmp_path / 'planes.db'))
+
+
+@pytest.fixture
+def plan():
+    filas = [{'Día': 'Lunes', 'Fecha': LUNES, 'Canal': 'TikTok/FB', 'Video': 3},
+             {'Día': 'Lunes', 'Fecha': LUNES, 'Canal': 'Instagram', 'Video': 7},
+             {'Día': 'Domingo', 'Fecha': date(2026, 10, 25), 'Canal': 'Pauta', 'Video': 7}]
+    return pd.DataFrame(filas)
+
+
+def test_inicio_semana():
+    assert inicio_semana(date(2026, 10, 22)) == LUNES
+    assert inicio_semana(datetime(2026, 10, 25, 23, 0)) == LUNES
+    assert inicio_semana(LUNES) == LUNES
+
+
+def test_plan_visible_antes_de_confirmar_y_por_toda_la_semana(almacen, plan):
+    almacen.guardar_plan('perfil', LUNES, plan, {'clips_tiktok_fb': 1})
+    assert len(almacen.plan('perfil', LUNES)[2]) == 3
+    almacen.esperar()
+    _, parametros, guardado = almacen.plan('perfil', date(2026, 10, 21))
+    assert parametros == {'clips_tiktok_fb': 1}
+    assert guardado['Video'].tolist() == [3, 7, 7]
+    assert almacen.semanas('perfil')['Semana'].tolist() == ['2026-10-19']
+
+
+def test_reemplazo_conserva_publicados(almacen, plan):
+    almacen.guardar_plan('perfil', LUNES, plan, {})
+    almacen.marcar_publicado('perfil', LUNES, LUNES, 'Instagram', 7)
+    almacen.guardar_plan('perfil', LUNES, plan, {})
+    assert almacen.plan('perfil', LUNES)[2]['Publicado'].tolist() == [False, True, False]
+    almacen.esperar()
+    assert almacen.plan('perfil', LUNES)[2]['Publicado'].tolist() == [False, True, False]
+
+
+def test_un_cambio_fallido_no_descarta_el_lote(almacen):
+    almacen._encolar([("INSERT INTO tabla_inexistente VALUES (1)", ())])
+    for tarea in TAREAS_CHECKLIST:
+        almacen.marcar_tarea('perfil', LUNES, tarea, True)
+    almacen.esperar()
+    assert almacen.descartados == 1
+    assert all(almacen.checklist('perfil', date(2026, 10, 24)).values())
+
+
+def test_huella_cambia_al_confirmar(almacen, plan):
+    antes = almacen.huella()
+    almacen.guardar_plan('perfil', LUNES, plan, {})
+    almacen.esperar()
+    despues = almacen.huella()
+    assert despues != antes
+    assert almacen.huella() == despues
+    assert almacen.videos_pautados('perfil')['video'].tolist() == [7]
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.plataformas import embudo, lift_por_plataforma, publicaciones_por_plataforma, unir_plataformas
+
+
+def _libro(notas=None):
+    filas = [
+        # (#, link, reproducciones, # en Ig/Tk, # en Ig/Fb)
+        (1, 'https://www.instagram.com/reel/a', 1600, None, None),
+        (2, 'Instagram', 500, None, None),
+        (3, 'https://instagram.com/reel/c', 900, None, None),
+        (None, 'https://www.tiktok.com/@x/video/1', 500, 1, None),
+        (None, 'TikTok', 300, 1, None),
+        (None, 'tiktok', 1000, 2, None),
+        (None, 'tiktok', 700, 99, None),
+        (None, 'tiktok', 650, None, None),
+        (None, 'https://facebook.com/reel/9', 300, None, '3'),
+    ]
+    libro = pd.DataFrame(filas, columns=['#', 'Link Publicación', 'Reproducciones', '# en Ig/Tk', '# en Ig/Fb'])
+    libro['Fecha'] = pd.Timestamp('2025-03-01')
+    for metrica in ['Likes', 'Conteo Comentarios', 'Compartidos']:
+        libro[metrica] = 10
+    if notas:
+        libro['Notas'] = pd.Series([texto for texto, _ in notas] + [None] * (len(libro) - len(notas)), dtype='object')
+        libro['Valor'] = pd.Series([valor for _, valor in notas] + [None] * (len(libro) - len(notas)), dtype='float64')
+    return libro
+
+
+def test_union_por_numero_de_instagram():
+    unido = unir_plataformas(_libro())
+    assert list(unido.index) == [1, 2, 3]
+    # Varias publicaciones del mismo video se suman; '#' inexistente o vacío no se une
+    assert unido.loc[1, 'Reproducciones_TikTok'] == 800
+    assert unido.loc[1, 'Likes_TikTok'] == 20
+    assert unido.loc[2, 'Reproducciones_TikTok'] == 1000
+    assert np.isnan(unido.loc[3, 'Reproducciones_TikTok'])
+    # '# en Ig/Fb' llega como texto en algunos libros
+    assert unido.loc[3, 'Reproducciones_Facebook'] == 300
+    assert unido['Reproducciones_Facebook'].notna().sum() == 1
+
+
+def test_lift_es_la_mediana_de_los_cocientes():
+    lift = lift_por_plataforma(unir_plataformas(_libro())).set_index('Plataforma')
+    # TikTok: 1600/800 = 2 y 500/1000 = 0.5
+    assert lift.loc['TikTok', 'Videos vinculados'] == 2
+    assert lift.loc['TikTok', 'Lift Instagram'] == pytest.approx(1.25)
+    assert lift.loc['TikTok', 'Vistas plataforma (mediana)'] == 900
+    assert lift.loc['Facebook', 'Lift Instagram'] == pytest.approx(3.0)
+
+
+def test_embudo_tiktok_fb_instagram_pauta():
+    libro = _libro()
+    publicados = publicaciones_por_plataforma(libro)
+    assert publicados == {'TikTok': 5, 'Facebook': 1}
+
+    funnel = embudo(unir_plataformas(libro), publicados, videos_pauta=[2, 5])
+    assert list(funnel['Videos']) == [6, 3, 1]
+    assert np.isnan(funnel['Conversión'].iloc[0])
+    assert funnel['Conversión'].iloc[1] == pytest.approx(3 / 6)
+    assert funnel['Conversión'].iloc[2] == pytest.approx(1 / 3)
+
+
+def test_totales_declarados_reemplazan_al_conteo():
+    libro = _libro(notas=[('Totales en TK', 40), ('Totales en FB', 12)])
+    assert publicaciones_por_plataforma(libro) == {'TikTok': 40, 'Facebook': 12}
@@ -0,0 +1,36 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from analitica.pronostico import FEATURES, entrenar, pronosticar
+
+
+def _videos(n=40):
+    rng = np.random.default_rng(0)
+    duracion = rng.integers(10, 120, n)
+    return pd.DataFrame({
+        'Fecha': pd.date_range('2026-01-01', periods=n),
+        'Duración (min:seg)': [f'{d // 60}:{d % 60:02d}' for d in duracion],
+        'Días sin publicar': rng.integers(0, 5, n).astype('float64'),
+        'Reproducciones': (1000 + 50 * duracion + rng.integers(0, 500, n)),
+        'Likes_per_Reach': rng.random(n),
+    })
+
+
+def test_features_no_usan_las_vistas():
+    assert not any('Reach' in feature for feature in FEATURES)
+    df = _videos()
+    modelo = entrenar(df)
+    inflado = df.assign(Reproducciones=df['Reproducciones'] * 100, Likes_per_Reach=0.0)
+    pd.testing.assert_frame_equal(pronosticar(modelo, df), pronosticar(modelo, inflado))
+
+
+def test_imputa_con_medianas_del_entrenamiento():
+    df = _videos()
+    modelo = pickle.loads(pickle.dumps(entrenar(df)))
+    nuevo = df.head(1).assign(**{'Días sin publicar': np.nan})
+    solo = pronosticar(modelo, nuevo)
+    en_lote = pronosticar(modelo, pd.concat([nuevo, df.tail(5).assign(**{'Días sin publicar': 4.0})]))
+    assert modelo.medianas['Dias_sin_publicar'] == df['Días sin publicar'].median()
+    pd.testing.assert_frame_equal(solo, en_lote.head(1))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.seguidores import resumen_seguidores, seguidores_por_video
+
+
+@pytest.fixture
+def serie():
+    conteos = [('p', '2026-01-01', 1000), ('p', '2026-01-02', 1010), ('p', '2026-01-03', 1030),
+               ('p', '2026-01-04', 1060),
+               # Del 5 al 14 no hay conteos
+               ('p', '2026-01-15', 1200), ('p', '2026-01-20', 1300),
+               ('q', '2026-01-01', 50)]
+    serie = pd.DataFrame(conteos, columns=['perfil', 'fecha', 'seguidores'])
+    serie['fecha'] = pd.to_datetime(serie['fecha'])
+    return serie
+
+
+@pytest.fixture
+def videos():
+    filas = [
+        ('p', '2026-01-02 10:00', 2020),
+        ('p', '2026-01-02 18:30', 505),
+        ('q', '2026-01-03 09:00', 100),
+        ('p', '2026-01-04 12:00', 1060),
+        ('p', '2026-01-08 12:00', 1000),
+        ('p', '2025-12-30 12:00', 500),
+    ]
+    df = pd.DataFrame(filas, columns=['Perfil', 'Fecha', 'Reproducciones'], index=list('abcdef'))
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+
+def test_seguidores_al_publicar(videos, serie):
+    resultado = seguidores_por_video(videos, serie)
+    # El conteo del mismo día vale aunque el video sea de la tarde; antes del primer conteo se usa el primero
+    assert resultado['Seguidores'].tolist() == [1010, 1010, 50, 1060, 1060, 1000]
+    assert resultado.loc['a', 'Alcance_por_Seguidor'] == pytest.approx(2.0)
+    assert resultado.loc['c', 'Alcance_por_Seguidor'] == pytest.approx(2.0)
+
+
+def test_crecimiento_repartido_entre_videos_del_dia(videos, serie):
+    crecimiento = seguidores_por_video(videos, serie)['Crecimiento']
+    # Del día 2 al siguiente día con video del perfil (el 4; el video del 3 es de otro perfil)
+    assert crecimiento['a'] == crecimiento['b'] == pytest.approx((1060 - 1010) / 2)
+    # Del 4 al 8 no hay conteos nuevos: no se atribuye nada
+    assert np.isnan(crecimiento['d'])
+    # Sin video siguiente, la ventana se corta a los 7 días (el 15, primer conteo después del hueco)
+    assert crecimiento['e'] == pytest.approx(1200 - 1060)
+    # Sin conteo antes de publicar ni conteo posterior del perfil
+    assert np.isnan(crecimiento['f'])
+    assert np.isnan(crecimiento['c'])
+
+
+def test_perfil_por_defecto(videos, serie):
+    solo_p = videos[videos['Perfil'] == 'p'].drop(columns='Perfil')
+    resultado = seguidores_por_video(solo_p, serie, perfil='p')
+    pd.testing.assert_frame_equal(resultado, seguidores_por_video(videos, serie).loc[solo_p.index])
+
+
+def test_resumen(serie):
+    resumen = resumen_seguidores(serie, perfil='p', dias=10)
+    assert resumen['seguidores'] == 1300
+    assert resumen['variacion'] == 1300 - 1060
+    assert resumen_seguidores(serie, perfil='nadie') is None
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.semaforos import (COLUMNAS_SEMAFORO, UMBRALES, clasificar, clasificar_percentil, semaforo_likes,
+                                 semaforo_qs, semaforo_sends, semaforos_por_video)
+
+
+# Umbrales fila a fila tal como estaban en la página de análisis
+def _sends_original(val):
+    if val > 1.0: return "🚀", "Explosivo"
+    elif val > 0.4: return "🟢", "Alto"
+    elif val > 0.1: return "🟡", "Promedio"
+    else: return "🔴", "Bajo"
+
+
+def _likes_original(val):
+    if val > 6.0: return "🚀", "Viral"
+    elif val > 3.0: return "🟢", "Excelente"
+    elif val > 1.5: return "🟡", "Promedio"
+    else: return "🔴", "Bajo"
+
+
+def _qs_original(val):
+    if val >= 8: return "🚀", "Excelente"
+    elif val >= 6: return "🟢", "Bueno"
+    elif val >= 4: return "🟡", "Promedio"
+    else: return "🔴", "Bajo"
+
+
+ORIGINALES = {'Sends_per_Reach': _sends_original, 'Likes_per_Reach': _likes_original, 'Quality_Score': _qs_original}
+
+
+def _valores_frontera(metrica):
+    """Cada umbral, sus vecinos en punto flotante y algunos valores fuera de rango"""
+    valores = [-1.0, 0.0, 100.0, np.nan]
+    for limite, _, _ in UMBRALES[metrica]['niveles']:
+        valores += [np.nextafter(limite, -np.inf), limite, np.nextafter(limite, np.inf)]
+    return np.array(valores)
+
+
+@pytest.mark.parametrize('metrica', list(UMBRALES))
+def test_np_select_igual_a_los_umbrales_por_fila(metrica):
+    valores = _valores_frontera(metrica)
+    emojis, estados = clasificar(valores, metrica)
+    assert list(zip(emojis, estados)) == [ORIGINALES[metrica](v) for v in valores]
+
+
+def test_envoltorios_escalares():
+    assert semaforo_sends(0.4) == ('🟡', 'Promedio')
+    assert semaforo_likes(6.0) == ('🟢', 'Excelente')
+    assert semaforo_qs(8) == ('🚀', 'Excelente')
+    assert all(isinstance(parte, str) for parte in semaforo_qs(3.9))
+
+
+def test_semaforo_por_video_alineado_con_el_indice():
+    df = pd.DataFrame({'Sends_per_Reach': [1.5, 0.1], 'Likes_per_Reach': [3.0, 7.0], 'Quality_Score': [6.0, 3.99]},
+                      index=[10, 20])
+    semaforos = semaforos_por_video(df)
+    assert list(semaforos.columns) == list(COLUMNAS_SEMAFORO.values())
+    assert semaforos.loc[10].tolist() == ['🚀 Explosivo', '🟡 Promedio', '🟢 Bueno']
+    assert semaforos.loc[20].tolist() == ['🔴 Bajo', '🚀 Viral', '🔴 Bajo']
+
+
+def test_percentil_frente_a_pares():
+    emojis, estados = clasificar_percentil([90, 89.9, 50, 25, 24.9])
+    assert list(emojis) == ['🚀', '🟢', '🟢', '🟡', '🔴']
+    assert estados[0] == 'Top 10%'
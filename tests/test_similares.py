@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.similares import MIN_VIDEOS_IVF, IndiceSimilares, seleccion_diversa, vectores_video
+
+
+def _vectores(n, dimensiones=16, grupos=40, semilla=0):
+    """Vectores de norma 1 agrupados alrededor de algunos centros (como videos de formatos parecidos)"""
+    rng = np.random.default_rng(semilla)
+    centros = rng.normal(size=(grupos, dimensiones))
+    vectores = centros[rng.integers(grupos, size=n)] + 0.4 * rng.normal(size=(n, dimensiones))
+    return (vectores / np.linalg.norm(vectores, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _exactos(vectores, consulta, k):
+    return set(np.argsort(-(vectores @ consulta))[:k])
+
+
+def test_ivf_recall_frente_a_busqueda_exacta():
+    vectores = _vectores(MIN_VIDEOS_IVF + 1000)
+    indice = IndiceSimilares(vectores, np.arange(len(vectores)))
+    assert indice.centroides is not None
+
+    consultas = _vectores(100, semilla=1)
+    recall = np.mean([
+        len(set(indice.buscar(consulta, k=10).index) & _exactos(vectores, consulta, 10)) / 10
+        for consulta in consultas
+    ])
+    assert recall >= 0.9
+
+
+def test_pocos_videos_busqueda_exacta():
+    vectores = _vectores(300)
+    indice = IndiceSimilares(vectores, np.arange(300) + 1000)
+    assert indice.centroides is None
+
+    resultado = indice.similares_a(1007, k=5)
+    esperado = [p + 1000 for p in np.argsort(-(vectores @ vectores[7])) if p != 7][:5]
+    assert list(resultado.index) == esperado
+    assert resultado.is_monotonic_decreasing
+    assert 1007 not in indice.mas_como([1007, 1008], k=20).index
+
+
+@pytest.fixture
+def videos():
+    rng = np.random.default_rng(3)
+    n = 40
+    return pd.DataFrame({
+        'Reproducciones': rng.integers(100, 100_000, size=n),
+        'Sends_per_Reach': rng.uniform(0, 2, size=n),
+        'Likes_per_Reach': rng.uniform(0, 8, size=n),
+        'Quality_Score': rng.permutation(np.linspace(1, 10, n)),
+        'Tema/Categoría': rng.choice(['Calle', 'Entrevista', None], size=n),
+        'Formato': rng.choice(['vertical', 'horizontal'], size=n),
+        'Duración (min:seg)': rng.choice(['0:25', '0:50', '1:40', None], size=n),
+    }, index=np.arange(n) * 3)
+
+
+def test_vectores_de_norma_uno(videos):
+    vectores = vectores_video(videos)
+    assert vectores.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectores, axis=1), 1, rtol=1e-5)
+
+
+def test_sin_diversidad_es_ordenar_por_quality_score(videos):
+    indice = IndiceSimilares.construir(videos)
+    elegidos = seleccion_diversa(videos, indice, clips=7, diversidad=0)
+    assert list(elegidos.index) == list(videos.nlargest(7, 'Quality_Score').index)
+
+
+def test_con_diversidad_evita_duplicados():
+    vectores = np.eye(4, dtype=np.float32)[[0, 0, 1, 2]]
+    df = pd.DataFrame({'Quality_Score': [10.0, 9.9, 5.0, 1.0]}, index=['a', 'a2', 'b', 'c'])
+    indice = IndiceSimilares(vectores, df.index)
+    assert list(seleccion_diversa(df, indice, clips=2, diversidad=0).index) == ['a', 'a2']
+    assert list(seleccion_diversa(df, indice, clips=2, diversidad=0.5).index) == ['a', 'b']
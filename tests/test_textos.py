@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from analitica.textos import EscritorTextos, TextosLaterales, directorio_textos, guardar_textos
+
+CAPTION, COMENTARIOS = 'Descripción/Caption', 'Raw Data: Comentarios'
+
+
+def _bloque(indice, captions, comentarios):
+    return pd.DataFrame({CAPTION: captions, COMENTARIOS: comentarios, 'Likes': 1}, index=indice)
+
+
+def test_ida_y_vuelta_por_bloques(tmp_path):
+    escritor = EscritorTextos('v1', directorio=str(tmp_path))
+    escritor.agregar(_bloque([0, 1, 2], ['¿Qué opinas? 🇨🇴', None, ''], ['bien\nmal', 'ñandú', np.nan]))
+    escritor.agregar(_bloque([3, 4], ['otro', 'último ✅'], [None, 'x' * 10_000]))
+    ruta = escritor.cerrar()
+
+    assert ruta == directorio_textos('v1', str(tmp_path))
+    assert not [n for n in os.listdir(tmp_path / 'textos') if n.endswith('.tmp')]
+
+    textos = TextosLaterales(ruta)
+    assert textos.serie(CAPTION).tolist() == ['¿Qué opinas? 🇨🇴', None, '', 'otro', 'último ✅']
+    assert textos.serie(COMENTARIOS, [4, 0, 2]).tolist() == ['x' * 10_000, 'bien\nmal', None]
+    # Etiquetas que no están en el almacén devuelven None
+    assert textos.serie(CAPTION, [3, 99]).tolist() == ['otro', None]
+
+
+def test_columna_toda_vacia(tmp_path):
+    ruta = guardar_textos(_bloque([5, 6], [None, None], ['', '']), 'v1', directorio=str(tmp_path))
+    textos = TextosLaterales(ruta)
+    assert textos.serie(CAPTION).tolist() == [None, None]
+    assert textos.serie(COMENTARIOS).tolist() == ['', '']
+
+
+def test_guardar_una_vez_por_version_y_borrar_las_anteriores(tmp_path):
+    guardar_textos(_bloque([0], ['a'], ['b']), 'v1', directorio=str(tmp_path))
+    # La misma versión no se reescribe
+    ruta = guardar_textos(_bloque([0], ['cambiado'], ['b']), 'v1', directorio=str(tmp_path))
+    assert TextosLaterales(ruta).serie(CAPTION).tolist() == ['a']
+
+    guardar_textos(_bloque([0], ['nuevo'], ['b']), 'v2', directorio=str(tmp_path))
+    assert os.listdir(tmp_path / 'textos') == ['v2']
+
+
+def test_descartar_no_deja_temporales(tmp_path):
+    escritor = EscritorTextos('v1', directorio=str(tmp_path))
+    escritor.agregar(_bloque([0], ['a'], ['b']))
+    escritor.descartar()
+    assert os.listdir(tmp_path / 'textos') == []
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica.validacion import ESQUEMA_TABLA_1, ErrorEsquema, validar_esquema, validar_instagram
+
+
+def _tabla(**cambios):
+    filas = {
+        '#': [1, 2, 3],
+        'Fecha': ['2026-10-01', '2026-10-02', '2026-10-03'],
+        'Reproducciones': [100, 200, 300],
+        'Likes': [10, 20, 30],
+        'Conteo Comentarios': [1, 2, 3],
+        'Reposteados': [0, 1, 2],
+        'Compartidos': [3, 4, 5],
+    }
+    filas.update(cambios)
+    return pd.DataFrame(filas)
+
+
+def test_esquema_incompleto_se_rechaza():
+    validar_esquema(list(ESQUEMA_TABLA_1))
+    with pytest.raises(ErrorEsquema, match='Duración'):
+        validar_esquema([c for c in ESQUEMA_TABLA_1 if c != 'Duración (min:seg)'])
+
+
+def test_filas_validas_pasan_tipadas():
+    validos, cuarentena = validar_instagram(_tabla())
+    assert len(validos) == 3 and cuarentena.empty
+    assert pd.api.types.is_datetime64_any_dtype(validos['Fecha'])
+
+
+def test_cuarentena_con_motivos():
+    tabla = _tabla(**{'#': [1, 1, 3], 'Fecha': ['2026-10-01', 'ayer', '2026-10-03'],
+                      'Reproducciones': [100, 200, 0], 'Likes': [10, np.nan, -1]})
+    validos, cuarentena = validar_instagram(tabla)
+    assert validos.empty
+    motivos = cuarentena['Motivos'].str.split('; ')
+    assert set(motivos[0]) == {'# duplicado'}
+    assert set(motivos[1]) == {'# duplicado', 'Fecha vacía o inválida', 'Likes vacío', 'Fecha con valor no de fecha'}
+    assert set(motivos[2]) == {'Reproducciones vacías o en cero', 'Likes negativo'}
+    assert cuarentena.loc[1, 'Fecha'] == 'ayer'